@@ -0,0 +1,164 @@
+"""This module include load benchmark of the sync read views under WSGI and the async ones under ASGI.
+
+Run from the project root against a migrated database with some games:
+
+    SECRET_KEY=x python benchmarks/asgi_vs_wsgi.py [requests] [concurrency]
+
+Every handler serves the views of its deployment: WSGI requests resolve
+ROOT_URLCONF with the sync views, ASGI requests get ASGI_URLCONF with
+the async ones from AsyncPagesMiddleware. Both handlers run in this
+process, so the numbers compare the request paths of Django and not the
+network stack of a server. WSGI requests run in a pool of threads like
+workers of a threaded server, ASGI requests run as tasks of one event
+loop like a single uvicorn worker. A temporary user with a client is
+created and deleted afterwards.
+"""
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from myapp import models as store  # noqa: E402
+
+REQUESTS = 200
+CONCURRENCY = 20
+MONEY = 100
+OK = 200
+
+
+def read_paths() -> list[str]:
+    """Build URLs of the benchmarked read views.
+
+    Returns:
+        list: paths of the views
+    """
+    game_id = store.Games.objects.order_by().values_list('id', flat=True).first()
+    search = reverse('search_games')
+    paths = [reverse('home'), f'{search}?query=a', reverse('cart'), reverse('games')]
+    if game_id is not None:
+        paths.append(reverse('games_detail', args=[game_id]))
+    return paths
+
+
+def wsgi_worker(user, paths: list[str], turns: range) -> int:
+    """Send a share of requests through the WSGI handler to the sync views.
+
+    Args:
+        user: logged in user
+        paths: paths to request in turn
+        turns: numbers of the requests of this worker
+
+    Returns:
+        int: number of failed requests
+    """
+    browser = Client()
+    browser.force_login(user)
+    failed = 0
+    for turn in turns:
+        failed += browser.get(paths[turn % len(paths)]).status_code != OK
+        # The test client keeps the connection of the thread, a server
+        # releases it when the request is finished.
+        django.db.close_old_connections()
+    return failed
+
+
+async def asgi_worker(user, paths: list[str], turns: range) -> int:
+    """Send a share of requests through the ASGI handler to the async views.
+
+    Args:
+        user: logged in user
+        paths: paths to request in turn
+        turns: numbers of the requests of this worker
+
+    Returns:
+        int: number of failed requests
+    """
+    browser = AsyncClient()
+    await browser.aforce_login(user)
+    failed = 0
+    for turn in turns:
+        response = await browser.get(paths[turn % len(paths)])
+        failed += response.status_code != OK
+    return failed
+
+
+def shares(total: int, concurrency: int) -> list[range]:
+    """Split numbers of requests between workers.
+
+    Args:
+        total: number of requests
+        concurrency: number of workers
+
+    Returns:
+        list: numbers of the requests of every worker
+    """
+    return [range(number, total, concurrency) for number in range(concurrency)]
+
+
+def run_wsgi(user, paths: list[str], total: int, concurrency: int) -> tuple[float, int]:
+    """Load the WSGI handler from a pool of threads.
+
+    Args:
+        user: logged in user
+        paths: paths to request in turn
+        total: number of requests
+        concurrency: number of threads
+
+    Returns:
+        tuple: requests per second and number of failed requests
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        futures = [pool.submit(wsgi_worker, user, paths, turns) for turns in shares(total, concurrency)]
+        failed = sum(future.result() for future in futures)
+    return total / (time.perf_counter() - start), failed
+
+
+async def run_asgi(user, paths: list[str], total: int, concurrency: int) -> tuple[float, int]:
+    """Load the ASGI handler from tasks of one event loop.
+
+    Args:
+        user: logged in user
+        paths: paths to request in turn
+        total: number of requests
+        concurrency: number of tasks
+
+    Returns:
+        tuple: requests per second and number of failed requests
+    """
+    start = time.perf_counter()
+    failed = await asyncio.gather(*(asgi_worker(user, paths, turns) for turns in shares(total, concurrency)))
+    return total / (time.perf_counter() - start), sum(failed)
+
+
+def main() -> None:
+    """Load both handlers with the same requests and print the throughput."""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else CONCURRENCY
+    settings.ALLOWED_HOSTS.append('testserver')
+    user = User.objects.create_user(username=f'bench-{time.time_ns()}')
+    store.Client.objects.create(user=user, nickname=user.username, money=MONEY)
+    paths = read_paths()
+    wsgi, wsgi_failed = run_wsgi(user, paths, total, concurrency)
+    asgi, asgi_failed = asyncio.run(run_asgi(user, paths, total, concurrency))
+    user.delete()
+    sys.stdout.write(f'requests: {total}, concurrency: {concurrency}\n')
+    sys.stdout.write(f'sync views under wsgi: {wsgi:.1f} req/s, failed: {wsgi_failed}\n')
+    sys.stdout.write(f'async views under asgi: {asgi:.1f} req/s, failed: {asgi_failed}\n')
+
+
+if __name__ == '__main__':
+    main()
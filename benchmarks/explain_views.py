@@ -0,0 +1,267 @@
+"""This module include EXPLAIN capture of the queries of every view.
+
+Run from the project root against a migrated database with a realistic
+amount of games, clients, purchases and comments:
+
+    SECRET_KEY=x python benchmarks/explain_views.py capture before.json
+    SECRET_KEY=x python benchmarks/explain_views.py report before.json after.json
+
+Every route of myapp/urls.py is requested once by a staff user attached
+to an existing client, the API is called with a token of the user. Queries on the tables of the store are explained
+with ANALYZE right after the request, writes are explained without
+ANALYZE. Each route runs in a transaction which is rolled back, so the
+database is left as it was.
+"""
+import json
+import os
+import re
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import DatabaseError, connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from myapp import models as store  # noqa: E402
+
+GET = 'get'
+POST = 'post'
+STORE_TABLES = '"games_data".'
+READS = ('SELECT', 'WITH')
+EXECUTION = re.compile(r'Execution Time: ([\d.]+) ms')
+MONEY = 100000
+
+
+class Rollback(Exception):
+    """Raised to roll back the transaction of a route."""
+
+
+def fixtures(user) -> dict:
+    """Attach the user to a busy client and pick objects for the routes.
+
+    Args:
+        user: staff user of the run
+
+    Returns:
+        dict: ids of the objects used in URLs
+    """
+    client = store.Client.objects.filter(user=None, comment__isnull=False).order_by('pk').first()
+    store.Client.objects.filter(pk=client.pk).update(user=user, money=MONEY)
+    owned = store.Games.objects.create(title='EXPLAIN owned game', price=1)
+    store.GameClient.objects.create(game=owned, client=client, purchased=True, purchased_at=timezone.now())
+    comment = store.Comment.objects.filter(client=client).order_by('pk').first()
+    fresh = store.Games.objects.exclude(clients=client).order_by('pk').first()
+    return {'game': comment.game_id, 'owned': owned.pk, 'fresh': fresh.pk, 'comment': comment.pk}
+
+
+def routes(ids: dict) -> list[tuple]:
+    """List requests covering every route of myapp/urls.py.
+
+    Args:
+        ids: ids of the objects used in URLs
+
+    Returns:
+        list: labels, methods, paths and POST data of the requests
+    """
+    game, fresh, comment = ids['game'], ids['fresh'], ids['comment']
+    since = urlencode({'since': (timezone.now() - timedelta(hours=1)).isoformat()})
+    home, search, autocomplete = reverse('home'), reverse('search_games'), reverse('autocomplete')
+    export = reverse('export', args=['purchases', 'csv'])
+    return [
+        ('home', GET, home, None),
+        ('home, sort=rating', GET, f'{home}?sort=rating', None),
+        ('games', GET, reverse('games'), None),
+        ('register', GET, reverse('register'), None),
+        ('login', GET, reverse('login'), None),
+        ('game_comments_api', GET, reverse('game_comments_api', args=[game]), None),
+        ('export', GET, f'{export}?{since}', None),
+        ('database_pools', GET, reverse('database_pools'), None),
+        ('api games', GET, reverse('games-list'), None),
+        ('api clients', GET, reverse('client-list'), None),
+        ('api comment', GET, reverse('comment-list'), None),
+        ('api genre', GET, reverse('genre-list'), None),
+        ('games_comments', GET, reverse('games_comments', args=[game]), None),
+        ('search_games', GET, f'{search}?query=game', None),
+        ('autocomplete', GET, f'{autocomplete}?q=Game 1', None),
+        ('add_game', GET, reverse('add_game'), None),
+        ('confirm_delete', POST, reverse('confirm_delete', args=[ids['owned']]), {}),
+        ('cart', GET, reverse('cart'), None),
+        ('checkout', POST, reverse('checkout'), {}),
+        ('add_many_to_cart', POST, reverse('add_many_to_cart'), {'game_id': [str(fresh)]}),
+        ('add_to_cart', POST, reverse('add_to_cart', args=[fresh]), {}),
+        ('buy_game', POST, reverse('buy_game', args=[fresh]), {}),
+        ('remove_from_cart', POST, reverse('remove_from_cart', args=[fresh]), {}),
+        ('games_detail', GET, reverse('games_detail', args=[game]), None),
+        ('comment_delete', POST, reverse('comment_delete', args=[comment]), {}),
+        ('update_comment', POST, reverse('update_comment', args=[comment]), {'description': 'plans', 'estimation': '4'}),
+        ('logout', POST, reverse('logout'), {}),
+    ]
+
+
+def explain(sql: str) -> str:
+    """Explain one statement, reads are run with ANALYZE.
+
+    Args:
+        sql: statement with interpolated parameters
+
+    Returns:
+        str: text of the plan or of the error
+    """
+    options = 'ANALYZE, BUFFERS' if sql.lstrip().upper().startswith(READS) else 'COSTS'
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN ({options}) {sql}')
+                return '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'error: {error}'
+
+
+def request(browser, method: str, path: str, post) -> tuple[int, list[str]]:
+    """Send a request and take the statements on the tables of the store.
+
+    Args:
+        browser: logged in test client
+        method: get or post
+        path: URL of the route
+        post: POST data
+
+    Returns:
+        tuple: status code and statements
+    """
+    cache.clear()
+    queries = CaptureQueriesContext(connection)
+    with queries:
+        response = getattr(browser, method)(path, post) if method == POST else browser.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    statements = (query['sql'] for query in queries.captured_queries)
+    return response.status_code, [sql for sql in statements if STORE_TABLES in sql]
+
+
+def capture_route(browser, route: tuple) -> dict:
+    """Request one route and explain its statements, then roll back.
+
+    Args:
+        browser: logged in test client
+        route: label, method, path and POST data
+
+    Returns:
+        dict: status code and explained statements of the route
+    """
+    label, method, path, post = route
+    captured = {'label': label, 'path': path}
+    try:
+        with transaction.atomic():
+            status, statements = request(browser, method, path, post)
+            captured.update(status=status, queries=[{'sql': sql, 'plan': explain(sql)} for sql in statements])
+            raise Rollback
+    except Rollback:
+        return captured
+
+
+def capture(output: str) -> None:
+    """Capture plans of every route into a JSON file.
+
+    Args:
+        output: path of the JSON file
+    """
+    settings.ALLOWED_HOSTS.append('testserver')
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(username=f'explain-{time.time_ns()}', is_staff=True)
+            ids = fixtures(user)
+            token = Token.objects.create(user=user)
+            browser = Client(raise_request_exception=False, headers={'Authorization': f'Token {token.key}'})
+            browser.force_login(user)
+            captured = [capture_route(browser, route) for route in routes(ids)]
+            raise Rollback
+    except Rollback:
+        Path(output).write_text(json.dumps(captured, indent=1))
+
+
+def execution_ms(queries: list[dict]) -> float:
+    """Sum execution times of analyzed statements.
+
+    Args:
+        queries: explained statements
+
+    Returns:
+        float: milliseconds
+    """
+    times = (EXECUTION.search(query['plan']) for query in queries)
+    return sum(float(found.group(1)) for found in times if found)
+
+
+def plans(title: str, route: dict) -> list[str]:
+    """Format statements and plans of a route.
+
+    Args:
+        title: heading of the block
+        route: captured route
+
+    Returns:
+        list: lines of markdown
+    """
+    lines = [f'#### {title}', '']
+    for query in route['queries']:
+        lines.extend(['```sql', query['sql'], '```', '', '```', query['plan'], '```', ''])
+    if not route['queries']:
+        lines.extend(['No statements on the tables of the store.', ''])
+    return lines
+
+
+def summary(old: dict, new: dict) -> str:
+    """Format a row of the table of totals.
+
+    Args:
+        old: route captured on the old tree
+        new: the same route captured on the new tree
+
+    Returns:
+        str: row of markdown table
+    """
+    counts = [len(old['queries']), len(new['queries'])]
+    totals = ['{0:.2f}'.format(execution_ms(route['queries'])) for route in (old, new)]
+    cells = [old['label'], str(new['status']), *map(str, counts), *totals]
+    return '| {0} |'.format(' | '.join(cells))
+
+
+def report(before_path: str, after_path: str) -> None:
+    """Print a markdown comparison of two captures.
+
+    Args:
+        before_path: JSON capture of the old tree
+        after_path: JSON capture of the new tree
+    """
+    before = json.loads(Path(before_path).read_text())
+    after = {route['label']: route for route in json.loads(Path(after_path).read_text())}
+    lines = ['| route | status | queries before | queries after | ms before | ms after |', '|---|---|---|---|---|---|']
+    lines.extend(summary(route, after[route['label']]) for route in before)
+    lines.append('')
+    for route in before:
+        lines.extend(['### {0}: `{1}`'.format(route['label'], route['path']), ''])
+        lines.extend(plans('Before', route) + plans('After', after[route['label']]))
+    sys.stdout.write('\n'.join(lines))
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'capture':
+        capture(sys.argv[2])
+    else:
+        report(sys.argv[2], sys.argv[3])
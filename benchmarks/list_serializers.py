@@ -0,0 +1,87 @@
+"""This module include benchmark of list serialization.
+
+Run from the project root:
+
+    SECRET_KEY=x python benchmarks/list_serializers.py
+
+No database is needed, rows and objects are built in memory.
+"""
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from myapp.fast_serializers import values_plan  # noqa: E402
+from myapp.models import Client  # noqa: E402
+from myapp.serializers import ClientSerializer  # noqa: E402
+
+ROWS = 10000
+REPEAT = 5
+START = date.fromisoformat('2020-01-01')
+DAYS = 1000
+MILLISECONDS = 1000
+
+
+def make_rows(count: int) -> list[dict]:
+    """Build rows like Client.objects.values() returns.
+
+    Args:
+        count: number of rows
+
+    Returns:
+        list: dicts of client columns
+    """
+    return [
+        {
+            'id': uuid4(),
+            'nickname': f'Client {number}',
+            'money': Decimal(number).scaleb(-2),
+            'date_registrate': START + timedelta(days=number % DAYS),
+        }
+        for number in range(count)
+    ]
+
+
+def best_time(func) -> float:
+    """Take the best of several runs.
+
+    Args:
+        func: function to time
+
+    Returns:
+        float: milliseconds of the fastest run
+    """
+    return min(timeit.repeat(func, number=1, repeat=REPEAT)) * MILLISECONDS
+
+
+def main() -> None:
+    """Time both serializers and check that they render the same bytes."""
+    rows = make_rows(ROWS)
+    instances = [Client(**row) for row in rows]
+    context = {'request': None}
+    plan = values_plan(ClientSerializer(context=context))
+    expected = JSONRenderer().render(ClientSerializer(instances, many=True, context=context).data)
+    if JSONRenderer().render(plan.serialize(rows)) != expected:
+        sys.exit('Outputs differ')
+    slow = best_time(lambda: ClientSerializer(instances, many=True, context=context).data)
+    fast = best_time(lambda: plan.serialize(rows))
+    speedup = slow / fast
+    sys.stdout.write(f'rows: {ROWS}\n')
+    sys.stdout.write(f'serializer: {slow:.1f} ms\n')
+    sys.stdout.write(f'values plan: {fast:.1f} ms\n')
+    sys.stdout.write(f'speedup: x{speedup:.1f}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""This module include load test of the main views of the store.
+
+Run from the project root against a database filled by seed_store. With
+--base-url the users send HTTP requests to a running server of the same
+database, they log in with the login form and the password given to
+seed_store, and call the API with their tokens:
+
+    SECRET_KEY=x python manage.py seed_store --password load-test
+    SECRET_KEY=x python benchmarks/load_test.py --base-url http://127.0.0.1:8000 --password load-test
+
+Without --base-url the test client calls the WSGI handler in this
+process. There is no server and no network, and the threads of the users
+share the GIL of one process, so it measures the views and queries only.
+Use it as a fallback when no server is running:
+
+    SECRET_KEY=x python benchmarks/load_test.py [--users 20] [--iterations 10] [--seed 0]
+
+Every simulated user is a seeded client in a thread of its own. In every
+iteration a user opens the catalog, searches, opens a game, adds it to
+the cart, opens the cart, buys another game and reads the API lists of
+games, comments and clients. The clients get money so purchases
+succeed, purchases stay in the database. The same seed walks the same
+games, so runs against the same data are comparable.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin
+
+import django
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from myapp import models as store  # noqa: E402
+
+GET = 'get'
+POST = 'post'
+MONEY = 10 ** 6
+CATALOG_SIZE = 1000
+BAD_REQUEST = 400
+PERCENTILES = (50, 95, 99)
+MILLISECONDS = 1000
+ALL = 'all'
+USERS = 20
+ITERATIONS = 10
+HEADER = '{0:<14}{1:>7}{2:>8}{3:>10}{4:>10}{5:>10}\n'
+TOTALS = 'requests: {0}, seconds: {1:.1f}, throughput: {2:.1f} req/s\n'
+IN_PROCESS = 'mode: in-process test client, no server or network, users share the GIL\n'
+OVER_HTTP = 'mode: HTTP requests to {0}\n'
+HTTP_TIMEOUT = 30
+FOUND = 302
+ROW = '{0:<14}{1:>7}{2:>8}{3:>10.1f}{4:>10.1f}{5:>10.1f}\n'
+
+
+def simulated_users(count: int) -> list[tuple]:
+    """Take seeded clients with users, give them money and API tokens.
+
+    Args:
+        count: number of users
+
+    Returns:
+        list: users with keys of their tokens
+    """
+    clients = store.Client.objects.filter(user__isnull=False).select_related('user').order_by('pk')
+    clients = list(clients[:count])
+    store.Client.objects.filter(pk__in=[client.pk for client in clients]).update(money=MONEY)
+    return [(client.user, Token.objects.get_or_create(user=client.user)[0].key) for client in clients]
+
+
+def scenario(generator: random.Random, catalog: list[tuple]) -> list[tuple[str, str, str]]:
+    """Pick the requests of one iteration of a user.
+
+    Args:
+        generator: random generator of the user
+        catalog: ids and titles of games
+
+    Returns:
+        list: names, methods and paths of the requests
+    """
+    (game_id, title), (bought_id, _) = generator.sample(catalog, 2)
+    query = generator.choice(title.split())
+    search = reverse('search_games')
+    return [
+        ('home', GET, reverse('home')),
+        ('search', GET, f'{search}?query={query}'),
+        ('game', GET, reverse('games_detail', args=[game_id])),
+        ('add_to_cart', POST, reverse('add_to_cart', args=[game_id])),
+        ('cart', GET, reverse('cart')),
+        ('buy', POST, reverse('buy_game', args=[bought_id])),
+        ('api games', GET, reverse('games-list')),
+        ('api comments', GET, reverse('comment-list')),
+        ('api clients', GET, reverse('client-list')),
+    ]
+
+
+class TestClientBrowser:
+    """Browser of the fallback mode, the test client calls the handler in this process."""
+
+    def __init__(self, user, token: str):
+        """Log the user in without the login form.
+
+        Args:
+            user: seeded user
+            token: key of the API token of the user
+        """
+        self.client = Client(headers={'Authorization': f'Token {token}'})
+        self.client.force_login(user)
+
+    def send(self, method: str, path: str) -> int:
+        """Send a request through the handler.
+
+        Args:
+            method: HTTP method
+            path: requested path
+
+        Returns:
+            int: status code of the response
+        """
+        response = getattr(self.client, method)(path)
+        # The test client keeps the connection of the thread, a server
+        # releases it when the request is finished.
+        django.db.close_old_connections()
+        return response.status_code
+
+
+class HttpBrowser:
+    """Browser of the --base-url mode, a session of HTTP requests to a running server."""
+
+    def __init__(self, base_url: str, user, token: str, password: str):
+        """Log the user in with the login form, API requests carry the token.
+
+        Args:
+            base_url: URL of the server
+            user: seeded user
+            token: key of the API token of the user
+            password: password of the seeded users
+
+        Raises:
+            ValueError: if the server rejects the login
+        """
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Token {token}'
+        login_url = urljoin(base_url, reverse('login'))
+        self.session.get(login_url, timeout=HTTP_TIMEOUT)
+        credentials = {
+            'username': user.username,
+            'password': password,
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken', ''),
+        }
+        response = self.session.post(
+            login_url, data=credentials, headers={'Referer': login_url}, allow_redirects=False, timeout=HTTP_TIMEOUT,
+        )
+        if response.status_code != FOUND:
+            raise ValueError(f'{user.username} can not log in to {login_url}, check --password.')
+        # The login rotates the CSRF token, forms of the scenario send the new one.
+        self.session.headers['X-CSRFToken'] = self.session.cookies.get('csrftoken', '')
+        self.session.headers['Referer'] = base_url
+
+    def send(self, method: str, path: str) -> int:
+        """Send a request to the server, redirects are not followed like by the test client.
+
+        Args:
+            method: HTTP method
+            path: requested path
+
+        Returns:
+            int: status code of the response
+        """
+        url = urljoin(self.base_url, path)
+        return self.session.request(method, url, allow_redirects=False, timeout=HTTP_TIMEOUT).status_code
+
+
+def simulate(browser, catalog: list[tuple], iterations: range) -> list[tuple]:
+    """Walk the scenario as one user and time every request.
+
+    Args:
+        browser: logged in TestClientBrowser or HttpBrowser of the user
+        catalog: ids and titles of games
+        iterations: numbers of the iterations, they seed the choices
+
+    Returns:
+        list: names, seconds and success of the requests
+    """
+    samples = []
+    for iteration in iterations:
+        for name, method, path in scenario(random.Random(iteration), catalog):
+            start = time.perf_counter()
+            status = browser.send(method, path)
+            samples.append((name, time.perf_counter() - start, status < BAD_REQUEST))
+    return samples
+
+
+def run(browsers: list, catalog: list[tuple], iterations: int, seed: int) -> tuple[list, float]:
+    """Run all users at once.
+
+    Args:
+        browsers: logged in browsers of the users
+        catalog: ids and titles of games
+        iterations: iterations of every user
+        seed: seed of the choices
+
+    Returns:
+        tuple: samples of all requests and seconds of the run
+    """
+    firsts = range(seed, seed + len(browsers) * iterations, iterations)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(len(browsers)) as pool:
+        futures = [
+            pool.submit(simulate, browser, catalog, range(first, first + iterations))
+            for first, browser in zip(firsts, browsers)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    return samples, time.perf_counter() - start
+
+
+def percentiles(latencies: list[float]) -> list[float]:
+    """Compute the reported percentiles.
+
+    Args:
+        latencies: seconds of requests
+
+    Returns:
+        list: p50, p95 and p99 in milliseconds
+    """
+    if len(latencies) < 2:
+        return [latencies[0] * MILLISECONDS for _ in PERCENTILES]
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return [cuts[percentile - 1] * MILLISECONDS for percentile in PERCENTILES]
+
+
+def row(step: str, timings: list[tuple]) -> str:
+    """Format a line of the report.
+
+    Args:
+        step: name of the step
+        timings: seconds and success of the requests of the step
+
+    Returns:
+        str: count, failures and percentiles of the step
+    """
+    failed = sum(not succeeded for _, succeeded in timings)
+    return ROW.format(step, len(timings), failed, *percentiles([latency for latency, _ in timings]))
+
+
+def report(samples: list[tuple], elapsed: float) -> None:
+    """Print latency percentiles of every step and the throughput.
+
+    Args:
+        samples: names, seconds and success of the requests
+        elapsed: seconds of the run
+    """
+    steps = {}
+    for name, *timing in samples:
+        steps.setdefault(name, []).append(timing)
+    steps[ALL] = [sample[1:] for sample in samples]
+    sys.stdout.write(HEADER.format('step', 'count', 'failed', 'p50 ms', 'p95 ms', 'p99 ms'))
+    sys.stdout.writelines(row(step, timings) for step, timings in steps.items())
+    sys.stdout.write(TOTALS.format(len(samples), elapsed, len(samples) / elapsed))
+
+
+def log_in(users: list[tuple], arguments: argparse.Namespace) -> list:
+    """Log the users in with the browsers of the chosen mode and print the mode.
+
+    Args:
+        users: users with keys of their tokens
+        arguments: parsed arguments with base_url and password
+
+    Returns:
+        list: logged in browsers of the users
+    """
+    if not arguments.base_url:
+        settings.ALLOWED_HOSTS.append('testserver')
+        sys.stdout.write(IN_PROCESS)
+        return [TestClientBrowser(user, token) for user, token in users]
+    try:
+        browsers = [HttpBrowser(arguments.base_url, user, token, arguments.password) for user, token in users]
+    except (ValueError, requests.RequestException) as error:
+        sys.exit(str(error))
+    sys.stdout.write(OVER_HTTP.format(arguments.base_url))
+    return browsers
+
+
+def main() -> None:
+    """Parse arguments, run the simulated users and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=USERS, help='concurrent simulated users')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS, help='scenario iterations of every user')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the choices of games')
+    parser.add_argument('--base-url', help='URL of a running server, the test client of this process by default')
+    parser.add_argument('--password', help='password given to seed_store, required with --base-url')
+    arguments = parser.parse_args()
+    if arguments.base_url and not arguments.password:
+        parser.error('--base-url needs the --password of the seeded users.')
+    catalog = list(store.Games.objects.order_by('title', 'id').values_list('id', 'title')[:CATALOG_SIZE])
+    users = simulated_users(arguments.users)
+    if len(catalog) < 2 or not users:
+        sys.exit('Fill the database with seed_store first.')
+    report(*run(log_in(users, arguments), catalog, arguments.iterations, arguments.seed))
+
+
+if __name__ == '__main__':
+    main()
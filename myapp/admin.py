@@ -23,6 +23,7 @@ class GamesAdmin(admin.ModelAdmin):
     """Class for tabe Game."""
 
     model = Games
+    ordering = ['title', 'id']
     inlines = [GameClientInline, GameGenreInline]
 
 
@@ -31,6 +32,7 @@ class ClientAdmin(admin.ModelAdmin):
     """Class for table Client."""
 
     model = Client
+    ordering = ['nickname', 'id']
     inlines = [GameClientInline]
 
 
@@ -39,6 +41,7 @@ class CommentAdmin(admin.ModelAdmin):
     """Class fot table Comment."""
 
     model = Comment
+    ordering = ['-date_public', '-id']
 
 
 @admin.register(Genre)
@@ -7,3 +7,7 @@ class MyappConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        """Connect signal handlers."""
+        from . import signals  # noqa: F401
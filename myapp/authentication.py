@@ -0,0 +1,192 @@
+"""This module include cached authentication of the API."""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework import authentication
+from rest_framework.authtoken.models import Token
+
+# Fields of the user which never leave the database.
+SECRET_FIELDS = frozenset(('password',))
+
+
+class LocalTTLCache:
+    """Small thread-safe cache of one process with expiring entries."""
+
+    def __init__(self, timeout: float, max_size: int):
+        """Create empty cache.
+
+        Args:
+            timeout: seconds an entry is kept
+            max_size: number of entries, the oldest ones are dropped first
+        """
+        self.timeout = timeout
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """Take an entry which is not expired.
+
+        Args:
+            key: key of the entry
+            default: value returned when there is no entry
+
+        Returns:
+            cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                self._entries.pop(key)
+                return default
+            return entry[1]
+
+    def set(self, key, cached) -> None:
+        """Put an entry.
+
+        Args:
+            key: key of the entry
+            cached: value of the entry
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.timeout, cached)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        """Drop an entry.
+
+        Args:
+            key: key of the entry
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+tokens = LocalTTLCache(settings.AUTH_LOCAL_TIMEOUT, settings.AUTH_LOCAL_SIZE)
+passwords = LocalTTLCache(settings.AUTH_LOCAL_TIMEOUT, settings.AUTH_LOCAL_SIZE)
+
+
+def token_cache_key(key: str) -> str:
+    """Name the cache entries of a token without the token itself.
+
+    Args:
+        key: the token
+
+    Returns:
+        str: key of the entries in the caches
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'auth-token:{digest}'
+
+
+def forget_token(key: str) -> None:
+    """Drop a token from the caches of this process and the shared cache.
+
+    Other processes keep it for AUTH_LOCAL_TIMEOUT seconds at most.
+
+    Args:
+        key: the token
+    """
+    cache_key = token_cache_key(key)
+    tokens.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def _remembered(user, token) -> dict:
+    user_fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname not in SECRET_FIELDS
+    }
+    return {'user': user_fields, 'created': token.created}
+
+
+def _restored(key: str, remembered: dict) -> tuple:
+    user_model = get_user_model()
+    user_fields = remembered['user']
+    # The password is deferred, it is read from the database if it is ever used.
+    user = user_model.from_db(router.db_for_read(user_model), list(user_fields), list(user_fields.values()))
+    return (user, Token(key=key, user=user, created=remembered['created']))
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """Token authentication remembering resolved tokens.
+
+    The user is kept in the cache of the process for AUTH_LOCAL_TIMEOUT
+    seconds and in the shared cache for AUTH_CACHE_TIMEOUT seconds under
+    a digest of the token. Entries hold the fields of the user without
+    the password hash and no token, every request gets its own user
+    rebuilt from them. Signals drop entries when the token is deleted or
+    the user is saved. Queryset updates of users send no signals, so
+    call forget_token for the tokens of users deactivated that way, or
+    they are accepted until the entries expire.
+    """
+
+    def authenticate_credentials(self, key):
+        """Resolve a token from the caches or the database.
+
+        Args:
+            key: the token from the Authorization header
+
+        Returns:
+            tuple: the user and the token
+        """
+        cache_key = token_cache_key(key)
+        remembered = tokens.get(cache_key)
+        if remembered is None:
+            remembered = cache.get(cache_key)
+        if remembered is None:
+            remembered = _remembered(*super().authenticate_credentials(key))
+            cache.set(cache_key, remembered, settings.AUTH_CACHE_TIMEOUT)
+        tokens.set(cache_key, remembered)
+        return _restored(key, remembered)
+
+
+class CachedBasicAuthentication(authentication.BasicAuthentication):
+    """Basic authentication which hashes a password once per process.
+
+    Verified credentials are remembered in the cache of the process only,
+    as an HMAC of the password with the stored password hash, nothing is
+    put into the shared cache. A changed password changes the hash, so
+    old entries stop matching, and the user is still loaded on every
+    request, so deactivation applies at once, even by queryset updates.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        """Check credentials, PBKDF2 runs only for unknown ones.
+
+        Args:
+            userid: username from the Authorization header
+            password: password from the Authorization header
+            request: the HTTP request object
+
+        Returns:
+            tuple: the user and None
+        """
+        user_model = get_user_model()
+        user = user_model.objects.filter(**{user_model.USERNAME_FIELD: userid}).first()
+        if user is None or not user.is_active:
+            return super().authenticate_credentials(userid, password, request)
+        payload = f'{user.pk}:{user.password}:{password}'.encode()
+        digest = hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).digest()
+        if passwords.get(digest) == user.pk:
+            return (user, None)
+        credentials = super().authenticate_credentials(userid, password, request)
+        passwords.set(digest, user.pk)
+        return credentials
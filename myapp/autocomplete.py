@@ -0,0 +1,113 @@
+"""This module include in-memory prefix index of game titles."""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Games
+
+SUGGESTIONS_LIMIT = 10
+
+
+def normalize(title: str) -> str:
+    """Normalize title for prefix matching.
+
+    Args:
+        title: title of game or typed prefix
+
+    Returns:
+        str: casefolded title with single spaces
+    """
+    return ' '.join(title.casefold().split())
+
+
+class TitleIndex:
+    """Sorted array of normalized titles for prefix lookups.
+
+    The index is loaded from the database on the first lookup and then
+    kept up to date by signals on Games. Writes made by other processes
+    are picked up by a full reload after AUTOCOMPLETE_MAX_AGE seconds.
+    """
+
+    def __init__(self):
+        """Create empty index."""
+        self._lock = threading.RLock()
+        self._entries = []
+        self._keys = {}
+        self._loaded_at = None
+
+    def clear(self) -> None:
+        """Drop the index, it will be reloaded on the next lookup."""
+        with self._lock:
+            self._entries = []
+            self._keys = {}
+            self._loaded_at = None
+
+    def load(self) -> None:
+        """Rebuild the index from the database."""
+        rows = Games.objects.order_by().values_list('id', 'title')
+        entries = sorted((normalize(title), str(pk), title) for pk, title in rows)
+        with self._lock:
+            self._entries = entries
+            self._keys = {entry[1]: entry for entry in entries}
+            self._loaded_at = time.monotonic()
+
+    def add(self, pk, title: str) -> None:
+        """Add or replace title of a game.
+
+        Args:
+            pk: id of the game
+            title: title of the game
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._discard(str(pk))
+            entry = (normalize(title), str(pk), title)
+            bisect.insort(self._entries, entry)
+            self._keys[entry[1]] = entry
+
+    def remove(self, pk) -> None:
+        """Remove title of a game.
+
+        Args:
+            pk: id of the game
+        """
+        with self._lock:
+            self._discard(str(pk))
+
+    def suggest(self, prefix: str, limit: int = SUGGESTIONS_LIMIT) -> list[dict]:
+        """Find titles starting with prefix.
+
+        Args:
+            prefix: typed text
+            limit: max number of suggestions
+
+        Returns:
+            list: dicts with id and title of games
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.AUTOCOMPLETE_MAX_AGE:
+            self.load()
+        with self._lock:
+            start = bisect.bisect_left(self._entries, (key,))
+            found = []
+            for normalized, pk, title in self._entries[start:start + limit]:
+                if not normalized.startswith(key):
+                    break
+                found.append({'id': pk, 'title': title})
+        return found
+
+    def _discard(self, pk: str) -> None:
+        entry = self._keys.pop(pk, None)
+        if entry is None:
+            return
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            self._entries.pop(position)
+
+
+title_index = TitleIndex()
@@ -0,0 +1 @@
+"""This package include database backends."""
@@ -0,0 +1 @@
+"""This package include PostgreSQL backend with a pool of connections."""
@@ -0,0 +1,149 @@
+"""This module include PostgreSQL backend taking connections from a pool.
+
+Pool settings have the shape of OPTIONS['pool'] of Django 5.1: True or a
+dict of keyword arguments of psycopg_pool.ConnectionPool, so switching to
+the built-in backend later is a change of ENGINE only.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from .creation import DatabaseCreation
+
+POOL_OPTION = 'pool'
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def pool_stats() -> dict:
+    """Collect counters of the pools of this process.
+
+    Returns:
+        dict: counters of psycopg_pool by database alias, such as
+        requests_num (checkouts), requests_wait_ms and pool_available
+    """
+    with _lock:
+        opened = {alias: pool for alias, (_, pool) in _pools.items()}
+    return {alias: pool.get_stats() for alias, pool in opened.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend returning connections to a shared pool on close.
+
+    Threads of the process share one pool per alias. Connections keep
+    their session settings, so the search_path of OPTIONS is negotiated
+    once per pooled connection instead of once per request.
+    """
+
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        """Create the wrapper.
+
+        Args:
+            args: positional arguments of the base wrapper
+            kwargs: keyword arguments of the base wrapper
+        """
+        super().__init__(*args, **kwargs)
+        self._connection_pool = None
+
+    @property
+    def pool_options(self) -> dict | None:
+        """Keyword arguments of the pool from OPTIONS.
+
+        Raises:
+            ImproperlyConfigured: if connections are persistent as well
+
+        Returns:
+            dict: arguments of ConnectionPool or None if pooling is off
+        """
+        options = self.settings_dict['OPTIONS'].get(POOL_OPTION)
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Pooled connections require CONN_MAX_AGE = 0.')
+        pool_options = {} if options is True else dict(options)
+        if pool_options.pop('check', True):
+            pool_options['check'] = ConnectionPool.check_connection
+        return pool_options
+
+    @property
+    def pool(self) -> ConnectionPool | None:
+        """Take the pool of this alias, it is opened on first use.
+
+        Returns:
+            ConnectionPool: the pool or None if pooling is off
+        """
+        pool_options = self.pool_options
+        if pool_options is None:
+            return None
+        settings_dict = self.settings_dict
+        key = tuple(settings_dict[name] for name in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT'))
+        with _lock:
+            known_key, pool = _pools.get(self.alias, (None, None))
+            if known_key != key:
+                if pool is not None:
+                    pool.close()
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    name=self.alias,
+                    open=True,
+                    **pool_options,
+                )
+                _pools[self.alias] = (key, pool)
+        return pool
+
+    def close_pool(self) -> None:
+        """Close the pool of this alias and its connections."""
+        with _lock:
+            _, pool = _pools.pop(self.alias, (None, None))
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self) -> dict:
+        """Build arguments of psycopg.connect without the pool options.
+
+        Returns:
+            dict: connection parameters
+        """
+        conn_params = super().get_connection_params()
+        conn_params.pop(POOL_OPTION, None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        """Take a connection from the pool.
+
+        Args:
+            conn_params: connection parameters, used when pooling is off
+
+        Returns:
+            psycopg.Connection: the connection
+        """
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = IsolationLevel(isolation_level or IsolationLevel.READ_COMMITTED)
+        connection = pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        self._connection_pool = pool
+        return connection
+
+    def _close(self):
+        """Return the connection to its pool instead of closing it.
+
+        Returns:
+            result of closing the connection
+        """
+        pool = self._connection_pool
+        if self.connection is None or pool is None:
+            return super()._close()
+        self._connection_pool = None
+        with self.wrap_database_errors:
+            return pool.putconn(self.connection)
@@ -0,0 +1,16 @@
+"""This module include test database creation of the pooled backend."""
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Creation of test databases which releases pooled connections first."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        """Close the pool, idle connections would block DROP DATABASE.
+
+        Args:
+            test_database_name: name of the test database
+            verbosity: verbosity of the output
+        """
+        self.connection.close_pool()
+        super()._destroy_test_db(test_database_name, verbosity)
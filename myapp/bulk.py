@@ -0,0 +1,136 @@
+"""This module include batch writes of the API viewsets."""
+from functools import partial
+from types import MappingProxyType
+
+from django.conf import settings
+from django.db import transaction
+
+from .autocomplete import title_index
+from .cart import invalidate_carts_of
+from .clients import forget_client
+from .models import Client, GameGenre, Games
+from .versions import bump_object_versions, bump_version
+
+GENRES = 'genres'
+
+
+def _refresh_games(games) -> None:
+    for game in games:
+        title_index.add(game.pk, game.title)
+    game_ids = [written.pk for written in games]
+    bump_object_versions(Games, game_ids)
+    invalidate_carts_of(game_ids)
+
+
+def _forget_clients(clients) -> None:
+    for client in clients:
+        forget_client(client.pk, client.user_id)
+
+
+AFTER_COMMIT = MappingProxyType({
+    Games: _refresh_games,
+    Client: _forget_clients,
+})
+
+
+def _after_write(model, written: list) -> None:
+    """Do what signals of single saves do, bulk writes do not send them.
+
+    Args:
+        model: model class of the objects
+        written: written objects
+    """
+    transaction.on_commit(partial(bump_version, model))
+    hook = AFTER_COMMIT.get(model)
+    if hook is not None:
+        transaction.on_commit(partial(hook, written))
+
+
+def _existing_links(game_ids) -> dict:
+    rows = GameGenre.objects.filter(game__in=list(game_ids)).values_list('game_id', 'genre_id', 'id')
+    return {(game_id, genre_id): pk for game_id, genre_id, pk in rows}
+
+
+def _link_genres(links: dict, replace: bool) -> None:
+    """Write links of games to genres with one query per kind of change.
+
+    Args:
+        links: ids of genres by ids of games
+        replace: drop links of the games which are not listed
+    """
+    existing = _existing_links(links) if replace else {}
+    wanted = {(game_id, genre_id) for game_id, genre_ids in links.items() for genre_id in genre_ids}
+    stale = [pk for pair, pk in existing.items() if pair not in wanted]
+    if stale:
+        GameGenre.objects.filter(pk__in=stale).delete()
+    GameGenre.objects.bulk_create(
+        [GameGenre(game_id=game_id, genre_id=genre_id) for game_id, genre_id in sorted(wanted - set(existing))],
+        batch_size=settings.API_BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def _split_genres(attrs: dict) -> tuple[dict, list | None]:
+    attrs = dict(attrs)
+    return attrs, attrs.pop(GENRES, None)
+
+
+def _assign(instance, columns: dict) -> None:
+    for name, field_value in columns.items():
+        setattr(instance, name, field_value)
+
+
+def create_objects(model, rows: list[dict]) -> list:
+    """Insert validated rows with batched INSERTs.
+
+    Args:
+        model: model class
+        rows: validated data of the serializer
+
+    Returns:
+        list: created objects
+    """
+    links = {}
+    created = []
+    for attrs in rows:
+        columns, genre_ids = _split_genres(attrs)
+        instance = model(**columns)
+        if genre_ids is not None:
+            links[instance.pk] = genre_ids
+        created.append(instance)
+    with transaction.atomic():
+        model.objects.bulk_create(created, batch_size=settings.API_BULK_BATCH_SIZE)
+        if links:
+            _link_genres(links, replace=False)
+        _after_write(model, created)
+    return created
+
+
+def update_objects(model, instances: list, rows: list[dict]) -> list:
+    """Write validated rows into objects with batched UPDATEs.
+
+    Args:
+        model: model class
+        instances: objects in the order of rows
+        rows: validated data of the serializer
+
+    Returns:
+        list: updated objects
+    """
+    links = {}
+    fields = set()
+    auto_now = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    for instance, attrs in zip(instances, rows):
+        columns, genre_ids = _split_genres(attrs)
+        if genre_ids is not None:
+            links[instance.pk] = genre_ids
+        _assign(instance, columns)
+        fields.update(columns)
+        fields.update(field.attname for field in auto_now if field.pre_save(instance, add=False))
+    with transaction.atomic():
+        if fields:
+            model.objects.bulk_update(instances, sorted(fields), batch_size=settings.API_BULK_BATCH_SIZE)
+        if links:
+            _link_genres(links, replace=True)
+        _after_write(model, instances)
+    return instances
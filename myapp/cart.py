@@ -0,0 +1,204 @@
+"""This module include cart operations and the cached cart summary."""
+from decimal import Decimal
+from functools import partial
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .clients import forget_client
+from .models import Client, GameClient, Games
+from .routers import note_write
+from .versions import bump_version
+
+NO_MONEY = 'You have not money.'
+ADD_TO_CART = """
+INSERT INTO {cart} (id, game_id, client_id, in_cart, purchased)
+SELECT gen_random_uuid(), games.id, %s, true, false FROM {games} AS games WHERE games.id = ANY(%s)
+ON CONFLICT (game_id, client_id) DO UPDATE SET in_cart = true
+"""
+EMPTY_CART = MappingProxyType({'count': 0, 'total': Decimal(0), 'game_ids': ()})
+
+
+def _cart_key(client_id) -> str:
+    return f'cart:{client_id}'
+
+
+def _summarize(rows) -> dict:
+    game_ids = []
+    total = Decimal(0)
+    for game_id, price in rows:
+        game_ids.append(str(game_id))
+        total += price
+    return {'count': len(game_ids), 'total': total, 'game_ids': game_ids}
+
+
+def cart_summary(client_id) -> dict:
+    """Count games in the cart of a client.
+
+    Args:
+        client_id: id of the client
+
+    Returns:
+        dict: count, total price and ids of games in the cart
+    """
+    if client_id is None:
+        return EMPTY_CART
+    key = _cart_key(client_id)
+    summary = cache.get(key)
+    if summary is None:
+        rows = GameClient.objects.filter(client=client_id, in_cart=True).values_list('game_id', 'game__price')
+        summary = _summarize(rows)
+        cache.set(key, summary, settings.CART_CACHE_TIMEOUT)
+    return summary
+
+
+async def acart_summary(client_id) -> dict:
+    """Count games in the cart of a client like cart_summary in async views.
+
+    Args:
+        client_id: id of the client
+
+    Returns:
+        dict: count, total price and ids of games in the cart
+    """
+    if client_id is None:
+        return EMPTY_CART
+    key = _cart_key(client_id)
+    summary = await cache.aget(key)
+    if summary is None:
+        rows = GameClient.objects.filter(client=client_id, in_cart=True).values_list('game_id', 'game__price')
+        summary = _summarize([row async for row in rows])
+        await cache.aset(key, summary, settings.CART_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_cart(client_id) -> None:
+    """Drop the cached summary of the cart of a client.
+
+    Args:
+        client_id: id of the client
+    """
+    cache.delete(_cart_key(client_id))
+
+
+def invalidate_carts_of(game_ids) -> None:
+    """Drop cached summaries of carts holding games with changed prices.
+
+    Holders are looked up at once, rows of deleted games are still there
+    before the transaction ends, summaries are dropped on commit.
+
+    Args:
+        game_ids: ids of changed or deleted games
+    """
+    holders = GameClient.objects.filter(game__in=list(game_ids), in_cart=True).values_list('client_id', flat=True)
+    keys = {_cart_key(client_id) for client_id in holders}
+    if keys:
+        transaction.on_commit(partial(cache.delete_many, list(keys)))
+
+
+def add_to_cart(client_id, game_ids) -> int:
+    """Put games into the cart of a client with one INSERT ... ON CONFLICT.
+
+    Args:
+        client_id: id of the client
+        game_ids: ids of games, missing games are skipped
+
+    Returns:
+        int: number of games in the cart among game_ids
+    """
+    sql = ADD_TO_CART.format(cart=GameClient._meta.db_table, games=Games._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [client_id, list(game_ids)])
+        added = cursor.rowcount
+    note_write()
+    invalidate_cart(client_id)
+    return added
+
+
+def remove_from_cart(client_id, game_ids) -> int:
+    """Take games out of the cart of a client with one UPDATE.
+
+    Args:
+        client_id: id of the client
+        game_ids: ids of games
+
+    Returns:
+        int: number of games taken out of the cart
+    """
+    removed = GameClient.objects.filter(client=client_id, game__in=list(game_ids), in_cart=True).update(in_cart=False)
+    invalidate_cart(client_id)
+    return removed
+
+
+def _charge(client_id, total: Decimal) -> bool:
+    client = Client.objects.filter(pk=client_id, money__gte=total)
+    charged = client.update(money=models.F('money') - total) > 0
+    transaction.on_commit(partial(forget_client, client_id))
+    transaction.on_commit(partial(bump_version, Client))
+    return charged
+
+
+def checkout(client_id) -> int:
+    """Buy every game in the cart of a client in one transaction.
+
+    Cart rows are locked (the price comes from a subquery, so rows of
+    games are not locked), the balance is taken by one conditional UPDATE
+    and the rows are flipped to purchased by one more, so the number of
+    queries does not depend on the size of the cart and parallel
+    checkouts can not overdraw the balance.
+
+    Args:
+        client_id: id of the client
+
+    Raises:
+        ValidationError: if the client does not have enough money
+
+    Returns:
+        int: number of bought games
+    """
+    price = Games.objects.filter(pk=models.OuterRef('game')).order_by().values('price')
+    cart = GameClient.objects.select_for_update().filter(client=client_id, in_cart=True)
+    with transaction.atomic():
+        rows = list(cart.annotate(price=models.Subquery(price)).values_list('id', 'price', 'purchased'))
+        if not rows:
+            return 0
+        total = sum((price for _, price, purchased in rows if not purchased), Decimal(0))
+        if not _charge(client_id, total):
+            raise ValidationError(NO_MONEY)
+        bought = GameClient.objects.filter(pk__in=[row[0] for row in rows])
+        # Games bought before keep the moment of their purchase.
+        purchased_at = models.Case(models.When(purchased=False, then=Now()), default=models.F('purchased_at'))
+        bought.update(in_cart=False, purchased=True, purchased_at=purchased_at)
+    invalidate_cart(client_id)
+    return len(rows)
+
+
+def buy(client_id, game_id) -> None:
+    """Buy one game for a client in one transaction.
+
+    Args:
+        client_id: id of the client
+        game_id: id of the game
+
+    Raises:
+        DoesNotExist: if the game does not exist
+        ValidationError: if the client does not have enough money
+    """
+    with transaction.atomic():
+        price = Games.objects.filter(pk=game_id).order_by('pk').values_list('price', flat=True).first()
+        if price is None:
+            raise Games.DoesNotExist
+        if not _charge(client_id, price):
+            raise ValidationError(NO_MONEY)
+        GameClient.objects.bulk_create(
+            [GameClient(client_id=client_id, game_id=game_id, in_cart=False, purchased=True, purchased_at=timezone.now())],
+            update_conflicts=True,
+            unique_fields=['game', 'client'],
+            update_fields=['in_cart', 'purchased', 'purchased_at'],
+        )
+    invalidate_cart(client_id)
@@ -0,0 +1,123 @@
+"""This module include cached lookup of clients of users."""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Client
+
+
+def _client_id_key(user_id) -> str:
+    return f'client-id:{user_id}'
+
+
+def _client_key(client_id) -> str:
+    return f'client:{client_id}'
+
+
+def client_id_for_user(user_id):
+    """Find id of the client of a user.
+
+    Args:
+        user_id: id of the user
+
+    Returns:
+        id of the client or None if the user has no client
+    """
+    key = _client_id_key(user_id)
+    client_id = cache.get(key)
+    if client_id is None:
+        client_id = Client.objects.filter(user=user_id).order_by('pk').values_list('id', flat=True).first()
+        cache.set(key, client_id or '', settings.CLIENT_CACHE_TIMEOUT)
+    return client_id or None
+
+
+def client_for_user(user_id) -> Client | None:
+    """Load the client of a user from the cache or the database.
+
+    Args:
+        user_id: id of the user
+
+    Returns:
+        Client or None if the user has no client
+    """
+    return client_by_id(client_id_for_user(user_id))
+
+
+def client_by_id(client_id) -> Client | None:
+    """Load a client from the cache or the database.
+
+    Args:
+        client_id: id of the client or None
+
+    Returns:
+        Client or None if there is no such client
+    """
+    if client_id is None:
+        return None
+    key = _client_key(client_id)
+    client = cache.get(key)
+    if client is None:
+        client = Client.objects.filter(pk=client_id).first()
+        cache.set(key, client, settings.CLIENT_CACHE_TIMEOUT)
+    return client
+
+
+async def aclient_id_for_user(user_id):
+    """Find id of the client of a user like client_id_for_user in async views.
+
+    Args:
+        user_id: id of the user
+
+    Returns:
+        id of the client or None if the user has no client
+    """
+    key = _client_id_key(user_id)
+    client_id = await cache.aget(key)
+    if client_id is None:
+        ids = Client.objects.filter(user=user_id).order_by('pk').values_list('id', flat=True)
+        client_id = await ids.afirst()
+        await cache.aset(key, client_id or '', settings.CLIENT_CACHE_TIMEOUT)
+    return client_id or None
+
+
+async def aclient_for_user(user_id) -> Client | None:
+    """Load the client of a user like client_for_user in async views.
+
+    Args:
+        user_id: id of the user
+
+    Returns:
+        Client or None if the user has no client
+    """
+    return await aclient_by_id(await aclient_id_for_user(user_id))
+
+
+async def aclient_by_id(client_id) -> Client | None:
+    """Load a client like client_by_id in async views.
+
+    Args:
+        client_id: id of the client or None
+
+    Returns:
+        Client or None if there is no such client
+    """
+    if client_id is None:
+        return None
+    key = _client_key(client_id)
+    client = await cache.aget(key)
+    if client is None:
+        client = await Client.objects.filter(pk=client_id).afirst()
+        await cache.aset(key, client, settings.CLIENT_CACHE_TIMEOUT)
+    return client
+
+
+def forget_client(client_id, user_id=None) -> None:
+    """Drop the cached client and the cached client id of its user.
+
+    Args:
+        client_id: id of the client
+        user_id: id of the user of the client
+    """
+    keys = [_client_key(client_id)]
+    if user_id is not None:
+        keys.append(_client_id_key(user_id))
+    cache.delete_many(keys)
@@ -1,18 +1,35 @@
 """This module include function for cart."""
-from .models import GameClient
+from django.conf import settings
+
+from .cart import EMPTY_CART, cart_summary
 
 
 def cart_count(request):
     """Check that the registered user can add products to the cart.
 
+    The summary of the cart is cached, so a render usually runs no queries.
+    Async views load it beforehand as request.cart_summary.
+
+    Args:
+        request: request
+
+    Returns:
+        dict with count and total price of games in the cart
+    """
+    summary = getattr(request, 'cart_summary', None)
+    client = getattr(request, 'client', None)
+    if summary is None:
+        summary = cart_summary(client.id) if client else EMPTY_CART
+    return {'cart_count': summary['count'], 'cart_total': summary['total']}
+
+
+def fragment_cache(request):
+    """Give templates the timeout of cached fragments.
+
     Args:
         request: request
 
     Returns:
-        dict with wrong answer
+        dict with the timeout in seconds
     """
-    if request.user.is_authenticated:
-        return {
-            'cart_count': GameClient.objects.filter(client__user=request.user, in_cart=True).count(),
-        }
-    return {'cart_count': 0}
+    return {'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT}
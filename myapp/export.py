@@ -0,0 +1,199 @@
+"""This module include streaming export of games, comments and purchases."""
+import csv
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime
+from types import MappingProxyType
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from rest_framework import renderers, serializers
+
+from .models import Comment, GameClient, Games
+
+LIST_SEPARATOR = '|'
+SINCE_PARAM = 'since'
+
+
+class _Echo:
+    """File-like object returning written lines instead of keeping them."""
+
+    def write(self, line: str) -> str:
+        """Return the line to the caller.
+
+        Args:
+            line: formatted line
+
+        Returns:
+            str: the same line
+        """
+        return line
+
+
+def _csv_cell(cell):
+    if isinstance(cell, list):
+        return LIST_SEPARATOR.join(str(part) for part in cell)
+    if isinstance(cell, (date, datetime)):
+        return cell.isoformat()
+    return cell
+
+
+def csv_lines(headers: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    """Format rows as CSV lines, the header goes first.
+
+    Args:
+        headers: names of the columns
+        rows: tuples of cells
+
+    Yields:
+        str: one line of CSV
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    yield from (writer.writerow([_csv_cell(cell) for cell in row]) for row in rows)
+
+
+def ndjson_lines(headers: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    """Format rows as newline delimited JSON objects.
+
+    Args:
+        headers: names of the keys
+        rows: tuples of values
+
+    Yields:
+        str: one JSON object with a line break
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        line = encoder.encode(dict(zip(headers, row)))
+        yield f'{line}\n'
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Renderer of errors of the NDJSON export, rows are streamed by the view."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def lines(self, headers: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+        """Format rows in the format of the renderer.
+
+        Args:
+            headers: names of the columns
+            rows: tuples of cells
+
+        Returns:
+            iterator over formatted lines
+        """
+        return ndjson_lines(headers, rows)
+
+    def render(self, error, accepted_media_type=None, renderer_context=None) -> bytes:
+        """Render error details as one row.
+
+        Args:
+            error: error details
+            accepted_media_type: negotiated media type
+            renderer_context: context of the view
+
+        Returns:
+            bytes: rendered details
+        """
+        details = error if isinstance(error, dict) else {'detail': error}
+        return ''.join(self.lines(tuple(details), [tuple(details.values())])).encode()
+
+
+class CSVRenderer(NDJSONRenderer):
+    """Renderer of errors of the CSV export, rows are streamed by the view."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def lines(self, headers: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+        """Format rows in the format of the renderer.
+
+        Args:
+            headers: names of the columns
+            rows: tuples of cells
+
+        Returns:
+            iterator over formatted lines
+        """
+        return csv_lines(headers, rows)
+
+
+def parse_since(raw: str | None) -> datetime | None:
+    """Parse the since parameter of an incremental pull.
+
+    Args:
+        raw: ISO date or date and time, naive values are in the current time zone
+
+    Raises:
+        ValidationError: if the value is not a valid date
+
+    Returns:
+        datetime: aware moment or None if the parameter is missing
+    """
+    if not raw:
+        return None
+    try:
+        moment = datetime.fromisoformat(raw)
+    except ValueError:
+        raise serializers.ValidationError({SINCE_PARAM: 'Expected ISO 8601 date or date and time.'})
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+@dataclass(frozen=True)
+class Export:
+    """Exported resource: columns, query and the column of incremental pulls."""
+
+    headers: tuple[str, ...]
+    columns: tuple[str, ...]
+    since_field: str
+    queryset: models.QuerySet
+
+    def rows(self, since: datetime | None = None) -> Iterator[tuple]:
+        """Read rows with a server-side cursor, oldest changes first.
+
+        Args:
+            since: take only rows changed at or after this moment
+
+        Returns:
+            iterator over tuples of cells
+        """
+        queryset = self.queryset.order_by(self.since_field, 'id')
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.since_field}__gte': since})
+        return queryset.values_list(*self.columns).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+EXPORTS = MappingProxyType({
+    'games': Export(
+        headers=('id', 'title', 'price', 'rating_avg', 'rating_count', 'genres', 'updated_at'),
+        columns=('id', 'title', 'price', 'rating_avg', 'rating_count', 'genre_titles', 'updated_at'),
+        since_field='updated_at',
+        queryset=Games.objects.annotate(
+            genre_titles=ArrayAgg(
+                'genres__title',
+                distinct=True,
+                filter=models.Q(genres__isnull=False),
+                default=models.Value([]),
+            ),
+        ),
+    ),
+    'comments': Export(
+        headers=('id', 'game_id', 'client_id', 'description', 'estimation', 'date_public', 'updated_at'),
+        columns=('id', 'game_id', 'client_id', 'description', 'estimation', 'date_public', 'updated_at'),
+        since_field='updated_at',
+        queryset=Comment.objects.all(),
+    ),
+    'purchases': Export(
+        headers=('id', 'game_id', 'client_id', 'purchased_at'),
+        columns=('id', 'game_id', 'client_id', 'purchased_at'),
+        since_field='purchased_at',
+        queryset=GameClient.objects.filter(purchased=True),
+    ),
+})
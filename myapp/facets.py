@@ -0,0 +1,159 @@
+"""This module include genre facets of the catalog."""
+from contextlib import suppress
+from dataclasses import dataclass
+from uuid import UUID
+
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
+
+from .models import GameGenre, Games, Genre, GenreFacet
+
+# The same buckets as games_data.price_bucket() of migration 0014.
+PRICE_BUCKET_WIDTH = 10
+PRICE_BUCKETS = 8
+LAST_BUCKET = PRICE_BUCKETS - 1
+GENRE_PARAM = 'genre'
+PRICE_FROM_PARAM = 'price_from'
+PRICE_TO_PARAM = 'price_to'
+COUNT_FACETS = """
+INSERT INTO {facets} (id, genre_id, price_bucket, games_count)
+SELECT gen_random_uuid(), link.genre_id, games_data.price_bucket(game.price), count(*)
+FROM {links} AS link JOIN {games} AS game ON game.id = link.game_id
+GROUP BY 2, 3
+"""
+REBUILD = (
+    # Triggers of concurrent writes wait for the rebuild, so their changes are not lost.
+    'LOCK TABLE {facets} IN EXCLUSIVE MODE',
+    'DELETE FROM {facets}',
+    COUNT_FACETS,
+)
+
+
+def bucket_label(bucket: int) -> str:
+    """Describe prices of a bucket.
+
+    Args:
+        bucket: number of the bucket
+
+    Returns:
+        str: range of prices
+    """
+    low = bucket * PRICE_BUCKET_WIDTH
+    if bucket == LAST_BUCKET:
+        return f'{low}+'
+    high = low + PRICE_BUCKET_WIDTH
+    return f'{low}-{high}'
+
+
+PRICE_RANGES = tuple((bucket, bucket_label(bucket)) for bucket in range(PRICE_BUCKETS))
+
+
+def _bucket(raw, default: int) -> int:
+    with suppress(TypeError, ValueError):
+        return min(max(int(raw), 0), LAST_BUCKET)
+    return default
+
+
+def _genre_ids(raw_ids: list[str]) -> tuple[UUID, ...]:
+    genre_ids = []
+    for raw in raw_ids:
+        with suppress(ValueError):
+            genre_ids.append(UUID(raw))
+    return tuple(dict.fromkeys(genre_ids))
+
+
+@dataclass(frozen=True)
+class FacetQuery:
+    """Genres and price buckets selected by the user.
+
+    Games match when they have any of the selected genres, no genres
+    select all games. Counts of a genre do not depend on the selected
+    genres, they are the games the genre would add.
+    """
+
+    genre_ids: tuple[UUID, ...] = ()
+    price_from: int = 0
+    price_to: int = LAST_BUCKET
+
+    @classmethod
+    def from_params(cls, query_params) -> 'FacetQuery':
+        """Read the selection from query parameters, broken values are ignored.
+
+        Args:
+            query_params: GET parameters with genre ids, price_from and price_to buckets
+
+        Returns:
+            FacetQuery: the selection
+        """
+        low = _bucket(query_params.get(PRICE_FROM_PARAM), 0)
+        high = _bucket(query_params.get(PRICE_TO_PARAM), LAST_BUCKET)
+        return cls(_genre_ids(query_params.getlist(GENRE_PARAM)), min(low, high), max(low, high))
+
+    def selection(self) -> list[tuple[str, str]]:
+        """Write the selection back as query parameters.
+
+        Returns:
+            list: names and values of the parameters
+        """
+        selection = [(GENRE_PARAM, str(genre_id)) for genre_id in self.genre_ids]
+        selection.append((PRICE_FROM_PARAM, str(self.price_from)))
+        selection.append((PRICE_TO_PARAM, str(self.price_to)))
+        return selection
+
+    def games(self, queryset: models.QuerySet) -> models.QuerySet:
+        """Keep games in the price buckets with any of the selected genres.
+
+        Args:
+            queryset: games
+
+        Returns:
+            QuerySet: matched games
+        """
+        if self.price_from > 0:
+            queryset = queryset.filter(price__gte=self.price_from * PRICE_BUCKET_WIDTH)
+        if self.price_to < LAST_BUCKET:
+            queryset = queryset.filter(price__lt=(self.price_to + 1) * PRICE_BUCKET_WIDTH)
+        if self.genre_ids:
+            links = GameGenre.objects.filter(game=models.OuterRef('pk'), genre__in=self.genre_ids)
+            queryset = queryset.filter(models.Exists(links))
+        return queryset
+
+    def genre_counts(self) -> models.QuerySet:
+        """Count games of every genre in the price buckets with one query of the facet table.
+
+        Returns:
+            QuerySet: genres with games_count
+        """
+        in_range = models.Q(facets__price_bucket__range=(self.price_from, self.price_to))
+        return Genre.objects.annotate(
+            games_count=Coalesce(models.Sum('facets__games_count', filter=in_range), 0),
+        ).order_by('title', 'id')
+
+    async def agenre_counts(self) -> list:
+        """Count games of every genre like genre_counts in async views.
+
+        Returns:
+            list: genres with games_count
+        """
+        return [genre async for genre in self.genre_counts()]
+
+
+def rebuild_facets() -> int:
+    """Count games of all genres and price buckets again.
+
+    The triggers keep the counts, a rebuild repairs them after writes
+    which skip triggers, like TRUNCATE or restored dumps.
+
+    Returns:
+        int: number of facet rows
+    """
+    tables = {
+        'facets': GenreFacet._meta.db_table,
+        'links': GameGenre._meta.db_table,
+        'games': Games._meta.db_table,
+    }
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for statement in REBUILD:
+                cursor.execute(statement.format(**tables))
+            return cursor.rowcount
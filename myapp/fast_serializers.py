@@ -0,0 +1,120 @@
+"""This module include read-only serialization of .values() rows."""
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import partial
+from operator import methodcaller
+from types import MappingProxyType
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+ISO_DATE_FORMAT = '%Y-%m-%d'
+PADDED_YEAR = 1000
+
+
+def _decimal_text(field, exponent: int, number):
+    if isinstance(number, Decimal) and number.as_tuple().exponent == exponent:
+        return format(number, 'f')
+    return field.to_representation(number)
+
+
+def _decimal_converter(field):
+    coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    return partial(_decimal_text, field, -field.decimal_places)
+
+
+def _date_text(day):
+    if day.year >= PADDED_YEAR:
+        return day.isoformat()
+    return day.strftime(ISO_DATE_FORMAT)
+
+
+def _date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None:
+        return field.to_representation
+    if output_format.lower() == ISO_8601:
+        return methodcaller('isoformat')
+    if output_format == ISO_DATE_FORMAT:
+        return _date_text
+    return methodcaller('strftime', output_format)
+
+
+def _choice_value(choices: dict, choice):
+    return choices.get(str(choice), choice)
+
+
+def _choice_converter(field):
+    return partial(_choice_value, field.choice_strings_to_values)
+
+
+def _uuid_converter(field):
+    return str if field.uuid_format == 'hex_verbose' else field.to_representation
+
+
+CONVERTERS = MappingProxyType({
+    serializers.CharField: lambda _: str,
+    serializers.IntegerField: lambda _: int,
+    serializers.BooleanField: lambda _: bool,
+    serializers.ChoiceField: _choice_converter,
+    serializers.UUIDField: _uuid_converter,
+    serializers.DecimalField: _decimal_converter,
+    serializers.DateField: _date_converter,
+})
+
+
+@dataclass(frozen=True)
+class ValuesPlan:
+    """Precomputed converters of the fields of a serializer."""
+
+    columns: tuple
+
+    @property
+    def sources(self) -> list[str]:
+        """Names of model fields to select with .values().
+
+        Returns:
+            list: names of the columns
+        """
+        return [source for _, source, _ in self.columns]
+
+    def serialize(self, rows) -> list[dict]:
+        """Convert .values() rows like the serializer converts objects.
+
+        Args:
+            rows: dicts made by values() of the sources
+
+        Returns:
+            list: representation of the rows
+        """
+        columns = self.columns
+        return [
+            {
+                name: None if row[source] is None else convert(row[source])
+                for name, source, convert in columns
+            }
+            for row in rows
+        ]
+
+
+def values_plan(serializer) -> ValuesPlan | None:
+    """Plan fast serialization for a serializer of plain model columns.
+
+    Args:
+        serializer: serializer instance, its fields are already trimmed
+
+    Returns:
+        ValuesPlan: converters of the fields or None if a field needs the object
+    """
+    model_fields = {column.name for column in serializer.Meta.model._meta.concrete_fields}
+    columns = []
+    for name, field in serializer.fields.items():
+        factory = CONVERTERS.get(type(field))
+        if field.write_only:
+            continue
+        if factory is None or field.source not in model_fields:
+            return None
+        columns.append((name, field.source, factory(field)))
+    return ValuesPlan(columns=tuple(columns))
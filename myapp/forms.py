@@ -3,7 +3,7 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.forms import CharField, ModelForm
 
-from .models import Games
+from .models import Comment, Games
 
 
 class RegistrationForm(UserCreationForm):
@@ -28,3 +28,13 @@ class GameForm(ModelForm):
 
         model = Games
         fields = ['title', 'price', 'genres']
+
+
+class CommentForm(ModelForm):
+    """Forms for CommentForm."""
+
+    class Meta:
+        """Class Meta about Comment Form."""
+
+        model = Comment
+        fields = ['description', 'estimation']
@@ -0,0 +1,332 @@
+"""This module include bulk import of the store through COPY and staging tables."""
+import csv
+import json
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from types import MappingProxyType
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .cart import invalidate_carts_of
+from .clients import forget_client
+from .export import LIST_SEPARATOR
+from .models import GAMES_GENRE, Client, Comment, GameGenre, Games, Genre
+from .ratings import reconcile_ratings
+from .versions import bump_object_versions, bump_version
+
+COPY_CHUNK_SIZE = 65536
+CSV_SUFFIXES = frozenset(('.csv',))
+JSONL_SUFFIXES = frozenset(('.jsonl', '.ndjson'))
+GENRES = 'genres'
+# Blank ids of a file are NULL, they are generated after COPY.
+ID = 'uuid UNIQUE DEFAULT gen_random_uuid()'
+GENRE_TITLES = ', '.join(f"'{title}'" for title, _ in GAMES_GENRE)
+
+CREATE_STAGING = 'DROP TABLE IF EXISTS {staging}; CREATE TEMP TABLE {staging} ({columns}) ON COMMIT DROP'
+COPY_CSV = 'COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, HEADER true)'
+COPY_ROWS = 'COPY {staging} ({columns}) FROM STDIN'
+FILL_IDS = 'UPDATE {staging} SET id = gen_random_uuid() WHERE id IS NULL'
+UPSERT = """
+INSERT INTO {table} ({columns}) SELECT {values} FROM {staging}
+ON CONFLICT (id) DO UPDATE SET {updates}
+RETURNING {returning}
+"""
+ADD_GENRES = """
+INSERT INTO {genre} (id, title)
+SELECT gen_random_uuid(), wanted.title
+FROM (SELECT DISTINCT unnest(string_to_array(genres, '{separator}')) AS title FROM {staging}) AS wanted
+WHERE NOT EXISTS (SELECT 1 FROM {genre} AS genre WHERE genre.title = wanted.title)
+"""
+DROP_LINKS = """
+DELETE FROM {links} AS link USING {staging} AS staged, {genre} AS genre
+WHERE link.game_id = staged.id AND genre.id = link.genre_id
+AND genre.title <> ALL(string_to_array(coalesce(staged.genres, ''), '{separator}'))
+"""
+ADD_LINKS = """
+INSERT INTO {links} (id, game_id, genre_id)
+SELECT gen_random_uuid(), staged.id, genre.id
+FROM {staging} AS staged JOIN {genre} AS genre ON genre.title = ANY(string_to_array(staged.genres, '{separator}'))
+ON CONFLICT (game_id, genre_id) DO NOTHING
+"""
+PREVIOUS_GAMES = """
+SELECT DISTINCT stored.game_id FROM {table} AS stored JOIN {staging} AS staged ON staged.id = stored.id
+WHERE stored.game_id IS NOT NULL
+"""
+
+
+def _after_games(rows: list[tuple]) -> None:
+    # Autocomplete indexes of the web processes reload after AUTOCOMPLETE_MAX_AGE.
+    bump_version(Games, Genre, GameGenre)
+    game_ids = [row[0] for row in rows]
+    bump_object_versions(Games, game_ids)
+    invalidate_carts_of(game_ids)
+
+
+def _after_clients(rows: list[tuple]) -> None:
+    bump_version(Client)
+    for client_id, user_id in rows:
+        forget_client(client_id, user_id)
+
+
+def _game_ids(rows: list[tuple]) -> list:
+    return list({row[0] for row in rows if row[0] is not None})
+
+
+def _after_comments(rows: list[tuple]) -> None:
+    bump_version(Comment, Games)
+    bump_object_versions(Games, _game_ids(rows))
+
+
+@dataclass(frozen=True)
+class Staging:
+    """Temporary table receiving one file before it is merged into a table of the store.
+
+    Columns carry the checks of the model validators as SQL constraints,
+    so COPY rejects the whole file on the first invalid row. Columns
+    which are not columns of the model, like genres of games, are only
+    read by the follow-up statements. The previous query reads the
+    returned columns of rows before the upsert overwrites them, the
+    after_commit hook gets both.
+    """
+
+    name: str
+    model: type
+    columns: Mapping[str, str]
+    returning: tuple[str, ...]
+    after_commit: Callable[[list[tuple]], None]
+    inserted: Mapping[str, str] = field(default_factory=dict)
+    updated: Mapping[str, str] = field(default_factory=dict)
+    followups: Mapping[str, tuple[str, ...]] = field(default_factory=dict)
+    previous: str = ''
+
+    @property
+    def table(self) -> str:
+        """Name of the staging table.
+
+        Returns:
+            str: name of the temporary table
+        """
+        return f'import_{self.name}'
+
+    def copied(self, columns: Iterable[str]) -> list[str]:
+        """Check the columns of a file.
+
+        Args:
+            columns: names of the columns of the file
+
+        Raises:
+            ValidationError: if a column is unknown or repeated
+
+        Returns:
+            list: the columns in the order of the file
+        """
+        columns = list(columns)
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown or len(set(columns)) != len(columns):
+            raise ValidationError(
+                'Columns of %(name)s must be distinct names of %(known)s, got %(columns)s.',
+                params={'name': self.name, 'known': ', '.join(self.columns), 'columns': ', '.join(columns)},
+            )
+        return columns
+
+    def upsert(self, columns: list[str]) -> str:
+        """Write the statement merging the staging table into the table of the model.
+
+        Args:
+            columns: columns of the file, only they are updated in existing rows
+
+        Returns:
+            str: INSERT ... ON CONFLICT statement
+        """
+        stored = {column.column for column in self.model._meta.concrete_fields}
+        selected = {column: column for column in self.columns if column in stored}
+        selected.update(self.inserted)
+        selected.update(self.updated)
+        updates = [f'{column} = EXCLUDED.{column}' for column in columns if column in stored and column != 'id']
+        updates.extend(f'{column} = EXCLUDED.{column}' for column in self.updated)
+        return UPSERT.format(
+            table=self.model._meta.db_table,
+            columns=', '.join(selected),
+            values=', '.join(selected.values()),
+            staging=self.table,
+            updates=', '.join(updates or ['id = EXCLUDED.id']),
+            returning=', '.join(self.returning),
+        )
+
+    def load(self, cursor, path: Path) -> tuple[list[tuple], list[tuple]]:
+        """Copy a file into the staging table and merge it into the store.
+
+        Args:
+            cursor: cursor of the default database
+            path: CSV or JSON lines file
+
+        Returns:
+            tuple: returned columns of the written rows and of the overwritten ones
+        """
+        cursor.execute(CREATE_STAGING.format(
+            staging=self.table,
+            columns=', '.join(f'{column} {definition}' for column, definition in self.columns.items()),
+        ))
+        with connection.wrap_database_errors:
+            columns = copy_file(cursor, self, path)
+        cursor.execute(FILL_IDS.format(staging=self.table))
+        previous = []
+        if self.previous:
+            cursor.execute(self.previous.format(table=self.model._meta.db_table, staging=self.table))
+            previous = cursor.fetchall()
+        cursor.execute(self.upsert(columns))
+        written = cursor.fetchall()
+        for column in columns:
+            for statement in self.followups.get(column, ()):
+                cursor.execute(statement.format(staging=self.table))
+        return written, previous
+
+
+def _cell(cell):
+    if isinstance(cell, list):
+        return LIST_SEPARATOR.join(str(part) for part in cell)
+    return cell
+
+
+def _copy_csv(cursor, staging: Staging, source) -> list[str]:
+    header = source.readline()
+    columns = staging.copied(next(csv.reader([header]), []))
+    with cursor.copy(COPY_CSV.format(staging=staging.table, columns=', '.join(columns))) as copy:
+        copy.write(header)
+        for chunk in iter(partial(source.read, COPY_CHUNK_SIZE), ''):
+            copy.write(chunk)
+    return columns
+
+
+def _copy_lines(cursor, staging: Staging, source) -> list[str]:
+    rows = (json.loads(line) for line in source if line.strip())
+    first = next(rows, {})
+    columns = staging.copied(first)
+    with cursor.copy(COPY_ROWS.format(staging=staging.table, columns=', '.join(columns))) as copy:
+        for row in chain([first], rows):
+            copy.write_row([_cell(row.get(column)) for column in columns])
+    return columns
+
+
+def copy_file(cursor, staging: Staging, path: Path) -> list[str]:
+    """Stream a file into the staging table with the COPY protocol.
+
+    CSV files are passed to the server as they are, the header names the
+    columns. Every line of a JSON lines file is an object, the keys of
+    the first one name the columns.
+
+    Args:
+        cursor: cursor of the default database
+        staging: staging table of the file
+        path: CSV or JSON lines file
+
+    Raises:
+        ValidationError: if the format of the file is unknown
+
+    Returns:
+        list: columns of the file
+    """
+    suffix = path.suffix.lower()
+    if suffix not in CSV_SUFFIXES | JSONL_SUFFIXES:
+        raise ValidationError('Unknown format of %(path)s, use CSV or JSON lines.', params={'path': path})
+    copy = _copy_csv if suffix in CSV_SUFFIXES else _copy_lines
+    with path.open(encoding='utf-8', newline='') as source:
+        return copy(cursor, staging, source)
+
+
+def _links(statement: str) -> str:
+    return statement.format(
+        genre=Genre._meta.db_table,
+        links=GameGenre._meta.db_table,
+        separator=LIST_SEPARATOR,
+        staging='{staging}',
+    )
+
+
+STAGINGS = MappingProxyType({
+    'games': Staging(
+        name='games',
+        model=Games,
+        columns=MappingProxyType({
+            'id': ID,
+            'title': "text NOT NULL CONSTRAINT check_title CHECK (title <> '')",
+            'price': 'numeric(10, 2) NOT NULL DEFAULT 0 CONSTRAINT check_price CHECK (price >= 0)',
+            GENRES: 'text CONSTRAINT check_genres CHECK (string_to_array(genres, {0}) <@ ARRAY[{1}])'.format(
+                f"'{LIST_SEPARATOR}'", GENRE_TITLES,
+            ),
+        }),
+        returning=('id',),
+        after_commit=_after_games,
+        inserted=MappingProxyType({'rating_sum': '0', 'rating_count': '0', 'rating_avg': '0'}),
+        updated=MappingProxyType({'updated_at': 'now()'}),
+        followups=MappingProxyType({GENRES: tuple(map(_links, (ADD_GENRES, DROP_LINKS, ADD_LINKS)))}),
+    ),
+    'clients': Staging(
+        name='clients',
+        model=Client,
+        columns=MappingProxyType({
+            'id': ID,
+            'nickname': "text NOT NULL CONSTRAINT check_nickname CHECK (nickname <> '')",
+            'money': 'numeric(10, 2) NOT NULL DEFAULT 0 CONSTRAINT check_money CHECK (money >= 0)',
+            'date_registrate': ' '.join((
+                'date NOT NULL DEFAULT current_date',
+                'CONSTRAINT check_date_created CHECK (date_registrate <= current_date)',
+            )),
+        }),
+        returning=('id', 'user_id'),
+        after_commit=_after_clients,
+    ),
+    'comments': Staging(
+        name='comments',
+        model=Comment,
+        columns=MappingProxyType({
+            'id': ID,
+            'game_id': 'uuid',
+            'client_id': 'uuid',
+            'description': "text NOT NULL CONSTRAINT check_description CHECK (description <> '')",
+            'estimation': 'numeric(5, 1) NOT NULL DEFAULT 0 CONSTRAINT check_estimation CHECK (estimation >= 0)',
+            'date_public': 'date NOT NULL DEFAULT current_date',
+        }),
+        returning=('game_id',),
+        after_commit=_after_comments,
+        updated=MappingProxyType({'updated_at': 'now()'}),
+        # Comments moved to other games change the fragments of the games they leave.
+        previous=PREVIOUS_GAMES,
+    ),
+})
+
+
+def import_files(paths: dict[str, Path]) -> dict[str, int]:
+    """Import files of games, clients and comments in one transaction.
+
+    Rows are matched by id: new ids are inserted, existing rows get the
+    columns of the file. Games are imported first, so comments of a run
+    may refer to games and clients of the same run. Ratings are
+    recalculated for the games whose comments are imported, and for the
+    games the imported comments are moved away from.
+
+    Args:
+        paths: files by names of STAGINGS
+
+    Returns:
+        dict: numbers of written rows by names of STAGINGS
+    """
+    written = {}
+    rated = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name, staging in STAGINGS.items():
+                if name not in paths:
+                    continue
+                rows, previous = staging.load(cursor, paths[name])
+                written[name] = len(rows)
+                transaction.on_commit(partial(staging.after_commit, rows + previous))
+                if name == 'comments':
+                    rated = _game_ids(rows + previous)
+        if rated:
+            reconcile_ratings(rated)
+    return written
@@ -0,0 +1,208 @@
+"""This module include timing of SQL queries of requests."""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger('myapp.slow_queries')
+
+MILLISECONDS = 1000
+FINGERPRINT_SIZE = 16
+STRINGS = re.compile("'(?:[^']|'')*'")
+PLACEHOLDERS = re.compile(r'%s|%\(\w+\)s')
+NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+LISTS = re.compile(r'\(\?(?:, ?\?)*\)(?:, ?\(\?(?:, ?\?)*\))*')
+
+
+def sampled() -> bool:
+    """Decide whether queries of a request are timed.
+
+    Returns:
+        bool: True for a share SQL_TIMING_SAMPLE_RATE of calls
+    """
+    rate = settings.SQL_TIMING_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def normalize(sql: str) -> str:
+    """Strip values from a statement, runs with other values look the same.
+
+    Literals and placeholders become ?, lists of them become (...) and
+    whitespace is collapsed.
+
+    Args:
+        sql: the statement
+
+    Returns:
+        str: normalized statement
+    """
+    statement = STRINGS.sub('?', sql)
+    statement = PLACEHOLDERS.sub('?', statement)
+    statement = ' '.join(NUMBERS.sub('?', statement).split())
+    return LISTS.sub('(...)', statement)
+
+
+def fingerprint(statement: str) -> str:
+    """Make a short key of a normalized statement for grouping the log.
+
+    Args:
+        statement: normalized statement
+
+    Returns:
+        str: hex digest
+    """
+    return hashlib.sha256(statement.encode()).hexdigest()[:FINGERPRINT_SIZE]
+
+
+def view_name(request) -> str:
+    """Name the view of a request, also before the URL is resolved.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        str: name of the URL pattern or an empty string
+    """
+    match = request.resolver_match
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return ''
+    return match.view_name
+
+
+def time_query(execute, sql, sql_params, many, context):
+    """Pass a query to the timer of the current request, if there is one.
+
+    It is the only execute wrapper of timing and stays on the connection.
+    Requests of async views share the connection of the ORM thread, so a
+    wrapper per request would time the queries of other requests too.
+
+    Args:
+        execute: the next wrapper or the cursor method
+        sql: the statement
+        sql_params: parameters of the statement
+        many: True for executemany()
+        context: connection and cursor of the query
+
+    Returns:
+        result of the cursor method
+    """
+    timer = timing.get()
+    if timer is None:
+        return execute(sql, sql_params, many, context)
+    return timer(execute, sql, sql_params, many, context)
+
+
+def install_timing() -> None:
+    """Wrap queries of every database of the current thread by time_query once."""
+    for connection in connections.all(initialized_only=False):
+        if time_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(time_query)
+
+
+class QueryTimer:
+    """Timer counting queries of one request and logging slow ones.
+
+    Queries are timed while the timer is entered, install_timing() has to be
+    called in the thread of the connections first.
+    """
+
+    def __init__(self, request):
+        """Create the timer.
+
+        Args:
+            request: the HTTP request object
+        """
+        self.request = request
+        self.threshold = settings.SQL_SLOW_QUERY_MS / MILLISECONDS
+        self.count = 0
+        self.duration = 0
+        self.started = time.perf_counter()
+        self._token = None
+
+    def __call__(self, execute, sql, sql_params, many, context):
+        """Run a query and measure it.
+
+        Args:
+            execute: the next wrapper or the cursor method
+            sql: the statement
+            sql_params: parameters of the statement
+            many: True for executemany()
+            context: connection and cursor of the query
+
+        Raises:
+            DatabaseError: the error of the query, after it is counted
+
+        Returns:
+            result of the cursor method
+        """
+        start = time.perf_counter()
+        try:
+            query_result = execute(sql, sql_params, many, context)
+        except DatabaseError:
+            self.record(sql, time.perf_counter() - start, context)
+            raise
+        self.record(sql, time.perf_counter() - start, context)
+        return query_result
+
+    def __enter__(self) -> 'QueryTimer':
+        """Time queries of the current request, also in threads of sync_to_async.
+
+        Returns:
+            QueryTimer: the timer
+        """
+        self._token = timing.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop timing, also when the view raised.
+
+        Args:
+            exc_info: exception of the block, if any
+        """
+        timing.reset(self._token)
+
+    def record(self, sql: str, elapsed: float, context) -> None:
+        """Count a query and log it when it is slow.
+
+        Args:
+            sql: the statement
+            elapsed: seconds of the query
+            context: connection and cursor of the query
+        """
+        self.count += 1
+        self.duration += elapsed
+        if elapsed < self.threshold:
+            return
+        statement = normalize(sql)
+        logger.warning(json.dumps({
+            'event': 'slow_query',
+            'view': view_name(self.request),
+            'method': self.request.method,
+            'database': context['connection'].alias,
+            'duration_ms': round(elapsed * MILLISECONDS, 3),
+            'fingerprint': fingerprint(statement),
+            'statement': statement,
+        }))
+
+    def server_timing(self) -> str:
+        """Format the counters as a Server-Timing header.
+
+        Returns:
+            str: time and number of queries and total time of the request
+        """
+        total = (time.perf_counter() - self.started) * MILLISECONDS
+        db = self.duration * MILLISECONDS
+        return f'db;dur={db:.3f};desc="{self.count} queries", total;dur={total:.3f}'
+
+
+timing: ContextVar[QueryTimer | None] = ContextVar('timing', default=None)
@@ -0,0 +1 @@
+"""This package include management commands."""
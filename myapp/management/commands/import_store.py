@@ -0,0 +1,50 @@
+"""This module include command to import games, clients and comments from files."""
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from myapp.importing import STAGINGS, import_files
+
+
+class Command(BaseCommand):
+    """Stream CSV or JSON lines files into the store with COPY and set-based upserts."""
+
+    help = 'Import games with genres, clients and comments from CSV or JSON lines files.'
+
+    def add_arguments(self, parser):
+        """Describe files of the imported data.
+
+        Args:
+            parser: parser of the command arguments
+        """
+        parser.add_argument(
+            '--games', type=Path, help='File with id, title, price and genres separated by |, title is required.',
+        )
+        parser.add_argument('--clients', type=Path, help='File with id, nickname, money and date_registrate.')
+        parser.add_argument(
+            '--comments', type=Path, help='File with id, game_id, client_id, description, estimation and date_public.',
+        )
+
+    def handle(self, *args, **options):
+        """Run the command.
+
+        Args:
+            args: positional arguments
+            options: command options
+
+        Raises:
+            CommandError: if no file is given or a file is rejected
+        """
+        paths = {name: options[name] for name in STAGINGS if options[name] is not None}
+        if not paths:
+            raise CommandError('Give at least one of --games, --clients and --comments.')
+        try:
+            written = import_files(paths)
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages)) from error
+        except (DatabaseError, OSError) as error:
+            raise CommandError(str(error)) from error
+        counts = ', '.join(f'{count} {name}' for name, count in written.items())
+        self.stdout.write(self.style.SUCCESS(f'Imported {counts}.'))
@@ -0,0 +1,20 @@
+"""This module include command to recount genre facets."""
+from django.core.management.base import BaseCommand
+
+from myapp.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    """Recount games of every genre and price bucket from games_to_genre."""
+
+    help = 'Recount games of every genre and price bucket.'
+
+    def handle(self, *args, **options):
+        """Run the command.
+
+        Args:
+            args: positional arguments
+            options: command options
+        """
+        rebuilt = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f'Facets of {rebuilt} genre and price buckets are rebuilt.'))
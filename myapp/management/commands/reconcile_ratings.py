@@ -0,0 +1,29 @@
+"""This module include command to recalculate ratings of games."""
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.models import Games
+from myapp.ratings import reconcile_ratings
+from myapp.versions import bump_object_versions, bump_version
+
+
+class Command(BaseCommand):
+    """Recalculate rating_sum, rating_count and rating_avg of games from comments."""
+
+    help = 'Recalculate ratings of all games from their comments.'
+
+    def handle(self, *args, **options):
+        """Run the command.
+
+        Args:
+            args: positional arguments
+            options: command options
+        """
+        with transaction.atomic():
+            updated = reconcile_ratings()
+            game_ids = list(Games.objects.order_by().values_list('pk', flat=True))
+            transaction.on_commit(partial(bump_version, Games))
+            transaction.on_commit(partial(bump_object_versions, Games, game_ids))
+        self.stdout.write(self.style.SUCCESS(f'Ratings of {updated} games are reconciled.'))
@@ -0,0 +1,61 @@
+"""This module include command to fill the store with synthetic data."""
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.models import Client, Comment, GameClient, GameGenre, Games, Genre
+from myapp.ratings import reconcile_ratings
+from myapp.seed import Seeder, create_genres
+from myapp.versions import bump_object_versions, bump_version
+
+GAMES = 10000
+CLIENTS = 2000
+COMMENTS = 50000
+PURCHASES = 20
+CART = 3
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Generate games, genre links, clients with users, carts, purchases and comments."""
+
+    help = 'Fill the store with synthetic data using bulk inserts.'
+
+    def add_arguments(self, parser):
+        """Describe volumes of the generated data.
+
+        Args:
+            parser: parser of the command arguments
+        """
+        parser.add_argument('--games', type=int, default=GAMES, help='Number of games.')
+        parser.add_argument('--clients', type=int, default=CLIENTS, help='Number of clients, each with a user.')
+        parser.add_argument('--comments', type=int, default=COMMENTS, help='Number of comments.')
+        parser.add_argument('--purchases', type=int, default=PURCHASES, help='Largest number of purchased games of a client.')
+        parser.add_argument('--cart', type=int, default=CART, help='Largest number of games in a cart.')
+        parser.add_argument('--password', default=None, help='Password of the users, unusable by default.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per INSERT.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data.')
+
+    def handle(self, *args, **options):
+        """Run the command.
+
+        Args:
+            args: positional arguments
+            options: command options
+        """
+        seeder = Seeder(options['seed'], options['batch_size'])
+        with transaction.atomic():
+            game_ids = seeder.games(options['games'])
+            links = seeder.genre_links(game_ids, create_genres())
+            client_ids = seeder.clients(options['clients'], options['password'])
+            rows = seeder.library(client_ids, game_ids, options['purchases'], options['cart'])
+            comments = seeder.comments(options['comments'], client_ids, game_ids)
+            reconcile_ratings()
+            transaction.on_commit(partial(bump_version, Games, Genre, GameGenre, Client, GameClient, Comment))
+            transaction.on_commit(partial(bump_object_versions, Games, game_ids))
+        games, clients = len(game_ids), len(client_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {games} games with {links} genre links, {clients} clients with {rows} purchases '
+            + f'and cart rows, {comments} comments.',
+        ))
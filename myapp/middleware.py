@@ -0,0 +1,245 @@
+"""This module include middleware."""
+import time
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .clients import client_for_user
+from .instrumentation import QueryTimer, install_timing, sampled
+from .routers import PIN_COOKIE, Routing
+
+
+def _resolve_client(request):
+    if not request.user.is_authenticated:
+        return None
+    return client_for_user(request.user.id)
+
+
+class ClientMiddleware:
+    """Attach the client of the user to the request as request.client.
+
+    The client is loaded on first access only, at most once per request,
+    and is cached between requests until the client is saved or charged.
+    Async views replace the lazy object with the loaded client before
+    rendering, since it can not be resolved inside the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Create the middleware.
+
+        Args:
+            get_response: the next handler
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Handle the request.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.client = SimpleLazyObject(lambda: _resolve_client(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        """Handle the request without leaving the event loop.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        request.client = SimpleLazyObject(lambda: _resolve_client(request))
+        return await self.get_response(request)
+
+
+class AsyncPagesMiddleware:
+    """Route requests of the ASGI handler to the async views of the read pages.
+
+    WSGI requests keep ROOT_URLCONF, whose sync views run in the worker
+    thread without async_to_sync. ASGI requests get ASGI_URLCONF with the
+    same URLs served by async views, which stay in the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Create the middleware.
+
+        Args:
+            get_response: the next handler, async under the ASGI handler
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Pass a request of the WSGI handler on.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        """Handle the request with the URLs of the ASGI handler.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        request.urlconf = settings.ASGI_URLCONF
+        return await self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """Route reads of the request and pin clients which wrote to the primary.
+
+    The routing state lives in a context variable, so it follows the
+    request into threads of sync_to_async in async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Create the middleware.
+
+        Args:
+            get_response: the next handler
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Handle the request.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = Routing(request)
+        with state:
+            response = self.get_response(request)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        """Handle the request without leaving the event loop.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        state = Routing(request)
+        with state:
+            response = await self.get_response(request)
+        return self.pin(state, response)
+
+    def pin(self, state: Routing, response):
+        """Pin the client to the primary after a write.
+
+        Args:
+            state: routing state of the request
+            response: the response
+
+        Returns:
+            HttpResponse: the response with the pin cookie if the request wrote
+        """
+        if state.wrote and settings.DATABASE_REPLICAS:
+            expires = time.time() + settings.REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, str(expires), max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
+
+
+class QueryTimingMiddleware:
+    """Count and time SQL queries of sampled requests.
+
+    A share SQL_TIMING_SAMPLE_RATE of requests gets a Server-Timing header
+    with the time and number of queries, and queries slower than
+    SQL_SLOW_QUERY_MS are logged to myapp.slow_queries. Other requests
+    pass through untimed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Create the middleware.
+
+        Args:
+            get_response: the next handler
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Handle the request.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not sampled():
+            return self.get_response(request)
+        install_timing()
+        timer = QueryTimer(request)
+        with timer:
+            response = self.get_response(request)
+        response['Server-Timing'] = timer.server_timing()
+        return response
+
+    async def __acall__(self, request):
+        """Handle the request without leaving the event loop.
+
+        Connections belong to threads, so the wrapper is installed in the
+        thread which runs the ORM calls of the request. The timer itself
+        is found by the context of the request, which sync_to_async copies
+        into that thread.
+
+        Args:
+            request: the HTTP request object
+
+        Returns:
+            HttpResponse: the response of the next handler
+        """
+        if not sampled():
+            return await self.get_response(request)
+        await sync_to_async(install_timing)()
+        timer = QueryTimer(request)
+        with timer:
+            response = await self.get_response(request)
+        response['Server-Timing'] = timer.server_timing()
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_comment_client'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='games',
+            index=models.Index(fields=['title', 'id'], name='games_title_id_idx'),
+        ),
+    ]
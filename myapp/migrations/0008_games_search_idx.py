@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+TRIGRAM_INDEX = 'games_title_trgm_idx'
+
+
+def create_trigram_index(apps, schema_editor):
+    """Create pg_trgm and the trigram index when the server ships the extension."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON "games_data"."games" USING gin (UPPER(title) gin_trgm_ops)',
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    """Drop the trigram index, the extension is left for other users."""
+    schema_editor.execute(f'DROP INDEX IF EXISTS "games_data".{TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_games_title_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='games',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', config='simple'), name='games_title_search_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
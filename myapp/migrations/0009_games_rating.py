@@ -0,0 +1,45 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:36
+
+from django.db import migrations, models
+
+BACKFILL_RATINGS = '''
+UPDATE "games_data"."games" AS games
+SET rating_sum = stats.total, rating_count = stats.amount, rating_avg = ROUND(stats.total / stats.amount, 2)
+FROM (
+    SELECT game_id, SUM(estimation) AS total, COUNT(*) AS amount
+    FROM "games_data"."comment"
+    WHERE game_id IS NOT NULL
+    GROUP BY game_id
+) AS stats
+WHERE games.id = stats.game_id
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_games_search_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='games',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5, verbose_name='rating'),
+        ),
+        migrations.AddField(
+            model_name='games',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating count'),
+        ),
+        migrations.AddField(
+            model_name='games',
+            name='rating_sum',
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=12, verbose_name='rating sum'),
+        ),
+        migrations.AddIndex(
+            model_name='games',
+            index=models.Index(fields=['rating_avg', 'id'], name='games_rating_id_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_RATINGS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_games_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['game', 'date_public', 'id'], name='comment_game_date_id_idx'),
+        ),
+    ]
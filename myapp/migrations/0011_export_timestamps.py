@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-18 00:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_comment_game_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='games',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='updated at'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='gameclient',
+            name='purchased_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='purchased at'),
+        ),
+        migrations.AddIndex(
+            model_name='games',
+            index=models.Index(fields=['updated_at', 'id'], name='games_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gameclient',
+            index=models.Index(condition=models.Q(('purchased', True)), fields=['purchased_at', 'id'], name='gameclient_purchased_id_idx'),
+        ),
+    ]
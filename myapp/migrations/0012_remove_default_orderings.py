@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-18 00:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_export_timestamps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='client',
+            options={'verbose_name': 'client', 'verbose_name_plural': 'client'},
+        ),
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'verbose_name': 'comment', 'verbose_name_plural': 'comment'},
+        ),
+        migrations.AlterModelOptions(
+            name='games',
+            options={'verbose_name': 'games', 'verbose_name_plural': 'games'},
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-18 00:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY does not lock writes and cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ('myapp', '0012_remove_default_orderings'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(fields=['nickname', 'id'], name='client_nickname_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['date_public', 'id'], name='comment_date_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['client', 'game'], name='comment_client_game_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='gameclient',
+            index=models.Index(fields=['client', 'in_cart'], name='gameclient_client_cart_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='gameclient',
+            index=models.Index(fields=['client', 'purchased'], name='gameclient_client_bought_idx'),
+        ),
+    ]
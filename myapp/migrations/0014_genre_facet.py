@@ -0,0 +1,112 @@
+# Generated by Django 5.0.3 on 2026-10-18 01:01
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+# Buckets of 10 money units, the last one holds prices from 70 up.
+# Keep in sync with PRICE_BUCKET_WIDTH and PRICE_BUCKETS of myapp.facets.
+PRICE_BUCKET = """
+CREATE FUNCTION games_data.price_bucket(price numeric) RETURNS smallint
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT least(greatest(floor(price / 10), 0), 7)::smallint $$
+"""
+
+# Changed rows of a statement become +1 and -1 per genre and bucket, one
+# upsert per statement adds them up. Buckets are locked in one order.
+SHIFT = """
+        INSERT INTO games_data.genre_facet AS facet (id, genre_id, price_bucket, games_count)
+        SELECT gen_random_uuid(), moved.genre_id, moved.bucket, sum(moved.delta)
+        FROM ({moved}) AS moved
+        GROUP BY moved.genre_id, moved.bucket
+        HAVING sum(moved.delta) <> 0
+        ORDER BY moved.genre_id, moved.bucket
+        ON CONFLICT (genre_id, price_bucket) DO UPDATE SET games_count = facet.games_count + EXCLUDED.games_count;"""
+LINKS = """
+            SELECT link.genre_id, games_data.price_bucket(game.price) AS bucket, {delta} AS delta
+            FROM {rows} AS link JOIN games_data.games AS game ON game.id = link.game_id"""
+GAMES = """
+            SELECT link.genre_id, games_data.price_bucket(game.price) AS bucket, {delta} AS delta
+            FROM {rows} AS game JOIN games_data.games_to_genre AS link ON link.game_id = game.id"""
+FUNCTION = """
+CREATE FUNCTION games_data.{name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{added}
+    ELSIF TG_OP = 'DELETE' THEN{removed}
+    ELSE{updated}
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+TRIGGERS = """
+CREATE TRIGGER {name}_insert AFTER INSERT ON games_data.{table}
+REFERENCING NEW TABLE AS added FOR EACH STATEMENT EXECUTE FUNCTION games_data.{name}();
+CREATE TRIGGER {name}_delete AFTER DELETE ON games_data.{table}
+REFERENCING OLD TABLE AS removed FOR EACH STATEMENT EXECUTE FUNCTION games_data.{name}();
+CREATE TRIGGER {name}_update AFTER UPDATE ON games_data.{table}
+REFERENCING OLD TABLE AS removed NEW TABLE AS added FOR EACH STATEMENT EXECUTE FUNCTION games_data.{name}();
+"""
+FILL = """
+INSERT INTO games_data.genre_facet (id, genre_id, price_bucket, games_count)
+SELECT gen_random_uuid(), link.genre_id, games_data.price_bucket(game.price), count(*)
+FROM games_data.games_to_genre AS link JOIN games_data.games AS game ON game.id = link.game_id
+GROUP BY 2, 3
+"""
+
+
+def maintain(name: str, table: str, moved: str) -> str:
+    """Write the trigger function and the triggers keeping facets of one table."""
+    added = moved.format(rows='added', delta=1)
+    removed = moved.format(rows='removed', delta=-1)
+    function = FUNCTION.format(
+        name=name,
+        added=SHIFT.format(moved=added),
+        removed=SHIFT.format(moved=removed),
+        updated=SHIFT.format(moved=f'{removed}\n            UNION ALL{added}'),
+    )
+    return function + ';' + TRIGGERS.format(name=name, table=table)
+
+
+DROP = """
+DROP FUNCTION games_data.genre_facet_links() CASCADE;
+DROP FUNCTION games_data.genre_facet_games() CASCADE;
+DROP FUNCTION games_data.price_bucket(numeric);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreFacet',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('price_bucket', models.SmallIntegerField(verbose_name='price bucket')),
+                ('games_count', models.IntegerField(default=0, verbose_name='games count')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='myapp.genre', verbose_name='genre')),
+            ],
+            options={
+                'verbose_name': 'genre facet',
+                'verbose_name_plural': 'genre facets',
+                'db_table': '"games_data"."genre_facet"',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='genrefacet',
+            constraint=models.UniqueConstraint(fields=('genre', 'price_bucket'), name='genre_facet_bucket_unique'),
+        ),
+        migrations.RunSQL(
+            [
+                PRICE_BUCKET,
+                maintain('genre_facet_links', 'games_to_genre', LINKS),
+                maintain('genre_facet_games', 'games', GAMES),
+                FILL,
+            ],
+            DROP,
+        ),
+    ]
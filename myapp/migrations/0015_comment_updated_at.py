@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Existing comments were last changed on the day they were published, as far as is known.
+BACKFILL = 'UPDATE "games_data"."comment" SET updated_at = date_public::timestamptz'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_genre_facet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='updated at'),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated_at', 'id'], name='comment_updated_id_idx'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from datetime import date
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
@@ -94,8 +96,10 @@ GAMES_GENRE = (
     ('Puzzles', 'Puzzles'),
 )
 
+TWELVE = 12
 TWOHUNDRED = 200
 THREEHUNDRED = 300
+SEARCH_CONFIG = 'simple'
 
 
 class Genre(UUIDMixin):
@@ -127,6 +131,26 @@ class Genre(UUIDMixin):
         verbose_name_plural = _('genre')
 
 
+class GamesQuerySet(models.QuerySet):
+    """QuerySet of Games."""
+
+    def for_listing(self, genres: bool = True) -> 'GamesQuerySet':
+        """Select only columns shown in lists of games.
+
+        Args:
+            genres: prefetch genres of games in one query
+
+        Returns:
+            GamesQuerySet: games ready for listing
+        """
+        games = self.only('id', 'title', 'price', 'rating_avg', 'rating_count')
+        if genres:
+            games = games.prefetch_related(
+                models.Prefetch('genres', queryset=Genre.objects.only('id', 'title')),
+            )
+        return games
+
+
 class Games(UUIDMixin):
     """Class of Games."""
 
@@ -139,9 +163,16 @@ class Games(UUIDMixin):
         validators=[check_price],
     )
 
+    rating_sum = models.DecimalField(_('rating sum'), decimal_places=1, max_digits=TWELVE, default=0)
+    rating_count = models.PositiveIntegerField(_('rating count'), default=0)
+    rating_avg = models.DecimalField(_('rating'), decimal_places=2, max_digits=5, default=0)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+
     clients = models.ManyToManyField('Client', through='GameClient')
     genres = models.ManyToManyField(Genre, through='GameGenre')
 
+    objects = GamesQuerySet.as_manager()
+
     def __str__(self) -> str:
         """Write info of game.
 
@@ -154,7 +185,12 @@ class Games(UUIDMixin):
         """Class Meta about Games."""
 
         db_table = '"games_data"."games"'
-        ordering = ['title', 'genre', 'price']
+        indexes = [
+            models.Index(fields=['title', 'id'], name='games_title_id_idx'),
+            GinIndex(SearchVector('title', config=SEARCH_CONFIG), name='games_title_search_idx'),
+            models.Index(fields=['rating_avg', 'id'], name='games_rating_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='games_updated_id_idx'),
+        ]
         verbose_name = _('games')
         verbose_name_plural = _('games')
 
@@ -197,7 +233,9 @@ class Client(UUIDMixin):
         """Class Meta about Client."""
 
         db_table = '"games_data"."client"'
-        ordering = ['nickname', 'date_registrate']
+        indexes = [
+            models.Index(fields=['nickname', 'id'], name='client_nickname_id_idx'),
+        ]
         verbose_name = _('client')
         verbose_name_plural = _('client')
 
@@ -216,6 +254,7 @@ class Comment(UUIDMixin):
     )
     game = models.ForeignKey(Games, on_delete=models.CASCADE, null=True, blank=True)
     client = models.ForeignKey(Client, on_delete=models.DO_NOTHING, null=True, blank=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
     def __str__(self) -> str:
         """Wrire info of comment.
@@ -229,7 +268,12 @@ class Comment(UUIDMixin):
         """Class Meta about Comment."""
 
         db_table = '"games_data"."comment"'
-        ordering = ['description', 'date_public', 'estimation']
+        indexes = [
+            models.Index(fields=['game', 'date_public', 'id'], name='comment_game_date_id_idx'),
+            models.Index(fields=['date_public', 'id'], name='comment_date_id_idx'),
+            models.Index(fields=['client', 'game'], name='comment_client_game_idx'),
+            models.Index(fields=['updated_at', 'id'], name='comment_updated_id_idx'),
+        ]
         verbose_name = _('comment')
         verbose_name_plural = _('comment')
 
@@ -241,6 +285,7 @@ class GameClient(UUIDMixin):
     client = models.ForeignKey(Client, verbose_name=_('client'), on_delete=models.DO_NOTHING)
     in_cart = models.BooleanField(default=False)
     purchased = models.BooleanField(default=False)
+    purchased_at = models.DateTimeField(_('purchased at'), null=True, blank=True)
 
     def __str__(self) -> str:
         """Write info of gameclient table.
@@ -255,6 +300,15 @@ class GameClient(UUIDMixin):
 
         db_table = '"games_data"."games_to_client"'
         unique_together = (('game', 'client'),)
+        indexes = [
+            models.Index(fields=['client', 'in_cart'], name='gameclient_client_cart_idx'),
+            models.Index(fields=['client', 'purchased'], name='gameclient_client_bought_idx'),
+            models.Index(
+                fields=['purchased_at', 'id'],
+                name='gameclient_purchased_id_idx',
+                condition=models.Q(purchased=True),
+            ),
+        ]
         verbose_name = _('relationship games client')
         verbose_name_plural = _('relationships games client')
 
@@ -282,3 +336,33 @@ class GameGenre(UUIDMixin):
         )
         verbose_name = _('relationship games genre')
         verbose_name_plural = _('relationships games genre')
+
+
+class GenreFacet(UUIDMixin):
+    """Number of games of a genre in a price bucket.
+
+    Rows are kept up to date by triggers of games_to_genre and games,
+    so links written by bulk inserts and COPY are counted too.
+    """
+
+    genre = models.ForeignKey(Genre, verbose_name=_('genre'), on_delete=models.CASCADE, related_name='facets')
+    price_bucket = models.SmallIntegerField(_('price bucket'))
+    games_count = models.IntegerField(_('games count'), default=0)
+
+    def __str__(self) -> str:
+        """Write info of genrefacet table.
+
+        Returns:
+            str: info of genrefacet table
+        """
+        return f'{self.genre_id} - {self.price_bucket}: {self.games_count}'
+
+    class Meta:
+        """Class Meta about GenreFacet table."""
+
+        db_table = '"games_data"."genre_facet"'
+        constraints = [
+            models.UniqueConstraint(fields=['genre', 'price_bucket'], name='genre_facet_bucket_unique'),
+        ]
+        verbose_name = _('genre facet')
+        verbose_name_plural = _('genre facets')
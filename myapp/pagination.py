@@ -0,0 +1,253 @@
+"""This module include keyset (cursor) pagination."""
+import base64
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.pagination import CursorPagination
+
+NEXT = 'n'
+PREVIOUS = 'p'
+DESC = '-'
+
+
+@dataclass
+class KeysetPage:
+    """One page of a keyset paginated queryset."""
+
+    object_list: list = field(default_factory=list)
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    def __iter__(self):
+        """Iterate over objects of the page.
+
+        Returns:
+            iterator over objects of the page
+        """
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        """Count objects of the page.
+
+        Returns:
+            int: number of objects on the page
+        """
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        """Check that there is a next page.
+
+        Returns:
+            bool: True if the next page exists
+        """
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        """Check that there is a previous page.
+
+        Returns:
+            bool: True if the previous page exists
+        """
+        return self.previous_cursor is not None
+
+
+def encode_cursor(direction: str, position: list) -> str:
+    """Encode position of a row into an opaque token.
+
+    Args:
+        direction: NEXT or PREVIOUS
+        position: values of the ordering fields
+
+    Returns:
+        str: urlsafe token
+    """
+    payload = json.dumps([direction, position], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str | None, size: int) -> tuple[str, list] | None:
+    """Decode a token made by encode_cursor.
+
+    Args:
+        token: urlsafe token
+        size: number of ordering fields
+
+    Returns:
+        tuple with direction and position or None if the token is broken
+    """
+    if not token:
+        return None
+    padding = '=' * (-len(token) % 4)
+    try:
+        direction, position = json.loads(base64.urlsafe_b64decode(token + padding))
+    except (ValueError, TypeError):
+        return None
+    if direction not in {NEXT, PREVIOUS} or not isinstance(position, list):
+        return None
+    return (direction, position) if len(position) == size else None
+
+
+def _field(name: str) -> str:
+    return name.lstrip(DESC)
+
+
+def _compare(name: str, position, inclusive: bool = False) -> models.Q:
+    lookup = 'lt' if name.startswith(DESC) else 'gt'
+    if inclusive:
+        lookup = f'{lookup}e'
+    column = _field(name)
+    return models.Q(**{f'{column}__{lookup}': position})
+
+
+def _reverse(ordering: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(_field(name) if name.startswith(DESC) else DESC + name for name in ordering)
+
+
+def _seek(ordering: tuple[str, ...], position: list) -> models.Q:
+    """Build filter for rows placed after position.
+
+    The leading column gets an extra inclusive bound, so Postgres can
+    range scan the index on the ordering fields.
+
+    Args:
+        ordering: ordering fields, '-' prefix for descending
+        position: values of the ordering fields
+
+    Returns:
+        Q: filter for rows after position
+    """
+    pairs = list(zip(ordering, position))
+    after = _compare(*pairs.pop())
+    for name, column in reversed(pairs):
+        after = _compare(name, column) | (models.Q(**{_field(name): column}) & after)
+    return _compare(ordering[0], position[0], inclusive=True) & after
+
+
+def _model_field(model, name: str):
+    *relations, column = _field(name).split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(column)
+
+
+def parse_position(model, ordering: tuple[str, ...], position: list) -> list | None:
+    """Convert values of a decoded cursor into values of the ordering fields.
+
+    Tokens come from the client, so a well-formed token may still carry
+    values of wrong types.
+
+    Args:
+        model: model class of the paginated queryset
+        ordering: ordering fields, '-' prefix for descending
+        position: values from the token
+
+    Returns:
+        list: converted values or None if a value does not fit its field
+    """
+    parsed = []
+    for name, raw in zip(ordering, position):
+        if raw is None:
+            return None
+        try:
+            parsed.append(_model_field(model, name).to_python(raw))
+        except FieldDoesNotExist:
+            parsed.append(raw)
+        except (ValidationError, TypeError):
+            return None
+    return parsed
+
+
+def _position(instance, ordering: tuple[str, ...]) -> list:
+    if isinstance(instance, dict):
+        return [str(instance[_field(name)]) for name in ordering]
+    return [str(getattr(instance, _field(name))) for name in ordering]
+
+
+def _keyset_query(queryset: models.QuerySet, ordering: tuple[str, ...], token: str | None) -> tuple:
+    cursor = decode_cursor(token, len(ordering))
+    if cursor:
+        position = parse_position(queryset.model, ordering, cursor[1])
+        # A tampered token starts from the first page like a broken one.
+        cursor = (cursor[0], position) if position is not None else None
+    direction = cursor[0] if cursor else NEXT
+    seek_ordering = ordering if direction == NEXT else _reverse(ordering)
+    queryset = queryset.order_by(*seek_ordering)
+    if cursor:
+        queryset = queryset.filter(_seek(seek_ordering, cursor[1]))
+    return queryset, cursor, direction
+
+
+def _keyset_page(rows: list, ordering: tuple[str, ...], cursor, direction: str, per_page: int) -> KeysetPage:
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == PREVIOUS:
+        rows.reverse()
+    page = KeysetPage(object_list=rows)
+    if not rows:
+        return page
+    if has_more or direction == PREVIOUS:
+        page.next_cursor = encode_cursor(NEXT, _position(rows[-1], ordering))
+    if cursor and (has_more or direction == NEXT):
+        page.previous_cursor = encode_cursor(PREVIOUS, _position(rows[0], ordering))
+    return page
+
+
+def paginate_keyset(queryset: models.QuerySet, ordering: tuple[str, ...], token: str | None, per_page: int) -> KeysetPage:
+    """Take one page of queryset without OFFSET and COUNT.
+
+    Args:
+        queryset: queryset to paginate
+        ordering: unique ordering, the last field should be the primary key
+        token: cursor from the previous page or None for the first page
+        per_page: size of page
+
+    Returns:
+        KeysetPage: the page with cursors to neighbour pages
+    """
+    queryset, cursor, direction = _keyset_query(queryset, ordering, token)
+    return _keyset_page(list(queryset[:per_page + 1]), ordering, cursor, direction, per_page)
+
+
+async def apaginate_keyset(queryset: models.QuerySet, ordering: tuple[str, ...], token: str | None, per_page: int) -> KeysetPage:
+    """Take one page of queryset like paginate_keyset in async views.
+
+    Args:
+        queryset: queryset to paginate
+        ordering: unique ordering, the last field should be the primary key
+        token: cursor from the previous page or None for the first page
+        per_page: size of page
+
+    Returns:
+        KeysetPage: the page with cursors to neighbour pages
+    """
+    queryset, cursor, direction = _keyset_query(queryset, ordering, token)
+    rows = [row async for row in queryset[:per_page + 1]]
+    return _keyset_page(rows, ordering, cursor, direction, per_page)
+
+
+class ApiCursorPagination(CursorPagination):
+    """Cursor pagination of the API viewsets.
+
+    Subclasses set ordering of their model, the page size is taken
+    from PAGE_SIZE of REST_FRAMEWORK settings.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def ordering_fields(ordering: tuple[str, ...]) -> list[str]:
+    """Take names of the fields used by ordering.
+
+    Args:
+        ordering: ordering fields, '-' prefix for descending
+
+    Returns:
+        list: names of the fields without prefix
+    """
+    return [_field(name) for name in ordering]
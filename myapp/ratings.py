@@ -0,0 +1,88 @@
+"""This module include incremental maintenance of game ratings."""
+from decimal import Decimal
+
+from django.db import models
+from django.db.models.functions import Coalesce, Now, Round
+
+from .models import Comment, Games
+
+AVG_PLACES = 2
+
+
+def _average(total, amount) -> models.Expression:
+    return models.Case(
+        models.When(rating_count__lte=-amount, then=Decimal(0)),
+        default=Round(total / (models.F('rating_count') + amount), AVG_PLACES),
+        output_field=models.DecimalField(),
+    )
+
+
+def _shift(game_id, delta: Decimal, amount: int) -> None:
+    total = models.F('rating_sum') + delta
+    Games.objects.filter(pk=game_id).update(
+        rating_sum=total,
+        rating_count=models.F('rating_count') + amount,
+        rating_avg=_average(total, amount),
+        updated_at=Now(),
+    )
+
+
+def add_rating(game_id, estimation) -> None:
+    """Count estimation of a new comment in the rating of the game.
+
+    Args:
+        game_id: id of the game
+        estimation: estimation of the comment
+    """
+    _shift(game_id, Decimal(estimation), 1)
+
+
+def change_rating(game_id, old_estimation, new_estimation) -> None:
+    """Replace estimation of an updated comment in the rating of the game.
+
+    Args:
+        game_id: id of the game
+        old_estimation: estimation before the update
+        new_estimation: estimation after the update
+    """
+    _shift(game_id, Decimal(new_estimation) - Decimal(old_estimation), 0)
+
+
+def remove_rating(game_id, estimation) -> None:
+    """Remove estimation of a deleted comment from the rating of the game.
+
+    Args:
+        game_id: id of the game
+        estimation: estimation of the comment
+    """
+    _shift(game_id, -Decimal(estimation), -1)
+
+
+def reconcile_ratings(game_ids=None) -> int:
+    """Recalculate ratings of games from their comments.
+
+    Args:
+        game_ids: ids of the games, all games by default
+
+    Returns:
+        int: number of updated games
+    """
+    comments = Comment.objects.filter(game=models.OuterRef('pk')).order_by().values('game')
+    total = Coalesce(
+        models.Subquery(comments.annotate(total=models.Sum('estimation')).values('total')),
+        Decimal(0),
+        output_field=models.DecimalField(),
+    )
+    amount = models.Subquery(comments.annotate(amount=models.Count('id')).values('amount'))
+    amount = Coalesce(amount, 0)
+    games = Games.objects.all() if game_ids is None else Games.objects.filter(pk__in=game_ids)
+    return games.update(
+        rating_sum=total,
+        rating_count=amount,
+        rating_avg=Coalesce(
+            models.Subquery(comments.annotate(avg=Round(models.Avg('estimation'), AVG_PLACES)).values('avg')),
+            Decimal(0),
+            output_field=models.DecimalField(),
+        ),
+        updated_at=Now(),
+    )
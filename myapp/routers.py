@@ -0,0 +1,190 @@
+"""This module include routing of reads to replicas of the database.
+
+Reads go to a replica only inside requests with a safe method to views
+marked by replica_reads and only while the session is not pinned. A
+request which writes pins its client to the primary for
+REPLICA_PIN_SECONDS with a cookie, so users read their own writes.
+Reads inside a transaction of the primary stay there as well, which
+also keeps TestCase tests on the test database. Everything else
+(commands, signals, unsafe methods, sessions and tokens) uses the
+primary.
+
+To try it locally run a second PostgreSQL server which replicates the
+first one (pg_basebackup -R or a logical subscription) and set
+PG_REPLICA_HOSTS=127.0.0.1:5433. A copy of the database on the same
+server (CREATE DATABASE ... TEMPLATE ... and PG_REPLICA_DBNAME) shows
+the routing as well, it just never catches up.
+"""
+import itertools
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_READS = 'replica_reads'
+PIN_COOKIE = 'db_pin'
+PRIMARY_APPS = frozenset(('sessions', 'authtoken'))
+
+_turns = itertools.count()
+
+
+def replica_reads(view):
+    """Mark a read-only view, its safe requests may read from a replica.
+
+    Args:
+        view: view function
+
+    Returns:
+        the same view function
+    """
+    setattr(view, REPLICA_READS, True)
+    return view
+
+
+def pinned(request) -> bool:
+    """Check that the client wrote recently and must read the primary.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        bool: True while the pin cookie is not expired
+    """
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _marked(view) -> bool:
+    view_class = getattr(view, 'cls', None)
+    return getattr(view, REPLICA_READS, False) or getattr(view_class, REPLICA_READS, False)
+
+
+class Routing:
+    """Routing state of one request."""
+
+    def __init__(self, request):
+        """Start routing of a request.
+
+        Args:
+            request: the HTTP request object
+        """
+        self.request = request
+        self.wrote = False
+        self.replica = None
+        self._token = None
+
+    def __enter__(self) -> 'Routing':
+        """Make the state current for reads and writes of the request.
+
+        Returns:
+            Routing: the state
+        """
+        self._token = routing.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Restore the previous state, also when the view raised.
+
+        Args:
+            exc_info: exception of the block, if any
+        """
+        routing.reset(self._token)
+
+    def read_alias(self) -> str:
+        """Choose the database of reads, once the view is resolved.
+
+        Returns:
+            str: alias of a replica or of the primary
+        """
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            self.replica = self._choose()
+        return self.replica
+
+    def _choose(self) -> str:
+        replicas = settings.DATABASE_REPLICAS
+        match = getattr(self.request, 'resolver_match', None)
+        if not replicas or match is None:
+            return DEFAULT_DB_ALIAS
+        if self.request.method not in SAFE_METHODS or pinned(self.request) or not _marked(match.func):
+            return DEFAULT_DB_ALIAS
+        return replicas[next(_turns) % len(replicas)]
+
+
+routing: ContextVar[Routing | None] = ContextVar('routing', default=None)
+
+
+def note_write() -> None:
+    """Pin the client of the current request after a raw SQL write.
+
+    Writes through the ORM are noticed by the router, raw SQL skips it.
+    """
+    state = routing.get()
+    if state is not None:
+        state.wrote = True
+
+
+class ReplicaRouter:
+    """Router sending reads of marked requests to replicas and writes to the primary."""
+
+    def db_for_read(self, model, **hints) -> str:
+        """Choose the database of a read.
+
+        Args:
+            model: model class
+            hints: hints of the query
+
+        Returns:
+            str: alias of the database
+        """
+        state = routing.get()
+        if state is None or model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints) -> str:
+        """Send writes to the primary and remember them to pin the client.
+
+        Args:
+            model: model class
+            hints: hints of the query
+
+        Returns:
+            str: alias of the primary
+        """
+        note_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """Relate objects of any alias, replicas hold the same rows.
+
+        Args:
+            obj1: the first object
+            obj2: the second object
+            hints: hints of the relation
+
+        Returns:
+            bool: True
+        """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        """Migrate the primary only, replicas receive changes by replication.
+
+        Args:
+            db: alias of the database
+            app_label: label of the application
+            model_name: name of the model
+            hints: hints of the migration
+
+        Returns:
+            bool: False for replicas, None to let Django decide otherwise
+        """
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
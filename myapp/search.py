@@ -0,0 +1,151 @@
+"""This module include full-text and trigram search of games."""
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models.functions import Upper
+
+from .models import SEARCH_CONFIG, Games
+
+RESULTS_PER_PAGE = 10
+
+_trigram_state = {}
+
+
+@dataclass
+class SearchPage:
+    """One page of ranked search results."""
+
+    object_list: list = field(default_factory=list)
+    number: int = 1
+    has_next: bool = False
+
+    def __iter__(self):
+        """Iterate over games of the page.
+
+        Returns:
+            iterator over games of the page
+        """
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        """Count games of the page.
+
+        Returns:
+            int: number of games on the page
+        """
+        return len(self.object_list)
+
+    @property
+    def has_previous(self) -> bool:
+        """Check that there is a previous page.
+
+        Returns:
+            bool: True if the previous page exists
+        """
+        return self.number > 1
+
+    @property
+    def next_page_number(self) -> int:
+        """Number of the next page.
+
+        Returns:
+            int: number of the next page
+        """
+        return self.number + 1
+
+    @property
+    def previous_page_number(self) -> int:
+        """Number of the previous page.
+
+        Returns:
+            int: number of the previous page
+        """
+        return self.number - 1
+
+
+def trigram_enabled(alias: str = DEFAULT_DB_ALIAS) -> bool:
+    """Check that pg_trgm is installed in the database.
+
+    Args:
+        alias: database the search reads, a replica may differ from the primary
+
+    Returns:
+        bool: True if trigram operators can be used
+    """
+    if alias not in _trigram_state:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_state[alias] = cursor.fetchone() is not None
+    return _trigram_state[alias]
+
+
+def search_queryset(query: str) -> models.QuerySet:
+    """Find games by title ordered by relevance.
+
+    Full-text matches are ranked first, substring and misspelled titles
+    are found with the trigram index when pg_trgm is available.
+
+    Args:
+        query: text typed by the user
+
+    Returns:
+        QuerySet: matched games, the most relevant first
+    """
+    text_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    games = Games.objects.for_listing().annotate(
+        document=SearchVector('title', config=SEARCH_CONFIG),
+        title_upper=Upper('title'),
+        rank=SearchRank(SearchVector('title', config=SEARCH_CONFIG), text_query),
+    )
+    matched = models.Q(document=text_query) | models.Q(title_upper__contains=query.upper())
+    ordering = ['-rank']
+    if trigram_enabled(games.db):
+        games = games.annotate(similarity=TrigramSimilarity(Upper('title'), query.upper()))
+        matched |= models.Q(title_upper__trigram_similar=query.upper())
+        ordering.append('-similarity')
+    return games.filter(matched).order_by(*ordering, 'title', 'id')
+
+
+def _page_number(page_number) -> int:
+    try:
+        return max(int(page_number), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def search_page(query: str, page_number, per_page: int = RESULTS_PER_PAGE) -> SearchPage:
+    """Take one page of ranked search results without counting all matches.
+
+    Args:
+        query: text typed by the user
+        page_number: number of the page from the request
+        per_page: size of page
+
+    Returns:
+        SearchPage: the page of results
+    """
+    number = _page_number(page_number)
+    offset = (number - 1) * per_page
+    games = list(search_queryset(query)[offset:offset + per_page + 1])
+    return SearchPage(object_list=games[:per_page], number=number, has_next=len(games) > per_page)
+
+
+async def asearch_page(query: str, page_number, per_page: int = RESULTS_PER_PAGE) -> SearchPage:
+    """Take one page of ranked search results like search_page in async views.
+
+    Args:
+        query: text typed by the user
+        page_number: number of the page from the request
+        per_page: size of page
+
+    Returns:
+        SearchPage: the page of results
+    """
+    number = _page_number(page_number)
+    offset = (number - 1) * per_page
+    matched = await sync_to_async(search_queryset)(query)
+    games = [game async for game in matched[offset:offset + per_page + 1]]
+    return SearchPage(object_list=games[:per_page], number=number, has_next=len(games) > per_page)
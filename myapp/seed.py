@@ -0,0 +1,206 @@
+"""This module include generation of synthetic data of the store."""
+import random
+from collections.abc import Iterator
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+from faker import Faker
+
+from .models import (GAMES_GENRE, Client, Comment, GameClient, GameGenre,
+                     Games, Genre)
+
+CENTS = 100
+MAX_PRICE = 70
+MAX_MONEY = 500
+MAX_ESTIMATION = 5
+MAX_GENRES = 3
+HISTORY_DAYS = 730
+SENTENCES = 2000
+RUN_SIZE = 6
+
+
+def insert_batches(model, rows: Iterator, batch_size: int) -> list:
+    """Insert objects of a generator batch by batch.
+
+    Args:
+        model: model class
+        rows: unsaved objects
+        batch_size: rows per INSERT
+
+    Returns:
+        list: primary keys of the inserted objects
+    """
+    keys = []
+    batch = list(islice(rows, batch_size))
+    while batch:
+        keys.extend(instance.pk for instance in model.objects.bulk_create(batch))
+        batch = list(islice(rows, batch_size))
+    return keys
+
+
+def create_genres() -> list:
+    """Create missing genres of the choices.
+
+    Returns:
+        list: ids of all genres
+    """
+    existing = set(Genre.objects.values_list('title', flat=True))
+    Genre.objects.bulk_create([Genre(title=title) for title, _ in GAMES_GENRE if title not in existing])
+    return list(Genre.objects.order_by().values_list('id', flat=True))
+
+
+def _amount(generator: random.Random, limit: int) -> Decimal:
+    return Decimal(generator.randint(0, limit * CENTS)) / CENTS
+
+
+def _moment(generator: random.Random, now):
+    return now - timedelta(days=HISTORY_DAYS) * generator.random()
+
+
+class Seeder:
+    """Generator of related rows of the store written with batched INSERTs.
+
+    Titles, names and texts come from Faker, choices come from one
+    seeded random generator, so a seed gives the same kind of data in
+    every run. Primary keys are new in every run, so seeding can be
+    repeated on the same database.
+    """
+
+    def __init__(self, seed: int, batch_size: int):
+        """Create the seeder.
+
+        Args:
+            seed: seed of Faker and of the random generator
+            batch_size: rows per INSERT
+        """
+        self.fake = Faker()
+        self.fake.seed_instance(seed)
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.run = uuid4().hex[:RUN_SIZE]
+
+    def games(self, count: int) -> list:
+        """Insert games with prices, ratings are reconciled from comments later.
+
+        Args:
+            count: number of games
+
+        Returns:
+            list: ids of the games
+        """
+        rows = (
+            Games(title=self.fake.catch_phrase(), price=_amount(self.random, MAX_PRICE))
+            for _ in range(count)
+        )
+        return insert_batches(Games, rows, self.batch_size)
+
+    def genre_links(self, game_ids: list, genre_ids: list) -> int:
+        """Link every game to one to three genres.
+
+        Args:
+            game_ids: ids of the games
+            genre_ids: ids of the genres
+
+        Returns:
+            int: number of links
+        """
+        rows = (
+            GameGenre(game_id=game_id, genre_id=genre_id)
+            for game_id in game_ids
+            for genre_id in self.random.sample(genre_ids, self.random.randint(1, min(MAX_GENRES, len(genre_ids))))
+        )
+        return len(insert_batches(GameGenre, rows, self.batch_size))
+
+    def clients(self, count: int, password: str | None) -> list:
+        """Insert users and their clients.
+
+        Args:
+            count: number of clients
+            password: password of all users, None makes them unusable
+
+        Returns:
+            list: ids of the clients
+        """
+        hashed = make_password(password)
+        users = (
+            User(username='.'.join((self.fake.user_name(), str(number), self.run)), password=hashed)
+            for number in range(count)
+        )
+        rows = (
+            Client(user_id=user_id, nickname=self.fake.name(), money=_amount(self.random, MAX_MONEY))
+            for user_id in insert_batches(User, users, self.batch_size)
+        )
+        return insert_batches(Client, rows, self.batch_size)
+
+    def library(self, client_ids: list, game_ids: list, purchases: int, cart: int) -> int:
+        """Give clients purchased games and games in the cart.
+
+        Args:
+            client_ids: ids of the clients
+            game_ids: ids of the games
+            purchases: largest number of purchases of a client
+            cart: largest number of games in a cart
+
+        Returns:
+            int: number of written rows
+        """
+        rows = (
+            game_client
+            for client_id in client_ids
+            for game_client in self.shelf(client_id, game_ids, purchases, cart)
+        )
+        return len(insert_batches(GameClient, rows, self.batch_size))
+
+    def shelf(self, client_id, game_ids: list, purchases: int, cart: int) -> list:
+        """Make rows of the games of one client.
+
+        Args:
+            client_id: id of the client
+            game_ids: ids of the games
+            purchases: largest number of purchases
+            cart: largest number of games in the cart
+
+        Returns:
+            list: unsaved rows
+        """
+        bought = self.random.randint(0, purchases)
+        wanted = self.random.randint(0, cart)
+        picked = self.random.sample(game_ids, min(bought + wanted, len(game_ids)))
+        rows = [
+            GameClient(client_id=client_id, game_id=game_id, purchased=True, purchased_at=_moment(self.random, self.now))
+            for game_id in picked[:bought]
+        ]
+        rows.extend(GameClient(client_id=client_id, game_id=game_id, in_cart=True) for game_id in picked[bought:])
+        return rows
+
+    def comments(self, count: int, client_ids: list, game_ids: list) -> int:
+        """Insert comments of random clients on random games.
+
+        Args:
+            count: number of comments
+            client_ids: ids of the clients
+            game_ids: ids of the games
+
+        Returns:
+            int: number of comments
+        """
+        if not client_ids or not game_ids:
+            return 0
+        sentences = [self.fake.sentence() for _ in range(min(count, SENTENCES))]
+        rows = (
+            Comment(
+                description=self.random.choice(sentences),
+                date_public=_moment(self.random, self.now).date(),
+                estimation=self.random.randint(0, MAX_ESTIMATION),
+                game_id=self.random.choice(game_ids),
+                client_id=self.random.choice(client_ids),
+            )
+            for _ in range(count)
+        )
+        return len(insert_batches(Comment, rows, self.batch_size))
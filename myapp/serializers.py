@@ -1,9 +1,12 @@
 """This module include serializer."""
 from django.utils import timezone
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 
 from .models import Client, Comment, Games, Genre
 
+FIELDS_PARAM = 'fields'
+KNOWN_GENRES = 'known_genres'
+
 
 def check_date(dt) -> bool:
     """
@@ -18,24 +21,97 @@ def check_date(dt) -> bool:
     return dt > timezone.now().date()
 
 
-class GamesSerializer(serializers.HyperlinkedModelSerializer):
+def requested_fields(request, allowed) -> list[str] | None:
+    """Take fields asked by the ?fields= parameter of a read request.
+
+    Args:
+        request: the HTTP request object or None
+        allowed: names of the fields of the serializer
+
+    Raises:
+        ValidationError: if an unknown field is asked
+
+    Returns:
+        list: names of the asked fields or None to keep all of them
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    raw = request.query_params.get(FIELDS_PARAM)
+    if not raw:
+        return None
+    stripped = (name.strip() for name in raw.split(','))
+    names = list(dict.fromkeys(name for name in stripped if name))
+    unknown = ', '.join(sorted(set(names) - set(allowed)))
+    if unknown:
+        raise serializers.ValidationError({FIELDS_PARAM: f'Unknown fields: {unknown}.'})
+    return names
+
+
+class SparseFieldsMixin:
+    """Serializer mixin keeping only the fields asked by ?fields=."""
+
+    def __init__(self, *args, **kwargs):
+        """Create serializer and drop the fields that were not asked.
+
+        The asked names are kept in sparse_fields, None means all fields.
+
+        Args:
+            args: positional arguments of the serializer
+            kwargs: keyword arguments of the serializer
+        """
+        super().__init__(*args, **kwargs)
+        readable = [name for name, field in self.fields.items() if not field.write_only]
+        self.sparse_fields = requested_fields(self.context.get('request'), readable)
+        if self.sparse_fields is not None:
+            for name in set(self.fields) - set(self.sparse_fields):
+                self.fields.pop(name)
+
+
+class GamesSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """
     Serializer for the Games model.
 
     This serializer converts the Games model instance into a JSON representation
     and validates the data for creating or updating a Games instance.
+    Genres are written by their ids and are not shown.
     """
 
+    genres = serializers.ListField(child=serializers.UUIDField(), write_only=True, required=False)
+
     class Meta:
         """Class Meta about GamesSerializer."""
 
         model = Games
         fields = [
-            'id', 'title', 'price',
+            'id', 'title', 'price', 'genres',
         ]
 
+    def validate_genres(self, genre_ids):
+        """Check that the genres exist.
+
+        Ids of all genres are read once per request, so a batch of games
+        is checked without a query per game.
+
+        Args:
+            genre_ids: ids of genres of the game
+
+        Raises:
+            ValidationError: if a genre does not exist
+
+        Returns:
+            list: ids of genres without repeats
+        """
+        known = self.context.get(KNOWN_GENRES)
+        if known is None:
+            known = set(Genre.objects.order_by().values_list('id', flat=True))
+            self.context[KNOWN_GENRES] = known
+        unknown = ', '.join(sorted(str(genre_id) for genre_id in set(genre_ids) - known))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown genres: {unknown}.')
+        return list(dict.fromkeys(genre_ids))
+
 
-class ClientSerializer(serializers.HyperlinkedModelSerializer):
+class ClientSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """
     Serializer for the Client model.
 
@@ -70,7 +146,7 @@ class ClientSerializer(serializers.HyperlinkedModelSerializer):
         return super().validate(date_registrate)
 
 
-class CommentSerializer(serializers.HyperlinkedModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """
     Serializer for the Comment model.
 
@@ -105,7 +181,7 @@ class CommentSerializer(serializers.HyperlinkedModelSerializer):
         return super().validate(date_registrate)
 
 
-class GenreSerializer(serializers.HyperlinkedModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for the Genre model.
 
     This serializer converts the Genre model instance into a JSON representation
@@ -119,3 +195,9 @@ class GenreSerializer(serializers.HyperlinkedModelSerializer):
         fields = [
             'id', 'title',
         ]
+
+
+class BulkIdSerializer(serializers.Serializer):
+    """Serializer of ids of objects changed by a batch update."""
+
+    id = serializers.UUIDField()
@@ -0,0 +1,198 @@
+"""This module include signal handlers."""
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_token
+from .autocomplete import title_index
+from .cart import invalidate_cart, invalidate_carts_of
+from .clients import forget_client
+from .models import Client, Comment, GameClient, GameGenre, Games, Genre
+from .versions import bump_object_versions, bump_version
+
+
+@receiver(post_save, sender=Games)
+def index_game_title(sender, instance, **kwargs):
+    """Put title of the saved game into the autocomplete index.
+
+    Args:
+        sender: model class
+        instance: saved game
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(title_index.add, instance.pk, instance.title))
+
+
+@receiver(post_delete, sender=Games)
+def unindex_game_title(sender, instance, **kwargs):
+    """Remove title of the deleted game from the autocomplete index.
+
+    Args:
+        sender: model class
+        instance: deleted game
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(title_index.remove, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Games)
+def forget_carts_of_game(sender, instance, **kwargs):
+    """Drop cached totals of carts holding the saved or deleted game.
+
+    Args:
+        sender: model class
+        instance: saved or deleted game
+        kwargs: other signal arguments
+    """
+    invalidate_carts_of([instance.pk])
+
+
+@receiver(post_delete, sender=GameClient)
+def forget_cart_of_deleted_link(sender, instance, **kwargs):
+    """Drop the cached cart of the client when a game in the cart is deleted from the library.
+
+    Args:
+        sender: model class
+        instance: deleted link of the game and the client
+        kwargs: other signal arguments
+    """
+    if instance.in_cart:
+        transaction.on_commit(partial(invalidate_cart, instance.client_id))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def forget_cached_client(sender, instance, **kwargs):
+    """Drop the cached client and the cached client id of its user.
+
+    Args:
+        sender: model class
+        instance: saved or deleted client
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(forget_client, instance.pk, instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Games)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=Comment)
+def bump_table_version(sender, instance, **kwargs):
+    """Move version of the changed table forward, so cached responses are refreshed.
+
+    Args:
+        sender: model class
+        instance: saved or deleted object
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(bump_version, sender))
+
+
+@receiver([post_save, post_delete], sender=Games)
+def bump_game_fragments(sender, instance, **kwargs):
+    """Move version of the changed game forward, so its cached fragments are rendered again.
+
+    Args:
+        sender: model class
+        instance: saved or deleted game
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(bump_object_versions, Games, [instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=GameGenre)
+@receiver([post_save, post_delete], sender=Comment)
+def bump_fragments_of_game(sender, instance, **kwargs):
+    """Move version of the game of a changed genre link or comment forward.
+
+    Comments change the rating shown in the fragments of the game.
+
+    Args:
+        sender: model class
+        instance: saved or deleted link or comment
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(bump_object_versions, Games, [instance.game_id]))
+
+
+@receiver(post_save, sender=Genre)
+def bump_fragments_of_genre(sender, instance, created, **kwargs):
+    """Move versions of games of a renamed genre forward.
+
+    Args:
+        sender: model class
+        instance: saved genre
+        created: True for a new genre, it has no games yet
+        kwargs: other signal arguments
+    """
+    if created:
+        return
+    game_ids = list(GameGenre.objects.filter(genre=instance).values_list('game_id', flat=True))
+    transaction.on_commit(partial(bump_object_versions, Games, game_ids))
+
+
+@receiver([post_save, post_delete], sender=GameGenre)
+def touch_game_of_genre_link(sender, instance, **kwargs):
+    """Mark the game as updated when one of its genres is linked or unlinked.
+
+    Args:
+        sender: model class
+        instance: saved or deleted link
+        kwargs: other signal arguments
+    """
+    Games.objects.filter(pk=instance.game_id).update(updated_at=Now())
+
+
+@receiver(m2m_changed, sender=GameGenre)
+def touch_games_of_genre_links(sender, instance, action, reverse, **kwargs):
+    """Mark games as updated when their genres are changed through a relation manager.
+
+    Args:
+        sender: through model
+        instance: game or genre whose relation was changed
+        action: kind of the change
+        reverse: True if instance is a genre
+        kwargs: other signal arguments, pk_set holds ids of the other side
+    """
+    if action not in {'post_add', 'post_remove', 'pre_clear'}:
+        return
+    pk_set = kwargs['pk_set']
+    game_ids = [instance.pk]
+    if reverse:
+        game_ids = GameGenre.objects.filter(genre=instance).values_list('game_id', flat=True) if pk_set is None else pk_set
+    game_ids = list(game_ids)
+    Games.objects.filter(pk__in=game_ids).update(updated_at=Now())
+    transaction.on_commit(partial(bump_object_versions, Games, game_ids))
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Drop the deleted token from the authentication caches.
+
+    Args:
+        sender: model class
+        instance: deleted token
+        kwargs: other signal arguments
+    """
+    transaction.on_commit(partial(forget_token, instance.key))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Drop tokens of a changed user, so deactivation and new permissions apply.
+
+    Args:
+        sender: model class
+        instance: saved user
+        update_fields: saved fields, logins only touch last_login
+        kwargs: other signal arguments
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        transaction.on_commit(partial(forget_token, key))
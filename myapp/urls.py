@@ -26,23 +26,49 @@ router.register('clients', views.ClientViewSet)
 router.register('comment', views.CommentViewSet)
 router.register('genre', views.GenreViewSet)
 
-urlpatterns = [
-    path('', views.home, name='home'),
-    path('games/', views.users_games_catalog, name='games'),
+
+def page_paths(pages) -> list:
+    """Route the read pages to the views of a handler.
+
+    Args:
+        pages: views by names of the URLs, SYNC_PAGES or ASYNC_PAGES
+
+    Returns:
+        list: paths of the pages
+    """
+    return [
+        path('', pages['home'], name='home'),
+        path('games/', pages['games'], name='games'),
+        path('search/', pages['search_games'], name='search_games'),
+        path('browse/', pages['browse'], name='browse'),
+        path('cart', pages['cart'], name='cart'),
+        path('games_detail/<uuid:game_id>/', pages['games_detail'], name='games_detail'),
+    ]
+
+
+shared_paths = [
     path('register/', views.register, name='register'),
     path('accounts/', include('django.contrib.auth.urls')),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
+    path('api/games/<uuid:game_id>/comments/', views.game_comments_api, name='game_comments_api'),
+    path('api/export/<str:resource>.<str:format>', views.export_rows, name='export'),
+    path('api/facets/', views.games_facets_api, name='games_facets_api'),
+    path('api/pools/', views.database_pools, name='database_pools'),
     path('api/', include(router.urls), name='api'),
     path('games_comments/<uuid:game_id>/', views.games_comments, name='games_comments'),
-    path('search/', views.search_games, name='search_games'),
+    path('autocomplete/', views.autocomplete, name='autocomplete'),
     path('add_game/', views.add_game, name='add_game'),
     path('games/<uuid:game_id>/delete/', views.delete_game, name='confirm_delete'),
-    path('cart', views.view_cart, name='cart'),
+    path('cart/checkout/', views.checkout_cart, name='checkout'),
+    path('add_to_cart/', views.add_many_to_cart, name='add_many_to_cart'),
     path('add_to_cart/<uuid:game_id>/', views.add_to_cart, name='add_to_cart'),
     path('buy_game/<uuid:game_id>/', views.buy_game, name='buy_game'),
     path('remove_from_cart/<uuid:game_id>/', views.remove_from_cart, name='remove_from_cart'),
-    path('games_detail/<uuid:game_id>/', views.game_details, name='games_detail'),
     path('comments/<uuid:comment_id>/delete', views.delete_comment, name='comment_delete'),
     path('comments/<uuid:comment_id>/update', views.update_comment, name='update_comment'),
 ]
+
+urlpatterns = page_paths(views.SYNC_PAGES) + shared_paths
+# ASGI requests are routed by myproject.asgi_urls, see AsyncPagesMiddleware.
+async_urlpatterns = page_paths(views.ASYNC_PAGES) + shared_paths
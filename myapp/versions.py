@@ -0,0 +1,163 @@
+"""This module include per-model version stamps for conditional requests."""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+NANOSECONDS = 10 ** 9
+ETAG_LENGTH = 32
+
+
+def _key(model) -> str:
+    name = model.__name__.lower()
+    return f'version:{name}'
+
+
+def _object_key(model, pk) -> str:
+    name = model.__name__.lower()
+    return f'version:{name}:{pk}'
+
+
+def model_version(model) -> int:
+    """Take the version stamp of a table.
+
+    The stamp is the time of the last write in nanoseconds. A missing
+    stamp (a cold or evicted cache) is started from the current time,
+    so ETags made before the eviction never match again.
+
+    Args:
+        model: model class
+
+    Returns:
+        int: version stamp of the table
+    """
+    key = _key(model)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(*models) -> None:
+    """Move version stamps of tables forward after a write.
+
+    Saves and deletes bump the stamps by signals, bulk writes which skip
+    signals (QuerySet.update, bulk_create) have to call it themselves.
+
+    Args:
+        models: model classes of changed tables
+    """
+    _bump([_key(model) for model in models])
+
+
+def _bump(keys: list[str]) -> None:
+    now = time.time_ns()
+    versions = cache.get_many(keys)
+    bumped = {key: max(now, versions.get(key, 0) + 1) for key in keys}
+    cache.set_many(bumped, timeout=None)
+
+
+def object_versions(model, pks) -> dict:
+    """Take version stamps of rows, like model_version for single rows.
+
+    Args:
+        model: model class
+        pks: primary keys of the rows
+
+    Returns:
+        dict: version stamps by primary keys
+    """
+    keys = {_object_key(model, pk): pk for pk in pks}
+    versions = cache.get_many(list(keys))
+    for missing in keys.keys() - versions.keys():
+        started = time.time_ns()
+        cache.add(missing, started, timeout=None)
+        versions[missing] = cache.get(missing, started)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aobject_versions(model, pks) -> dict:
+    """Take version stamps of rows like object_versions in async views.
+
+    Args:
+        model: model class
+        pks: primary keys of the rows
+
+    Returns:
+        dict: version stamps by primary keys
+    """
+    keys = {_object_key(model, pk): pk for pk in pks}
+    versions = await cache.aget_many(list(keys))
+    for missing in keys.keys() - versions.keys():
+        started = time.time_ns()
+        await cache.aadd(missing, started, timeout=None)
+        versions[missing] = await cache.aget(missing, started)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_object_versions(model, pks) -> None:
+    """Move version stamps of changed rows forward.
+
+    Args:
+        model: model class
+        pks: primary keys of the changed rows
+    """
+    _bump([_object_key(model, pk) for pk in pks])
+
+
+def last_modified(version: int) -> datetime:
+    """Convert version stamp into time of the last write.
+
+    Args:
+        version: version stamp of a table
+
+    Returns:
+        datetime: time of the last write in UTC
+    """
+    return datetime.fromtimestamp(version / NANOSECONDS, tz=timezone.utc)
+
+
+def make_etag(version: int, *parts) -> str:
+    """Make strong ETag of a response.
+
+    Args:
+        version: version stamp of the table
+        parts: everything else the response body depends on
+
+    Returns:
+        str: unquoted entity tag
+    """
+    payload = ':'.join(str(part) for part in (version, *parts))
+    return hashlib.sha256(payload.encode()).hexdigest()[:ETAG_LENGTH]
+
+
+def _response_etag(model, request, *args, **kwargs) -> str:
+    media_type = getattr(request, 'accepted_media_type', '')
+    return make_etag(model_version(model), request.get_full_path(), media_type)
+
+
+def _response_last_modified(model, request, *args, **kwargs) -> datetime:
+    return last_modified(model_version(model))
+
+
+def conditional(model):
+    """Make decorator answering 304 Not Modified while a table is unchanged.
+
+    The check runs before the view, so an unchanged resource is not
+    queried and serialized at all.
+
+    Args:
+        model: model class the response is made of
+
+    Returns:
+        decorator of views adding ETag and Last-Modified
+    """
+    return condition(
+        etag_func=partial(_response_etag, model),
+        last_modified_func=partial(_response_last_modified, model),
+    )
@@ -1,20 +1,170 @@
 """This module include views."""
+from contextlib import suppress
+from functools import wraps
+from http import HTTPStatus
+from types import MappingProxyType
+from urllib.parse import urlencode
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
+from django.db import models, transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.http.request import HttpRequest
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import (aget_object_or_404, get_object_or_404, redirect,
+                              render)
 from django.utils import timezone
-from rest_framework import authentication, permissions, viewsets
-
-from .forms import GameForm, RegistrationForm
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
+from rest_framework import permissions, serializers, viewsets
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes, renderer_classes)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from . import cart
+from .authentication import (CachedBasicAuthentication,
+                             CachedTokenAuthentication)
+from .autocomplete import title_index
+from .backends.postgresql_pool.base import pool_stats
+from .bulk import create_objects, update_objects
+from .clients import aclient_by_id, aclient_id_for_user
+from .export import (EXPORTS, SINCE_PARAM, CSVRenderer, NDJSONRenderer,
+                     parse_since)
+from .facets import PRICE_RANGES, FacetQuery
+from .fast_serializers import values_plan
+from .forms import CommentForm, GameForm, RegistrationForm
 from .models import Client, Comment, GameClient, Games, Genre
-from .serializers import (ClientSerializer, CommentSerializer, GamesSerializer,
-                          GenreSerializer)
+from .pagination import (ApiCursorPagination, apaginate_keyset,
+                         ordering_fields, paginate_keyset)
+from .ratings import add_rating, change_rating, remove_rating
+from .routers import replica_reads
+from .search import asearch_page, search_page
+from .serializers import (BulkIdSerializer, ClientSerializer,
+                          CommentSerializer, GamesSerializer, GenreSerializer)
+from .versions import aobject_versions, conditional, object_versions
+
+GAMES_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+COMMENTS_ORDERING = ('-date_public', '-id')
+CART_ORDERING = ('game__title', 'id')
+API_AUTHENTICATION = (CachedTokenAuthentication, CachedBasicAuthentication)
+CATALOG_ORDERINGS = MappingProxyType({
+    'title': ('title', 'id'),
+    'rating': ('-rating_avg', '-id'),
+})
+
+
+def async_login_required(view):
+    """Redirect anonymous users to the login page, like login_required for async views.
+
+    The user is loaded without blocking the event loop and stays on the
+    request, so templates read it without queries.
+
+    Args:
+        view: async view function
+
+    Returns:
+        async view function
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def aload_client(request) -> None:
+    """Load the client and the cart summary of the user for an async render.
+
+    The lazy request.client of ClientMiddleware and the cart_count context
+    processor would query the database inside the event loop, so async
+    views call it before rendering.
+
+    Args:
+        request: the HTTP request object
+    """
+    request.user = await request.auser()
+    request.client = None
+    request.cart_summary = cart.EMPTY_CART
+    if request.user.is_authenticated:
+        client_id = await aclient_id_for_user(request.user.id)
+        request.client = await aclient_by_id(client_id)
+        request.cart_summary = await cart.acart_summary(client_id)
+
+
+def search_results(request):
+    """Take the requested page of search results.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        SearchPage: the page or None if nothing is searched
+    """
+    query = request.GET.get('query')
+    if not query:
+        return None
+    return search_page(query, request.GET.get('page'))
+
+
+async def asearch_results(request):
+    """Take the requested page of search results like search_results in async views.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        SearchPage: the page or None if nothing is searched
+    """
+    query = request.GET.get('query')
+    if not query:
+        return None
+    return await asearch_page(query, request.GET.get('page'))
+
+
+def _games_of(pages) -> list:
+    return [game for page in pages if page for game in page]
+
+
+def attach_versions(*pages) -> None:
+    """Put version stamps on games, templates key cached fragments of games on them.
+
+    Args:
+        pages: lists or pages of games, None is skipped
+    """
+    games = _games_of(pages)
+    versions = object_versions(Games, [game.pk for game in games])
+    for game in games:
+        game.cache_version = versions[game.pk]
+
+
+async def aattach_versions(*pages) -> None:
+    """Put version stamps on games like attach_versions in async views.
+
+    Args:
+        pages: lists or pages of games, None is skipped
+    """
+    games = _games_of(pages)
+    versions = await aobject_versions(Games, [game.pk for game in games])
+    for game in games:
+        game.cache_version = versions[game.pk]
+
+
+def _catalog_sort(request) -> str:
+    sort = request.GET.get('sort')
+    return sort if sort in CATALOG_ORDERINGS else 'title'
 
 
+@replica_reads
 @login_required
 def home(request):
     """
@@ -26,19 +176,46 @@ def home(request):
     Returns:
         HttpResponse: The HTTP response rendering the 'home.html' template with the context data
     """
-    query = request.GET.get('query')
-    games_q = Games.objects.filter(title__icontains=query) if query else None
-    games_all = Games.objects.all()
-    paginator = Paginator(games_all, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    cart_count = GameClient.objects.filter(client__user=request.user, in_cart=True).count()
-    money_client = Client.objects.get(user=request.user).money
+    sort = _catalog_sort(request)
+    page_obj = paginate_keyset(Games.objects.for_listing(), CATALOG_ORDERINGS[sort], request.GET.get('cursor'), GAMES_PER_PAGE)
+    games_q = search_results(request)
+    attach_versions(page_obj, games_q)
+    return render(request, 'home.html', {
+        'games_q': games_q,
+        'query': request.GET.get('query'),
+        'sort': sort,
+        'page_obj': page_obj,
+        'money_client': request.client.money,
+    })
+
+
+@replica_reads
+@async_login_required
+async def ahome(request):
+    """
+    Show the home page like home for the ASGI handler.
+
+    The loads are awaited one after another: Django 5.0 runs every async
+    ORM call on the single thread of the request connection, so gathering
+    them would not make them overlap.
+
+    Args:
+        request: the HTTP request object containing user data and query parameters
+
+    Returns:
+        HttpResponse: The HTTP response rendering the 'home.html' template with the context data
+    """
+    sort = _catalog_sort(request)
+    await aload_client(request)
+    page_obj = await apaginate_keyset(Games.objects.for_listing(), CATALOG_ORDERINGS[sort], request.GET.get('cursor'), GAMES_PER_PAGE)
+    games_q = await asearch_results(request)
+    await aattach_versions(page_obj, games_q)
     return render(request, 'home.html', {
         'games_q': games_q,
+        'query': request.GET.get('query'),
+        'sort': sort,
         'page_obj': page_obj,
-        'cart_count': cart_count,
-        'money_client': money_client,
+        'money_client': request.client.money,
     })
 
 
@@ -128,8 +305,27 @@ def register(request):
     )
 
 
+def get_client_id(request) -> str:
+    """
+    Find the ID of the client of the user.
+
+    Args:
+        request: the HTTP request object
+
+    Raises:
+        Http404: if the user is not associated with a client
+
+    Returns:
+        str: the ID of the client
+    """
+    if not request.client:
+        raise Http404('User is not associated with a client.')
+    return request.client.id
+
+
 safe_methods = 'GET', 'HEAD', 'OPTIONS'
 unsafe_methods = 'POST', 'DELETE', 'PUT'
+WRITE_ACTIONS = frozenset(('update', 'partial_update', 'destroy'))
 
 
 class MyPermission(permissions.BasePermission):
@@ -153,32 +349,260 @@ class MyPermission(permissions.BasePermission):
         return False
 
 
-def create_viewset(model_class, serializer):
+class ApiViewSet(viewsets.ModelViewSet):
+    """Base of the API viewsets with sparse fields, fast lists and batch writes."""
+
+    permission_classes = [MyPermission]
+    authentication_classes = API_AUTHENTICATION
+    replica_reads = True
+
+    def get_queryset(self):
+        """
+        Take objects of the viewset, only the asked fields are selected.
+
+        Writes load whole objects: a deferred field (updated_at of a
+        listing queryset) is left out of save(), so it would never change.
+
+        Returns:
+            QuerySet: objects of the viewset
+        """
+        if self.action in WRITE_ACTIONS:
+            return self.queryset.model.objects.all()
+        queryset = super().get_queryset()
+        names = self.get_serializer().sparse_fields
+        if names is None:
+            return queryset
+        return queryset.only('pk', *ordering_fields(self.pagination_class.ordering), *names)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List objects from .values() rows when the serializer has plain columns only.
+
+        Args:
+            request: the HTTP request object
+            args: positional arguments of the view
+            kwargs: keyword arguments of the view
+
+        Returns:
+            Response: the page of serialized objects
+        """
+        plan = values_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        columns = dict.fromkeys([*plan.sources, *ordering_fields(self.pagination_class.ordering)])
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*columns)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(plan.serialize(rows))
+        return self.get_paginated_response(plan.serialize(page))
+
+    @action(detail=False, methods=['post', 'put'])
+    def bulk(self, request):
+        """
+        Create (POST) or update (PUT) up to API_BULK_LIMIT objects at once.
+
+        The whole array is validated before anything is written, then the
+        objects are written by batched INSERTs or UPDATEs in one transaction.
+
+        Args:
+            request: the HTTP request object with an array of objects
+
+        Returns:
+            Response: the written objects
+        """
+        model = self.queryset.model
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.API_BULK_LIMIT,
+        )
+        if request.method == 'POST':
+            serializer.is_valid(raise_exception=True)
+            created = create_objects(model, serializer.validated_data)
+            return Response(self.get_serializer(created, many=True).data, status=HTTPStatus.CREATED)
+        instances = self.bulk_instances(request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = update_objects(model, instances, serializer.validated_data)
+        return Response(self.get_serializer(updated, many=True).data)
+
+    def bulk_instances(self, rows) -> list:
+        """
+        Load objects of a batch update in the order of rows.
+
+        Args:
+            rows: array of objects from the request
+
+        Raises:
+            ValidationError: if ids are missing, repeated or unknown
+
+        Returns:
+            list: objects to update
+        """
+        ids = BulkIdSerializer(data=rows, many=True, allow_empty=False, max_length=settings.API_BULK_LIMIT)
+        ids.is_valid(raise_exception=True)
+        keys = [row['id'] for row in ids.validated_data]
+        if len(set(keys)) != len(keys):
+            raise serializers.ValidationError({'id': 'Objects are repeated.'})
+        found = self.queryset.model.objects.in_bulk(keys)
+        unknown = ', '.join(str(key) for key in keys if key not in found)
+        if unknown:
+            raise serializers.ValidationError({'id': f'Unknown objects: {unknown}.'})
+        return [found[key] for key in keys]
+
+
+def create_viewset(model_class, serializer, page_ordering, base_queryset=None):
     """
     Create a viewset for a given model class and serializer.
 
+    Lists are cursor paginated by page_ordering. The ?fields= parameter
+    keeps only the asked fields in the response and in the SELECT.
+    Reads carry ETag and Last-Modified made from the version of the table
+    and answer 304 Not Modified without querying it. Lists of plain
+    columns are serialized from .values() rows, skipping model instances.
+
     Args:
         model_class: the Django model class for which the viewset is being created
         serializer: the serializer class to use for the viewset
+        page_ordering: unique ordering of the pages, '-' prefix for descending
+        base_queryset: the queryset to use instead of all objects of the model
 
     Returns:
         Type: a dynamically created viewset class for the specified model and serializer
     """
-    class ViewSet(viewsets.ModelViewSet):
-        queryset = model_class.objects.all()
+    class Pagination(ApiCursorPagination):
+        ordering = page_ordering
+
+    class ViewSet(ApiViewSet):
+        queryset = model_class.objects.all() if base_queryset is None else base_queryset
         serializer_class = serializer
-        permission_classes = [MyPermission]
-        authentication_classes = [authentication.TokenAuthentication, authentication.BasicAuthentication]
+        pagination_class = Pagination
+
+        @method_decorator(conditional(model_class))
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+
+        @method_decorator(conditional(model_class))
+        def retrieve(self, request, *args, **kwargs):
+            return super().retrieve(request, *args, **kwargs)
 
     return ViewSet
 
 
-GamesViewSet = create_viewset(Games, GamesSerializer)
-ClientViewSet = create_viewset(Client, ClientSerializer)
-GenreViewSet = create_viewset(Genre, GenreSerializer)
-CommentViewSet = create_viewset(Comment, CommentSerializer)
+GamesViewSet = create_viewset(Games, GamesSerializer, ('title', 'id'), Games.objects.for_listing(genres=False))
+ClientViewSet = create_viewset(Client, ClientSerializer, ('nickname', 'id'))
+GenreViewSet = create_viewset(Genre, GenreSerializer, ('title', 'id'))
+CommentViewSet = create_viewset(Comment, CommentSerializer, COMMENTS_ORDERING)
+
+
+def comments_page(game_id, cursor):
+    """
+    Take one page of comments of a game, the newest first.
+
+    Args:
+        game_id: the ID of the game
+        cursor: the cursor from the request or None for the first page
+
+    Returns:
+        KeysetPage: the page of comments
+    """
+    comments = Comment.objects.filter(game=game_id).select_related('client')
+    return paginate_keyset(comments, COMMENTS_ORDERING, cursor, COMMENTS_PER_PAGE)
+
+
+async def acomments_page(game_id, cursor):
+    """
+    Take one page of comments of a game like comments_page in async views.
+
+    Args:
+        game_id: the ID of the game
+        cursor: the cursor from the request or None for the first page
+
+    Returns:
+        KeysetPage: the page of comments
+    """
+    comments = Comment.objects.filter(game=game_id).select_related('client')
+    return await apaginate_keyset(comments, COMMENTS_ORDERING, cursor, COMMENTS_PER_PAGE)
+
+
+@replica_reads
+@api_view(['GET'])
+@authentication_classes(API_AUTHENTICATION)
+@permission_classes([MyPermission])
+def game_comments_api(request, game_id):
+    """
+    List comments of a game with the same cursors as the game page.
+
+    Args:
+        request: the HTTP request object
+        game_id: the ID of the game
+
+    Returns:
+        Response: comments of the page with links to neighbour pages
+    """
+    get_object_or_404(Games.objects.only('id'), pk=game_id)
+    page = comments_page(game_id, request.query_params.get('cursor'))
+    url = request.build_absolute_uri()
+    return Response({
+        'next': replace_query_param(url, 'cursor', page.next_cursor) if page.has_next else None,
+        'previous': replace_query_param(url, 'cursor', page.previous_cursor) if page.has_previous else None,
+        'results': CommentSerializer(page.object_list, many=True, context={'request': request}).data,
+    })
+
+
+@api_view(['GET'])
+@authentication_classes(API_AUTHENTICATION)
+@permission_classes([permissions.IsAdminUser])
+@renderer_classes([NDJSONRenderer, CSVRenderer])
+def export_rows(request, resource, **kwargs):
+    """
+    Stream all rows of a resource as NDJSON or CSV, the format is taken from the URL suffix.
+
+    Rows are read by a server-side cursor in chunks, so memory does not
+    depend on the size of the table.
+
+    Args:
+        request: the HTTP request object
+        resource: games, comments or purchases
+        kwargs: the format suffix
+
+    Raises:
+        Http404: if the resource is unknown
+
+    Returns:
+        StreamingHttpResponse: the rows, oldest changes first
+    """
+    export = EXPORTS.get(resource)
+    if export is None:
+        raise Http404
+    since = parse_since(request.query_params.get(SINCE_PARAM))
+    renderer = request.accepted_renderer
+    response = StreamingHttpResponse(
+        renderer.lines(export.headers, export.rows(since)),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{renderer.format}"'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes(API_AUTHENTICATION)
+@permission_classes([permissions.IsAdminUser])
+def database_pools(request):
+    """
+    Show counters of the connection pools of the process which answered.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        Response: checkouts (requests_num), total wait (requests_wait_ms) and sizes of every pool
+    """
+    return Response(pool_stats())
+
 
+def _users_games(request) -> models.QuerySet:
+    return Games.objects.for_listing().filter(clients=get_client_id(request)).order_by(*CATALOG_ORDERINGS['title'])
 
+
+@replica_reads
 def users_games_catalog(request: HttpRequest):
     """
     Display the catalog of games associated with the authenticated user.
@@ -191,11 +615,28 @@ def users_games_catalog(request: HttpRequest):
     """
     if not request.user.is_authenticated:
         return redirect('home')
-    client_id = Client.objects.filter(user=request.user.id)[0].id
-    instances = Games.objects.filter(clients=client_id)
+    return render(request, 'games.html', context={'games_list': list(_users_games(request))})
+
+
+@replica_reads
+async def ausers_games_catalog(request: HttpRequest):
+    """
+    Display the catalog of games of the user like users_games_catalog for the ASGI handler.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'games.html' template with the user's games
+    """
+    await aload_client(request)
+    if not request.user.is_authenticated:
+        return redirect('home')
+    instances = [game async for game in _users_games(request)]
     return render(request, 'games.html', context={'games_list': instances})
 
 
+@replica_reads
 def games_comments(request: HttpRequest, game_id):
     """
     Display comments for a specific game.
@@ -210,12 +651,11 @@ def games_comments(request: HttpRequest, game_id):
     if not request.user.is_authenticated:
         return redirect('home')
 
-    client = Client.objects.filter(user=request.user).first()
-    if not client:
+    if not request.client:
         return render(request, 'error.html', {'error_message': 'User is not associated with a client.'})
 
     game = get_object_or_404(Games, pk=game_id)
-    comments = Comment.objects.filter(game=game)
+    comments = comments_page(game.id, request.GET.get('cursor'))
     return render(request, 'games_comments.html', {'game': game, 'comments': comments})
 
 
@@ -228,14 +668,14 @@ def add_to_cart(request, game_id):
         request: the HTTP request object
         game_id: the ID of the game to be added
 
+    Raises:
+        Http404: if the game does not exist
+
     Returns:
         HttpResponseRedirect: redirects to 'home'
     """
-    client = Client.objects.get(user=request.user)
-    game = get_object_or_404(Games, pk=game_id)
-    game_client, created = GameClient.objects.get_or_create(client=client, game=game)
-    game_client.in_cart = True
-    game_client.save()
+    if not cart.add_to_cart(get_client_id(request), [game_id]):
+        raise Http404('No Games matches the given query.')
     return redirect('home')
 
 
@@ -244,35 +684,68 @@ def buy_game(request: HttpRequest, game_id):
     """
     Purchase a game for the user.
 
+    The purchase raises ValidationError if the user does not have enough money.
+
     Args:
         request: the HTTP request object
         game_id: the ID of the game to be purchased
 
     Raises:
-        ValidationError: if the user does not have enough money to buy the game
+        Http404: if the game does not exist
 
     Returns:
         HttpResponseRedirect: redirects to 'cart'
     """
-    client = Client.objects.get(user=request.user)
-    game = get_object_or_404(Games, pk=game_id)
+    try:
+        cart.buy(get_client_id(request), game_id)
+    except Games.DoesNotExist:
+        raise Http404('No Games matches the given query.')
 
-    if client.money < game.price:
-        raise ValidationError('You have not money.')
+    return redirect('cart')
 
-    client.money = client.money - game.price
-    client.save()
 
-    game_client, created = GameClient.objects.get_or_create(client=client, game=game)
+@login_required
+@require_POST
+def add_many_to_cart(request: HttpRequest):
+    """
+    Add several games to the user's cart at once.
 
-    if game_client.in_cart:
-        game_client.in_cart = False
-    game_client.purchased = True
-    game_client.save()
+    Args:
+        request: the HTTP request object with 'game_id' values
 
+    Returns:
+        HttpResponseRedirect: redirects to 'cart'
+    """
+    game_ids = []
+    for game_id in request.POST.getlist('game_id'):
+        with suppress(ValueError):
+            game_ids.append(UUID(game_id))
+    cart.add_to_cart(get_client_id(request), game_ids)
     return redirect('cart')
 
 
+@login_required
+@require_POST
+def checkout_cart(request: HttpRequest):
+    """
+    Purchase every game in the user's cart at once.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'cart.html' template with an error if the user does not have enough money
+        HttpResponseRedirect: redirects to 'games' after the purchase
+    """
+    client_id = get_client_id(request)
+    try:
+        cart.checkout(client_id)
+    except ValidationError as error:
+        cart_items = GameClient.objects.filter(client=client_id, in_cart=True).select_related('game').order_by(*CART_ORDERING)
+        return render(request, 'cart.html', {'cart_items': cart_items, 'error_message': error.message}, status=HTTPStatus.BAD_REQUEST)
+    return redirect('games')
+
+
 @login_required
 def remove_from_cart(request, game_id):
     """
@@ -285,14 +758,11 @@ def remove_from_cart(request, game_id):
     Returns:
         HttpResponseRedirect: redirects to 'home'
     """
-    client = Client.objects.get(user=request.user)
-    game = get_object_or_404(Games, pk=game_id)
-    game_client = GameClient.objects.get(client=client, game=game)
-    game_client.in_cart = False
-    game_client.save()
+    cart.remove_from_cart(get_client_id(request), [game_id])
     return redirect('home')
 
 
+@replica_reads
 def search_games(request):
     """
     Search for games by title.
@@ -303,14 +773,153 @@ def search_games(request):
     Returns:
         HttpResponse: the rendered 'home.html' template with the search results
     """
-    query = request.GET.get('query')
-    if query:
-        games = Games.objects.filter(title__icontains=query)
-    else:
-        games = Games.objects.none()
-    return render(request, 'home.html', {'games': games})
+    games_q = search_results(request)
+    attach_versions(games_q)
+    return render(request, 'home.html', {'games_q': games_q, 'query': request.GET.get('query')})
+
+
+@replica_reads
+async def asearch_games(request):
+    """
+    Search for games by title like search_games for the ASGI handler.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'home.html' template with the search results
+    """
+    await aload_client(request)
+    games_q = await asearch_results(request)
+    await aattach_versions(games_q)
+    return render(request, 'home.html', {'games_q': games_q, 'query': request.GET.get('query')})
+
+
+async def afacet_page(facets: FacetQuery, cursor) -> tuple:
+    """Take a page of matched games and counts of genres of the selection.
+
+    Args:
+        facets: selected genres and price buckets
+        cursor: token of the page or None for the first one
 
+    Returns:
+        tuple: page of games and genres with games_count
+    """
+    games = facets.games(Games.objects.for_listing(genres=False))
+    page_obj = await apaginate_keyset(games, CATALOG_ORDERINGS['title'], cursor, GAMES_PER_PAGE)
+    return page_obj, await facets.agenre_counts()
+
+
+def render_browse(request, facets: FacetQuery, page_obj, genres):
+    """Render the browse page of a selection.
+
+    Args:
+        request: the HTTP request object
+        facets: selected genres and price buckets
+        page_obj: page of matched games
+        genres: genres with games_count
 
+    Returns:
+        HttpResponse: the rendered 'browse.html' template
+    """
+    return render(request, 'browse.html', {
+        'page_obj': page_obj,
+        'genres': genres,
+        'selected': {str(genre_id) for genre_id in facets.genre_ids},
+        'facets': facets,
+        'price_ranges': PRICE_RANGES,
+        'selection': urlencode(facets.selection()),
+    })
+
+
+@replica_reads
+@login_required
+def browse_games(request):
+    """
+    Browse the catalog by genres and price ranges with counts of games of every genre.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'browse.html' template with the page and the facets
+    """
+    facets = FacetQuery.from_params(request.GET)
+    games = facets.games(Games.objects.for_listing(genres=False))
+    page_obj = paginate_keyset(games, CATALOG_ORDERINGS['title'], request.GET.get('cursor'), GAMES_PER_PAGE)
+    attach_versions(page_obj)
+    return render_browse(request, facets, page_obj, list(facets.genre_counts()))
+
+
+@replica_reads
+@async_login_required
+async def abrowse_games(request):
+    """
+    Browse the catalog like browse_games for the ASGI handler.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'browse.html' template with the page and the facets
+    """
+    facets = FacetQuery.from_params(request.GET)
+    await aload_client(request)
+    page_obj, genres = await afacet_page(facets, request.GET.get('cursor'))
+    await aattach_versions(page_obj)
+    return render_browse(request, facets, page_obj, genres)
+
+
+@replica_reads
+@api_view(['GET'])
+@authentication_classes(API_AUTHENTICATION)
+@permission_classes([MyPermission])
+def games_facets_api(request):
+    """
+    List games of the selected genres and price buckets with counts of games of every genre.
+
+    Args:
+        request: the HTTP request object with genre, price_from and price_to parameters
+
+    Returns:
+        Response: counts of genres, price buckets and a page of games with links to neighbour pages
+    """
+    facets = FacetQuery.from_params(request.query_params)
+    games = facets.games(Games.objects.for_listing(genres=False))
+    page = paginate_keyset(games, CATALOG_ORDERINGS['title'], request.query_params.get('cursor'), GAMES_PER_PAGE)
+    url = request.build_absolute_uri()
+    return Response({
+        'genres': [
+            {'id': genre.pk, 'title': genre.title, 'games_count': genre.games_count}
+            for genre in facets.genre_counts()
+        ],
+        'price_buckets': [{'bucket': bucket, 'label': label} for bucket, label in PRICE_RANGES],
+        'next': replace_query_param(url, 'cursor', page.next_cursor) if page.has_next else None,
+        'previous': replace_query_param(url, 'cursor', page.previous_cursor) if page.has_previous else None,
+        'results': GamesSerializer(page.object_list, many=True, context={'request': request}).data,
+    })
+
+
+@login_required
+def autocomplete(request):
+    """
+    Suggest game titles starting with the typed text.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        JsonResponse: matched titles with ids of games
+    """
+    return JsonResponse({'results': title_index.suggest(request.GET.get('q', ''))})
+
+
+def _cart_items(request) -> models.QuerySet:
+    in_cart = GameClient.objects.filter(client=get_client_id(request), in_cart=True).select_related('game')
+    return in_cart.order_by(*CART_ORDERING)
+
+
+@replica_reads
 @login_required
 def view_cart(request):
     """
@@ -322,11 +931,62 @@ def view_cart(request):
     Returns:
         HttpResponse: the rendered 'cart.html' template with the cart items
     """
-    client = Client.objects.get(user=request.user)
-    cart_items = GameClient.objects.filter(client=client, in_cart=True)
+    return render(request, 'cart.html', {'cart_items': list(_cart_items(request))})
+
+
+@replica_reads
+@async_login_required
+async def aview_cart(request):
+    """
+    Display the user's cart like view_cart for the ASGI handler.
+
+    Args:
+        request: the HTTP request object
+
+    Returns:
+        HttpResponse: the rendered 'cart.html' template with the cart items
+    """
+    await aload_client(request)
+    cart_items = [game_client async for game_client in _cart_items(request)]
     return render(request, 'cart.html', {'cart_items': cart_items})
 
 
+def posted_comment(request) -> dict | None:
+    """
+    Validate a posted comment with CommentForm.
+
+    Args:
+        request: the HTTP request object with description and estimation
+
+    Returns:
+        dict: cleaned description and estimation or None if the comment is invalid
+    """
+    form = CommentForm(request.POST)
+    return form.cleaned_data if form.is_valid() else None
+
+
+def post_comment(game, client, description: str, estimation) -> None:
+    """
+    Save a comment and count its estimation in the rating of the game.
+
+    Args:
+        game: the commented game
+        client: the author of the comment
+        description: text of the comment
+        estimation: rating given by the author
+    """
+    with transaction.atomic():
+        Comment.objects.create(
+            description=description,
+            game=game,
+            date_public=timezone.now(),
+            estimation=estimation,
+            client=client,
+        )
+        add_rating(game.id, estimation)
+
+
+@replica_reads
 @login_required
 def game_details(request: HttpRequest, game_id):
     """
@@ -339,23 +999,64 @@ def game_details(request: HttpRequest, game_id):
     Returns:
         HttpResponse: the rendered 'games_detail.html' template with the game's details and comments
     """
-    game = get_object_or_404(Games, id=game_id)
-    client = Client.objects.get(user=request.user)
+    game = get_object_or_404(Games.objects.for_listing(), id=game_id)
+    client = request.client
+    status = HTTPStatus.OK
     if request.method == 'POST':
-        description = request.POST.get('description')
-        estimation = request.POST.get('estimation')
-        if description and estimation:
-            Comment.objects.create(
-                description=description,
-                game=game,
-                date_public=timezone.now(),
-                estimation=estimation,
-                client=client,
-            )
+        posted = posted_comment(request)
+        if posted is not None:
+            post_comment(game, client, **posted)
             return redirect('games_detail', game_id=game.id)
-    comments = Comment.objects.filter(game=game)
-    count_comment_user = Comment.objects.all().filter(client=client).count()
-    return render(request, 'games_detail.html', {'game': game, 'comments': comments, 'count_comment_user': count_comment_user})
+        status = HTTPStatus.BAD_REQUEST
+    comments = comments_page(game.id, request.GET.get('cursor'))
+    count_comment_user = Comment.objects.filter(client=client).count()
+    attach_versions([game])
+    context = {'game': game, 'comments': comments, 'count_comment_user': count_comment_user}
+    return render(request, 'games_detail.html', context, status=status)
+
+
+async def agame_context(game, client, cursor) -> dict:
+    """Load comments of a game page like game_details does in async views.
+
+    Args:
+        game: the game
+        client: the client of the user
+        cursor: token of the page of comments or None for the first one
+
+    Returns:
+        dict: context of the 'games_detail.html' template
+    """
+    comments = await acomments_page(game.id, cursor)
+    count_comment_user = await Comment.objects.filter(client=client).acount()
+    await aattach_versions([game])
+    return {'game': game, 'comments': comments, 'count_comment_user': count_comment_user}
+
+
+@replica_reads
+@async_login_required
+async def agame_details(request: HttpRequest, game_id):
+    """
+    Display details of a game like game_details for the ASGI handler.
+
+    Args:
+        request: the HTTP request object
+        game_id: the ID of the game
+
+    Returns:
+        HttpResponse: the rendered 'games_detail.html' template with the game's details and comments
+    """
+    game = await aget_object_or_404(Games.objects.for_listing(), id=game_id)
+    await aload_client(request)
+    client = request.client
+    status = HTTPStatus.OK
+    if request.method == 'POST':
+        posted = posted_comment(request)
+        if posted is not None:
+            await sync_to_async(post_comment)(game, client, **posted)
+            return redirect('games_detail', game_id=game.id)
+        status = HTTPStatus.BAD_REQUEST
+    context = await agame_context(game, client, request.GET.get('cursor'))
+    return render(request, 'games_detail.html', context, status=status)
 
 
 @login_required
@@ -414,8 +1115,11 @@ def delete_comment(request: HttpRequest, comment_id):
         HttpResponseRedirect: redirects to the game's detail page
     """
     comment = get_object_or_404(Comment, pk=comment_id)
-    comment.delete()
-    return redirect('games_detail', comment.game.id)
+    with transaction.atomic():
+        deleted, _ = Comment.objects.filter(pk=comment.pk).delete()
+        if deleted and comment.game_id:
+            remove_rating(comment.game_id, comment.estimation)
+    return redirect('games_detail', comment.game_id)
 
 
 def update_comment(request: HttpRequest, comment_id):
@@ -432,11 +1136,35 @@ def update_comment(request: HttpRequest, comment_id):
     """
     comment = get_object_or_404(Comment, pk=comment_id)
     game_id = comment.game.id
-    if request.method == 'POST':
-        description = request.POST.get('description')
-        estimation = request.POST.get('estimation')
-        comment.estimation = estimation
-        comment.description = description
+    context = {'game_id': game_id, 'comment_id': comment_id}
+    if request.method != 'POST':
+        return render(request, 'comment_update.html', context)
+    posted = posted_comment(request)
+    if posted is None:
+        return render(request, 'comment_update.html', context, status=HTTPStatus.BAD_REQUEST)
+    with transaction.atomic():
+        comment = Comment.objects.select_for_update().get(pk=comment_id)
+        change_rating(game_id, comment.estimation, posted['estimation'])
+        comment.estimation = posted['estimation']
+        comment.description = posted['description']
         comment.save()
-        return redirect('games_detail', game_id)
-    return render(request, 'comment_update.html', {'game_id': game_id, 'comment_id': comment_id})
+    return redirect('games_detail', game_id)
+
+
+# Read pages served by the WSGI and the ASGI handler, by names of their URLs.
+SYNC_PAGES = MappingProxyType({
+    'home': home,
+    'games': users_games_catalog,
+    'search_games': search_games,
+    'browse': browse_games,
+    'cart': view_cart,
+    'games_detail': game_details,
+})
+ASYNC_PAGES = MappingProxyType({
+    'home': ahome,
+    'games': ausers_games_catalog,
+    'search_games': asearch_games,
+    'browse': abrowse_games,
+    'cart': aview_cart,
+    'games_detail': agame_details,
+})
@@ -0,0 +1,14 @@
+"""
+URL configuration of requests of the ASGI handler.
+
+The same URLs as myproject.urls, read pages are served by async views.
+"""
+from django.contrib import admin
+from django.urls import include, path
+
+from myapp.urls import async_urlpatterns
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include(async_urlpatterns), name='myapp'),
+]
@@ -42,16 +42,21 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.QueryTimingMiddleware',
+    'myapp.middleware.AsyncPagesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'myapp.middleware.ReplicaMiddleware',
+    'myapp.middleware.ClientMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,15 +64,26 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         # 'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'myapp.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'PAGE_SIZE': int(getenv('API_PAGE_SIZE', '50')),
 }
+API_BULK_LIMIT = int(getenv('API_BULK_LIMIT', '1000'))
+API_BULK_BATCH_SIZE = int(getenv('API_BULK_BATCH_SIZE', '500'))
+AUTH_CACHE_TIMEOUT = int(getenv('AUTH_CACHE_TIMEOUT', '300'))
+AUTH_LOCAL_TIMEOUT = int(getenv('AUTH_LOCAL_TIMEOUT', '10'))
+AUTH_LOCAL_SIZE = int(getenv('AUTH_LOCAL_SIZE', '10000'))
+
+# Pagination is set per viewset, PAGE_SIZE is their default page size.
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
 
 
 ROOT_URLCONF = 'myproject.urls'
+# Requests of the ASGI handler, read pages are served by async views there.
+ASGI_URLCONF = 'myproject.asgi_urls'
 
 TEMPLATES = [
     {
@@ -81,6 +97,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'myapp.context_processors.cart_count',
+                'myapp.context_processors.fragment_cache',
             ],
         },
     },
@@ -94,20 +111,82 @@ WSGI_APPLICATION = 'myproject.wsgi.application'
 
 load_dotenv()
 
+# Every process keeps a psycopg pool of connections (PG_POOL=0 turns it off,
+# then a connection of a thread persists for PG_CONN_MAX_AGE seconds).
+PG_POOL = getenv('PG_POOL', '1') == '1'
+PG_POOL_OPTIONS = {
+    'min_size': int(getenv('PG_POOL_MIN_SIZE', '2')),
+    'max_size': int(getenv('PG_POOL_MAX_SIZE', '10')),
+    'timeout': float(getenv('PG_POOL_TIMEOUT', '30')),
+    'max_lifetime': float(getenv('PG_POOL_MAX_LIFETIME', '3600')),
+    'max_idle': float(getenv('PG_POOL_MAX_IDLE', '600')),
+    'check': getenv('PG_POOL_CHECK', '1') == '1',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'myapp.backends.postgresql_pool',
         'NAME': getenv('PG_DBNAME'),
         'USER': getenv('PG_USER'),
         'PASSWORD': getenv('PG_PASSWORD'),
         'HOST': getenv('PG_HOST'),
         'PORT': getenv('PG_PORT'),
-        'OPTIONS': {'options': '-c search_path=public,games_data'},
+        'CONN_MAX_AGE': 0 if PG_POOL else int(getenv('PG_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'options': '-c search_path=public,games_data',
+            'pool': PG_POOL_OPTIONS if PG_POOL else False,
+        },
         'TEST': {
             'NAME': 'test_db',
         },
     },
 }
+
+# Read replicas, PG_REPLICA_HOSTS is a comma separated list of host:port.
+# Name and credentials are those of the primary unless PG_REPLICA_* are set.
+# Replicas mirror the test database in tests.
+
+DATABASE_REPLICAS = []
+for number, address in enumerate(filter(None, getenv('PG_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = address.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': getenv('PG_REPLICA_DBNAME', DATABASES['default']['NAME']),
+        'USER': getenv('PG_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': getenv('PG_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['myapp.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(getenv('PG_REPLICA_PIN_SECONDS', '5'))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Several workers must share one cache (REDIS_URL), the local memory cache is for development.
+
+if getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': getenv('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+CART_CACHE_TIMEOUT = int(getenv('CART_CACHE_TIMEOUT', '3600'))
+CLIENT_CACHE_TIMEOUT = int(getenv('CLIENT_CACHE_TIMEOUT', '3600'))
+# Fragments of game pages are keyed on versions of games, the timeout only limits memory.
+FRAGMENT_CACHE_TIMEOUT = int(getenv('FRAGMENT_CACHE_TIMEOUT', '86400'))
+EXPORT_CHUNK_SIZE = int(getenv('EXPORT_CHUNK_SIZE', '2000'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -155,3 +234,25 @@ LOGOUT_REDIRECT_URL = 'login'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TEST_RUNNER = 'tests.runner.PostgresSchemaRunner'
+
+# Seconds before the per-process autocomplete index is reloaded from the database
+AUTOCOMPLETE_MAX_AGE = int(getenv('AUTOCOMPLETE_MAX_AGE', '300'))
+
+# Share of requests whose SQL queries are timed, from 0 (off) to 1 (every request)
+SQL_TIMING_SAMPLE_RATE = float(getenv('SQL_TIMING_SAMPLE_RATE', '0'))
+# Queries of sampled requests at least this slow are written to the myapp.slow_queries log
+SQL_SLOW_QUERY_MS = float(getenv('SQL_SLOW_QUERY_MS', '100'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '{message}', 'style': '{'},
+    },
+    'handlers': {
+        'slow_queries': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'myapp.slow_queries': {'handlers': ['slow_queries'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -1,12 +1,35 @@
 """This module include tests for api."""
+import base64
+import json
+from datetime import timedelta
+from unittest import skipUnless
+from uuid import uuid4
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from myapp.models import Client, Comment, Games, Genre
+from myapp.authentication import token_cache_key
+from myapp.fast_serializers import values_plan
+from myapp.models import (Client, Comment, GameClient, GameGenre, Games, Genre,
+                          GenreFacet)
+from myapp.serializers import (ClientSerializer, CommentSerializer,
+                               GamesSerializer, GenreSerializer)
+from myapp.views import COMMENTS_PER_PAGE as PAGE
+
+COMMENTS = 25
+PRICE = 235
+GAMES = 7
+API_PAGE = 3
+BULK_QUERIES = 5
 
 
 def create_api_test(model_class, url, creation_attrs):
@@ -81,3 +104,407 @@ GamesApiTest = create_api_test(Games, '/api/games/', {'title': 'A', 'price': 235
 GenreApiTest = create_api_test(Genre, '/api/genre/', {'title': 'Fiction'})
 ClientApiTest = create_api_test(Client, '/api/clients/', {'nickname': 'A B C', 'money': 1323, 'date_registrate': timezone.now().date()})
 CommentApiTest = create_api_test(Comment, '/api/comment/', {'description': 'A', 'date_public': timezone.now().date(), 'estimation': 5})
+
+
+def comments_url(game_id) -> str:
+    """
+    Make URL of the comments of a game.
+
+    Args:
+        game_id: the ID of the game
+
+    Returns:
+        str: URL of the comments
+    """
+    return f'/api/games/{game_id}/comments/'
+
+
+class GameCommentsApiTest(TestCase):
+    """Tests for the comments of a game in the API."""
+
+    def setUp(self):
+        """Create a game with comments and authenticate a user."""
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(username='user', password='user'))
+        self.game = Games.objects.create(title='A', price=PRICE)
+        today = timezone.now().date()
+        Comment.objects.bulk_create(
+            Comment(description=str(number), game=self.game, estimation=5, date_public=today - timedelta(days=number))
+            for number in range(COMMENTS)
+        )
+        self.url = comments_url(self.game.id)
+
+    def test_pages(self):
+        """Walk the pages forward and back, the newest comments go first."""
+        first = self.client.get(self.url).json()
+        descriptions = [row['description'] for row in first['results']]
+        self.assertEqual(descriptions, [str(number) for number in range(PAGE)])
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), COMMENTS - PAGE)
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get(second['previous']).json()['results'], first['results'])
+
+    def test_unknown_game(self):
+        """Comments of a missing game are not found."""
+        response = self.client.get(comments_url(uuid4()))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GamesListApiTest(TestCase):
+    """Tests for pages and sparse fields of the games list."""
+
+    def setUp(self):
+        """Create games and authenticate a user."""
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(username='user', password='user'))
+        games = [Games(title=f'Game {number}', price=PRICE) for number in range(GAMES)]
+        Games.objects.bulk_create(games)
+
+    def test_pages(self):
+        """Walk all pages by cursors, every game is listed once."""
+        titles = []
+        url = f'/api/games/?page_size={API_PAGE}'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), API_PAGE)
+            titles.extend(row['title'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(titles, [f'Game {number}' for number in range(GAMES)])
+
+    def test_fields(self):
+        """Only asked fields are serialized and selected."""
+        captured = CaptureQueriesContext(connection)
+        with captured:
+            response = self.client.get('/api/games/', {'fields': 'id,title'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+        self.assertNotIn('"price"', captured.captured_queries[-1]['sql'])
+
+    def test_not_modified(self):
+        """Unchanged list is answered with 304 without queries, a new game changes it."""
+        etag = self.client.get('/api/games/').headers['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            Games.objects.create(title='New', price=PRICE)
+        response = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_unknown_fields(self):
+        """Unknown fields are rejected."""
+        response = self.client.get('/api/games/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GenreFacetsApiTest(TestCase):
+    """Tests for the faceted games list and counts of genres."""
+
+    def setUp(self):
+        """Create genres and games and authenticate a user."""
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(username='user', password='user'))
+        self.horror = Genre.objects.create(title='Horror')
+        self.card = Genre.objects.create(title='Card')
+        games = (Games(title=f'Game {price}', price=price) for price in (5, 15, 75))
+        self.games = Games.objects.bulk_create(games)
+
+    def counts(self, **query) -> dict:
+        """Read counts of genres from the API.
+
+        Args:
+            query: query parameters
+
+        Returns:
+            dict: counts by titles of genres
+        """
+        response = self.client.get('/api/facets/', query)
+        return {genre['title']: genre['games_count'] for genre in response.json()['genres']}
+
+    def titles(self, **query) -> list:
+        """Read titles of listed games from the API.
+
+        Args:
+            query: query parameters
+
+        Returns:
+            list: titles of games of the first page
+        """
+        response = self.client.get('/api/facets/', query)
+        return [game['title'] for game in response.json()['results']]
+
+    def test_counts_follow_changes(self):
+        """Counts follow bulk links, price changes and deleted links."""
+        cheap, middle, _ = self.games
+        GameGenre.objects.bulk_create(GameGenre(game=game, genre=self.horror) for game in self.games)
+        self.card.game.add(cheap)
+        self.assertEqual(self.counts(), {'Card': 1, 'Horror': 3})
+        Games.objects.filter(pk=cheap.pk).update(price=PRICE)
+        self.assertEqual(self.counts(price_to=1), {'Card': 0, 'Horror': 1})
+        GameGenre.objects.filter(game=middle).delete()
+        self.assertEqual(self.counts(price_from=1), {'Card': 1, 'Horror': 2})
+        self.assertEqual(GenreFacet.objects.filter(genre=self.horror).count(), len(self.games))
+
+    def test_filter(self):
+        """Games of any selected genre in the price buckets are listed, broken values are ignored."""
+        cheap, _, expensive = self.games
+        GameGenre.objects.create(game=cheap, genre=self.horror)
+        GameGenre.objects.create(game=expensive, genre=self.card)
+        genres = [str(self.horror.id), str(self.card.id), 'bad']
+        self.assertEqual(self.titles(genre=genres), ['Game 5', 'Game 75'])
+        self.assertEqual(self.titles(price_from='x', price_to=1), ['Game 15', 'Game 5'])
+
+
+class ValuesPlanTest(TestCase):
+    """Tests for serialization of .values() rows."""
+
+    def setUp(self):
+        """Create one object of every served model."""
+        today = timezone.now().date()
+        game = Games.objects.create(title='A', price=PRICE)
+        Genre.objects.create(title='Fiction')
+        Client.objects.create(nickname='A B C', money='13.5', date_registrate=today)
+        Comment.objects.create(description='Fine', game=game, estimation=5, date_public=today)
+
+    def test_same_output(self):
+        """Rows are rendered to the same bytes as objects."""
+        renderer = JSONRenderer()
+        for serializer in (GamesSerializer, GenreSerializer, ClientSerializer, CommentSerializer):
+            model = serializer.Meta.model
+            plan = values_plan(serializer(context={'request': None}))
+            rows = plan.serialize(model.objects.order_by('pk').values(*plan.sources))
+            instances = serializer(model.objects.order_by('pk'), many=True, context={'request': None})
+            self.assertEqual(renderer.render(rows), renderer.render(instances.data))
+
+
+def read_stream(response) -> list[str]:
+    """
+    Read lines of a streamed response.
+
+    Args:
+        response: streamed response
+
+    Returns:
+        list: decoded lines
+    """
+    return b''.join(response.streaming_content).decode().splitlines()
+
+
+class ExportApiTest(TestCase):
+    """Tests for streaming export."""
+
+    def setUp(self):
+        """Create a game with a genre, a comment and a purchase."""
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(username='admin', password='admin', is_staff=True))
+        self.game = Games.objects.create(title='A', price=PRICE)
+        GameGenre.objects.create(game=self.game, genre=Genre.objects.create(title='Fiction'))
+        Games.objects.create(title='B', price=PRICE)
+        self.buyer = Client.objects.create(nickname='A B C', money=PRICE)
+        Comment.objects.create(description='Fine, thanks', game=self.game, estimation=5)
+        GameClient.objects.create(game=self.game, client=self.buyer, purchased=True, purchased_at=timezone.now())
+
+    def test_games_ndjson(self):
+        """Games are streamed as JSON lines with their genres."""
+        response = self.client.get('/api/export/games.ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        games = {row['title']: row for row in map(json.loads, read_stream(response))}
+        self.assertEqual(games['A']['genres'], ['Fiction'])
+        self.assertEqual(games['B']['genres'], [])
+
+    def test_comments_csv(self):
+        """Comments are streamed as CSV with a header."""
+        lines = read_stream(self.client.get('/api/export/comments.csv'))
+        self.assertEqual(lines[0], 'id,game_id,client_id,description,estimation,date_public,updated_at')
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"Fine, thanks"', lines[1])
+
+    def test_since(self):
+        """Only rows changed since the moment are streamed."""
+        later = (timezone.now() + timedelta(minutes=1)).isoformat()
+        self.assertEqual(len(read_stream(self.client.get('/api/export/purchases.ndjson'))), 1)
+        self.assertEqual(read_stream(self.client.get('/api/export/purchases.ndjson', {'since': later})), [])
+        response = self.client.get('/api/export/purchases.ndjson', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_edited_comment(self):
+        """An edited comment is pulled again, even when published on an earlier day."""
+        comment = Comment.objects.get()
+        comment.date_public = timezone.now().date() - timedelta(days=3)
+        comment.save()
+        since = timezone.now().isoformat()
+        self.assertEqual(read_stream(self.client.get('/api/export/comments.ndjson', {'since': since})), [])
+        comment.description = 'Edited'
+        comment.save()
+        response = self.client.get('/api/export/comments.ndjson', {'since': since})
+        rows = [json.loads(line) for line in read_stream(response)]
+        self.assertEqual([row['description'] for row in rows], ['Edited'])
+
+    def test_genres_change_game(self):
+        """Linking a genre or an API update marks the game as updated for incremental pulls."""
+        game = Games.objects.get(title='B')
+        since = timezone.now().isoformat()
+        game.genres.add(Genre.objects.create(title='Horror'))
+        response = self.client.get('/api/export/games.ndjson', {'since': since})
+        rows = [json.loads(line) for line in read_stream(response)]
+        self.assertEqual([row['title'] for row in rows], ['B'])
+        self.assertEqual(rows[0]['genres'], ['Horror'])
+        since = timezone.now().isoformat()
+        self.client.force_authenticate(user=User(username='root', password='root', is_staff=True, is_superuser=True))
+        game_url = '/api/games/{0}/'.format(self.game.pk)
+        self.assertEqual(self.client.put(game_url, {'title': 'C', 'price': PRICE}).status_code, status.HTTP_200_OK)
+        rows = read_stream(self.client.get('/api/export/games.ndjson', {'since': since}))
+        self.assertEqual([json.loads(row)['title'] for row in rows], ['C'])
+
+    def test_access(self):
+        """Unknown resources are not found, other users can not export."""
+        self.assertEqual(self.client.get('/api/export/users.csv').status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=User(username='user', password='user'))
+        self.assertEqual(self.client.get('/api/export/games.csv').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BulkApiTest(TestCase):
+    """Tests for batch writes of the viewsets."""
+
+    def setUp(self):
+        """Create genres and authenticate a superuser."""
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(username='admin', password='admin', is_superuser=True))
+        self.fiction = Genre.objects.create(title='Fiction')
+        self.horror = Genre.objects.create(title='Horror')
+
+    def test_create(self):
+        """Games and their genres are inserted with a constant number of queries."""
+        genres = [str(self.fiction.id), str(self.horror.id)]
+        games = [{'title': f'Game {number}', 'price': PRICE, 'genres': genres} for number in range(GAMES)]
+        with self.assertNumQueries(BULK_QUERIES):
+            response = self.client.post('/api/games/bulk/', games, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Games.objects.count(), GAMES)
+        self.assertEqual(GameGenre.objects.count(), GAMES * 2)
+        self.assertNotIn('genres', response.json()[0])
+
+    def test_update(self):
+        """Games are updated and their genres are replaced."""
+        game = Games.objects.create(title='Old', price=PRICE)
+        game.genres.add(self.fiction)
+        genres = [str(self.horror.id)]
+        changes = [{'id': str(game.id), 'title': 'New', 'price': 1, 'genres': genres}]
+        response = self.client.put('/api/games/bulk/', changes, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        game.refresh_from_db()
+        self.assertEqual(game.title, 'New')
+        self.assertEqual(list(game.genres.all()), [self.horror])
+
+    def test_invalid(self):
+        """Nothing is written when one object is invalid or ids are unknown."""
+        games = [{'title': 'A', 'price': PRICE}, {'title': 'B', 'price': -1}]
+        response = self.client.post('/api/games/bulk/', games, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Games.objects.exists())
+        unknown = [{'id': str(uuid4()), 'title': 'A', 'price': PRICE}]
+        response = self.client.put('/api/games/bulk/', unknown, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        genres = [{'title': 'A', 'price': PRICE, 'genres': [str(uuid4())]}]
+        response = self.client.post('/api/games/bulk/', genres, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(API_BULK_LIMIT=2)
+    def test_limit(self):
+        """Too long arrays are rejected."""
+        genres = [{'title': 'Card'} for _ in range(3)]
+        response = self.client.post('/api/genre/bulk/', genres, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_user(self):
+        """Other users can not write in batches."""
+        self.client.force_authenticate(user=User(username='user', password='user'))
+        response = self.client.post('/api/genre/bulk/', [{'title': 'Card'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CachedAuthenticationTest(TestCase):
+    """Tests for cached token and basic authentication."""
+
+    def setUp(self):
+        """Create a user with a token."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='reader', password='secret')
+        self.token = Token.objects.create(user=self.user)
+        key = self.token.key
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+
+    def auth_queries(self, table: str) -> list:
+        """
+        Make a request and take queries to a table.
+
+        Args:
+            table: name of the table
+
+        Returns:
+            list: queries to the table
+        """
+        captured = CaptureQueriesContext(connection)
+        with captured:
+            self.assertEqual(self.client.get('/api/genre/').status_code, status.HTTP_200_OK)
+        return [query for query in captured.captured_queries if table in query['sql']]
+
+    def test_token_cached(self):
+        """The token is read from the database once, the shared cache keeps no token or password hash."""
+        self.assertTrue(self.auth_queries('authtoken_token'))
+        self.assertFalse(self.auth_queries('authtoken_token'))
+        remembered = cache.get(token_cache_key(self.token.key))
+        self.assertEqual(remembered['user']['id'], self.user.pk)
+        self.assertNotIn('password', remembered['user'])
+        self.assertNotIn(self.token.key, str(remembered))
+        self.assertNotIn(self.user.password, str(remembered))
+
+    def test_token_deleted(self):
+        """A deleted token stops working at once."""
+        self.auth_queries('authtoken_token')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.client.get('/api/genre/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_deactivated(self):
+        """Tokens of a deactivated user stop working at once."""
+        self.auth_queries('authtoken_token')
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get('/api/genre/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_basic_deactivated_by_update(self):
+        """Basic credentials of a user deactivated without signals stop working at once."""
+        credentials = base64.b64encode(b'reader:secret').decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.auth_queries('auth_user')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/genre/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_basic_cached(self):
+        """The password is hashed once, a wrong password is rejected."""
+        credentials = base64.b64encode(b'reader:secret').decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(len(self.auth_queries('auth_user')), 2)
+        self.assertEqual(len(self.auth_queries('auth_user')), 1)
+        wrong = base64.b64encode(b'reader:wrong').decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {wrong}')
+        self.assertEqual(self.client.get('/api/genre/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@skipUnless(settings.PG_POOL, 'connections are not pooled')
+class DatabasePoolsApiTest(TestCase):
+    """Tests for counters of connection pools."""
+
+    def test_pool_stats(self):
+        """Admins see checkouts of the pool of the test database."""
+        client = APIClient()
+        client.force_authenticate(user=User(username='reader'))
+        self.assertEqual(client.get('/api/pools/').status_code, status.HTTP_403_FORBIDDEN)
+        client.force_authenticate(user=User(username='admin', is_staff=True))
+        pools = client.get('/api/pools/').json()
+        self.assertGreaterEqual(pools['default']['requests_num'], 1)
+        self.assertLessEqual(pools['default']['pool_size'], pools['default']['pool_max'])
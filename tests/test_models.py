@@ -1,17 +1,45 @@
 """This module include test for models."""
 from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
 from django.test import TestCase
 
-from myapp.models import (Client, Comment, GameClient, Games, Genre,
-                          check_date_created, check_estimation, check_money,
-                          check_price)
+from myapp.models import (GAMES_GENRE, Client, Comment, GameClient, GameGenre,
+                          Games, Genre, GenreFacet, check_date_created,
+                          check_estimation, check_money, check_price)
+from myapp.versions import object_versions
 
 TEN = 10.0
 FIFTY = 50.0
 FOUR = 4.5
+FIVE = 5
+TWENTY = 20
+THIRTY = 30
+GAME_ID = '11111111-1111-1111-1111-111111111111'
+CLIENT_ID = '22222222-2222-2222-2222-222222222222'
+
+
+def write_file(directory: str, name: str, text: str) -> Path:
+    """Write an imported file.
+
+    Args:
+        directory: temporary directory
+        name: name of the file
+        text: content of the file
+
+    Returns:
+        Path: path of the file
+    """
+    path = Path(directory) / name
+    path.write_text(text, encoding='utf-8')
+    return path
 
 
 class ModelTests(TestCase):
@@ -102,3 +130,82 @@ class ModelTests(TestCase):
         game_client = GameClient.objects.create(client=client, game=game)
         self.assertEqual(game_client.client, client)
         self.assertEqual(game_client.game, game)
+
+    def test_seed_store(self):
+        """Test case for the seed_store command.
+
+        Checks that the requested volumes are created and ratings match the generated comments.
+        """
+        call_command(
+            'seed_store', games=TWENTY, clients=FIVE, comments=THIRTY, purchases=3, cart=2, batch_size=7, stdout=StringIO(),
+        )
+        self.assertEqual(Games.objects.count(), TWENTY)
+        self.assertEqual(Client.objects.filter(user__isnull=False).count(), FIVE)
+        self.assertEqual(Comment.objects.count(), THIRTY)
+        self.assertEqual(Genre.objects.count(), len(GAMES_GENRE))
+        self.assertFalse(Games.objects.filter(genres__isnull=True).exists())
+        self.assertEqual(Games.objects.aggregate(total=Sum('rating_count'))['total'], THIRTY)
+        self.assertFalse(GameClient.objects.filter(in_cart=True, purchased=True).exists())
+
+    def test_import_store(self):
+        """Test case for the import_store command.
+
+        Checks that files are merged by id, genres are linked and ratings are recalculated.
+        """
+        with TemporaryDirectory() as directory:
+            games = write_file(directory, 'games.csv', f'id,title,price,genres\n{GAME_ID},"One, Two",9.99,Horror|Card\n,Other,0,\n')
+            clients = write_file(directory, 'clients.jsonl', f'{{"id": "{CLIENT_ID}", "nickname": "neo", "money": 5}}\n')
+            comments = write_file(
+                directory, 'comments.csv', f'game_id,client_id,description,estimation\n{GAME_ID},{CLIENT_ID},good,4\n',
+            )
+            call_command('import_store', games=games, clients=clients, comments=comments, stdout=StringIO())
+            again = write_file(directory, 'again.jsonl', f'{{"id": "{GAME_ID}", "title": "One", "genres": ["PVP"]}}\n')
+            call_command('import_store', games=again, stdout=StringIO())
+        game = Games.objects.get(pk=GAME_ID)
+        self.assertEqual((game.title, game.price, game.rating_count), ('One', Decimal('9.99'), 1))
+        self.assertEqual(list(game.genres.values_list('title', flat=True)), ['PVP'])
+        self.assertEqual(Games.objects.count(), 2)
+        self.assertEqual(Client.objects.get(pk=CLIENT_ID).money, FIVE)
+        self.assertEqual(Comment.objects.get().client_id, Client.objects.get().pk)
+
+    def test_import_moved_comment(self):
+        """Test case for a comment moved to another game by import_store.
+
+        Checks that fragments and ratings of the game the comment leaves are refreshed too, other games are not touched.
+        """
+        left, joined = Games.objects.bulk_create([Games(title='Left'), Games(title='Joined')])
+        Games.objects.create(title='Other', rating_count=FIVE)
+        comment = Comment.objects.create(description='good', game=left, estimation=FIVE)
+        versions = object_versions(Games, [left.pk, joined.pk])
+        with TemporaryDirectory() as directory:
+            moved = write_file(directory, 'comments.csv', f'id,game_id,description\n{comment.pk},{joined.pk},good\n')
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('import_store', comments=moved, stdout=StringIO())
+        bumped = object_versions(Games, [left.pk, joined.pk])
+        self.assertGreater(bumped[left.pk], versions[left.pk])
+        self.assertGreater(bumped[joined.pk], versions[joined.pk])
+        ratings = Games.objects.order_by('title').values_list('rating_count', flat=True)
+        self.assertEqual(list(ratings), [1, 0, FIVE])
+
+    def test_import_store_constraints(self):
+        """Test case for checks of the import_store command, a rejected file writes nothing."""
+        with TemporaryDirectory() as directory:
+            games = write_file(directory, 'games.csv', 'title,price\nOne,1\n')
+            clients = write_file(directory, 'clients.csv', 'nickname,money\nneo,1\nrich,-1\n')
+            with self.assertRaisesMessage(CommandError, 'check_money'):
+                call_command('import_store', games=games, clients=clients, stdout=StringIO())
+            unknown = write_file(directory, 'unknown.csv', 'title,rating\nOne,1\n')
+            with self.assertRaises(CommandError):
+                call_command('import_store', games=unknown, stdout=StringIO())
+        self.assertFalse(Games.objects.exists())
+        self.assertFalse(Client.objects.exists())
+
+    def test_rebuild_facets(self):
+        """Test case for the rebuild_facets command, broken counts are counted again."""
+        genre = Genre.objects.create(title='Card')
+        games = Games.objects.bulk_create(Games(title='Game', price=price) for price in (1, 2, FIFTY))
+        GameGenre.objects.bulk_create(GameGenre(game=game, genre=genre) for game in games)
+        GenreFacet.objects.update(games_count=0)
+        call_command('rebuild_facets', stdout=StringIO())
+        counts = dict(GenreFacet.objects.filter(genre=genre).values_list('price_bucket', 'games_count'))
+        self.assertEqual(counts, {0: 2, 5: 1})
@@ -1,14 +1,40 @@
 """This module include test for views."""
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from uuid import uuid4
+
 from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection, router
+from django.http import HttpResponse
 from django.test import Client as TestClient
-from django.test import TestCase
-from django.urls import reverse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
 
-from myapp.models import Client, GameClient, Games, Genre
+from myapp.autocomplete import title_index
+from myapp.instrumentation import fingerprint, normalize, time_query, timing
+from myapp.middleware import ReplicaMiddleware
+from myapp.models import Client, Comment, GameClient, GameGenre, Games, Genre
+from myapp.pagination import NEXT, encode_cursor
+from myapp.routers import PIN_COOKIE
+from myapp.views import aview_cart, view_cart
 
 FIFTY = 50.0
 TWOHUNDRED = 200
 THREEHUNDREDANDTWO = 302
+TWENTYFIVE = 25
+TWENTY = 20
+HOME_QUERIES = 6
+LIBRARY_QUERIES = 4
+SEARCH_QUERIES = 4
+SIXTEEN = 16
 
 
 class ViewTests(TestCase):
@@ -35,6 +61,55 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, TWOHUNDRED)
         self.assertTemplateUsed(response, 'home.html')
 
+    def test_home_pagination(self):
+        """Test case for the cursor pagination of the home view.
+
+        Walks the catalog forward and back with cursors and checks that no game is lost or repeated.
+        """
+        for number in range(TWENTYFIVE):
+            Games.objects.create(title=f'Game {number:02}', price=FIFTY)
+        first = self.client.get(reverse('home')).context['page_obj']
+        second = self.client.get(reverse('home'), {'cursor': first.next_cursor}).context['page_obj']
+        third = self.client.get(reverse('home'), {'cursor': second.next_cursor}).context['page_obj']
+        titles = [game.title for page in (first, second, third) for game in page]
+        self.assertEqual(titles, sorted(titles))
+        self.assertEqual(len(set(titles)), TWENTYFIVE + 1)
+        self.assertFalse(third.has_next)
+        back = self.client.get(reverse('home'), {'cursor': third.previous_cursor}).context['page_obj']
+        self.assertEqual(list(back), list(second))
+        self.assertFalse(first.has_previous)
+
+    def test_tampered_cursor(self):
+        """Test case for cursors with values of wrong types.
+
+        Checks that the catalog and the comments start from the first page instead of failing.
+        """
+        tampered = encode_cursor(NEXT, ['x', 'not-a-uuid'])
+        for sort in ('title', 'rating'):
+            response = self.client.get(reverse('home'), {'cursor': tampered, 'sort': sort})
+            self.assertEqual(response.status_code, TWOHUNDRED)
+            self.assertFalse(response.context['page_obj'].has_previous)
+        response = self.client.get(reverse('games_detail', args=[self.game.id]), {'cursor': tampered})
+        self.assertEqual(response.status_code, TWOHUNDRED)
+
+    def test_listing_query_budget(self):
+        """Test case for the number of queries on listing pages.
+
+        Checks that genres of all listed games are loaded at once, whatever the number of games.
+        """
+        genre = Genre.objects.create(title='Fiction')
+        for number in range(TWENTYFIVE):
+            game = Games.objects.create(title=f'Fiction {number:02}', price=FIFTY)
+            GameGenre.objects.create(game=game, genre=genre)
+            GameClient.objects.create(client=self.client_model, game=game)
+        self.client.get(reverse('search_games'), {'query': 'fiction'})
+        with self.assertNumQueries(HOME_QUERIES):
+            self.client.get(reverse('home'), {'query': 'fiction'})
+        with self.assertNumQueries(LIBRARY_QUERIES):
+            self.client.get(reverse('games'))
+        with self.assertNumQueries(SEARCH_QUERIES):
+            self.client.get(reverse('search_games'), {'query': 'fiction'})
+
     def test_register_view(self):
         """Test case for the register view.
 
@@ -63,6 +138,20 @@ class ViewTests(TestCase):
         self.game_client.refresh_from_db()
         self.assertTrue(self.game_client.in_cart)
 
+    def test_add_many_to_cart(self):
+        """Test case for adding several games to the cart.
+
+        Checks that games are added with one statement and unknown ids are skipped.
+        """
+        other = Games.objects.create(title='Other', price=FIFTY)
+        game_ids = [self.game.id, other.id, uuid4(), 'broken']
+        self.client.post(reverse('add_many_to_cart'), {'game_id': game_ids})
+        self.assertEqual(GameClient.objects.filter(client=self.client_model, in_cart=True).count(), 2)
+        self.game_client.refresh_from_db()
+        self.assertTrue(self.game_client.in_cart)
+        response = self.client.post(reverse('add_to_cart', args=[uuid4()]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
     def test_remove_from_cart(self):
         """Test case for removing a game from the cart.
 
@@ -85,6 +174,109 @@ class ViewTests(TestCase):
         self.game_client.refresh_from_db()
         self.assertTrue(self.game_client.purchased)
 
+    def test_cart_summary_cache(self):
+        """Test case for the cached summary of the cart.
+
+        Checks that pages do not count the cart again until the cart changes.
+        """
+        self.client.get(reverse('home'))
+        captured = CaptureQueriesContext(connection)
+        with captured:
+            response = self.client.get(reverse('home'))
+        self.assertFalse([query for query in captured.captured_queries if 'games_to_client' in query['sql']])
+        self.assertEqual(response.context['cart_count'], 0)
+        self.client.post(reverse('add_to_cart', args=[self.game.id]))
+        response = self.client.get(reverse('home'))
+        self.assertEqual((response.context['cart_count'], response.context['cart_total']), (1, Decimal(FIFTY)))
+        self.client.post(reverse('remove_from_cart', args=[self.game.id]))
+        self.assertEqual(self.client.get(reverse('home')).context['cart_count'], 0)
+
+    def test_cart_summary_price_change(self):
+        """Test case for the cached summary of the cart after a game changes.
+
+        Checks that new prices and deleted games are counted at once.
+        """
+        other = Games.objects.create(title='Other', price=FIFTY)
+        home = reverse('home')
+        self.client.post(reverse('add_many_to_cart'), {'game_id': [self.game.id, other.id]})
+        self.assertEqual(self.client.get(home).context['cart_total'], Decimal(FIFTY * 2))
+        other.price = TWENTY
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        self.assertEqual(self.client.get(home).context['cart_total'], Decimal(FIFTY + TWENTY))
+        with self.captureOnCommitCallbacks(execute=True):
+            GameClient.objects.filter(game=other).delete()
+            other.delete()
+        self.assertEqual(self.client.get(home).context['cart_total'], Decimal(FIFTY))
+
+    def test_checkout(self):
+        """Test case for buying the whole cart.
+
+        Checks that every game of the cart is bought and the number of queries does not depend on the cart size.
+        """
+        self.client_model.money = FIFTY * TWENTY
+        self.client_model.save()
+        GameClient.objects.filter(pk=self.game_client.pk).update(in_cart=True)
+        self.client.get(reverse('home'))
+        captured = CaptureQueriesContext(connection)
+        with captured:
+            self.client.post(reverse('checkout'))
+        games = [Games(title=str(number), price=1) for number in range(TWENTY)]
+        Games.objects.bulk_create(games)
+        cart = [GameClient(client=self.client_model, game=game, in_cart=True) for game in games]
+        GameClient.objects.bulk_create(cart)
+        with self.assertNumQueries(len(captured)):
+            response = self.client.post(reverse('checkout'))
+        self.assertEqual(response.status_code, THREEHUNDREDANDTWO)
+        self.assertEqual(GameClient.objects.filter(client=self.client_model, purchased=True).count(), TWENTY + 1)
+        self.client_model.refresh_from_db()
+        self.assertEqual(self.client_model.money, Decimal(FIFTY * TWENTY - FIFTY - TWENTY))
+
+    def test_checkout_keeps_purchase_time(self):
+        """Test case for a cart holding a game bought before.
+
+        Checks that the old purchase is neither charged again nor moved to the time of the checkout.
+        """
+        bought_at = timezone.now() - timedelta(days=TWENTY)
+        GameClient.objects.filter(pk=self.game_client.pk).update(in_cart=True, purchased=True, purchased_at=bought_at)
+        other = Games.objects.create(title='B', price=FIFTY)
+        GameClient.objects.create(client=self.client_model, game=other, in_cart=True)
+        self.client.post(reverse('checkout'))
+        self.game_client.refresh_from_db()
+        self.assertEqual((self.game_client.purchased_at, self.game_client.in_cart), (bought_at, False))
+        self.assertIsNotNone(GameClient.objects.get(game=other).purchased_at)
+        self.client_model.refresh_from_db()
+        self.assertEqual(self.client_model.money, Decimal(FIFTY))
+
+    def test_checkout_without_money(self):
+        """Test case for buying a cart which is too expensive.
+
+        Checks that nothing is bought and the balance is kept.
+        """
+        expensive = Games.objects.create(title='B', price=FIFTY + 1)
+        GameClient.objects.create(client=self.client_model, game=expensive, in_cart=True)
+        GameClient.objects.filter(pk=self.game_client.pk).update(in_cart=True)
+        response = self.client.post(reverse('checkout'))
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(GameClient.objects.filter(purchased=True).exists())
+        self.client_model.refresh_from_db()
+        self.assertEqual(self.client_model.money, Decimal(FIFTY * 2))
+
+    def test_cached_client(self):
+        """Test case for the client attached to requests.
+
+        Checks that the client is cached between requests and forgotten when the balance changes.
+        """
+        self.client.get(reverse('home'))
+        captured = CaptureQueriesContext(connection)
+        with captured:
+            response = self.client.get(reverse('home'))
+        self.assertFalse([query for query in captured.captured_queries if '"client"' in query['sql']])
+        self.assertEqual(response.context['money_client'], Decimal(FIFTY * 2))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('buy_game', args=[self.game.id]))
+        self.assertEqual(self.client.get(reverse('home')).context['money_client'], Decimal(FIFTY))
+
     def test_view_cart(self):
         """Test case for viewing the cart.
 
@@ -93,6 +285,23 @@ class ViewTests(TestCase):
         response = self.client.get(reverse('cart'))
         self.assertEqual(response.status_code, TWOHUNDRED)
         self.assertTemplateUsed(response, 'cart.html')
+        self.assertIs(response.resolver_match.func, view_cart)
+
+    async def test_async_read_views(self):
+        """Test case for the async read views under an ASGI request.
+
+        Checks that ASGI requests get the async views and pages render with the client and the cart loaded without blocking queries.
+        """
+        await self.async_client.aforce_login(self.user)
+        await GameClient.objects.filter(pk=self.game_client.pk).aupdate(in_cart=True)
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.context['money_client'], self.client_model.money)
+        self.assertEqual(response.context['cart_count'], 1)
+        response = await self.async_client.get(reverse('cart'))
+        self.assertIs(response.resolver_match.func, aview_cart)
+        self.assertEqual([game_client.game_id for game_client in response.context['cart_items']], [self.game.id])
+        response = await self.async_client.get(reverse('games_detail', args=[self.game.id]))
+        self.assertEqual(response.context['count_comment_user'], 0)
 
     def test_game_details(self):
         """Test case for viewing game details.
@@ -103,6 +312,73 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, TWOHUNDRED)
         self.assertTemplateUsed(response, 'games_detail.html')
 
+    def test_game_fragments(self):
+        """Test case for cached fragments of games.
+
+        Checks that fragments are reused until the game, its genres or its comments change.
+        """
+        url = reverse('games_detail', args=[self.game.id])
+        self.assertContains(self.client.get(url), 'Test Game')
+        Games.objects.filter(pk=self.game.pk).update(title='Quietly renamed')
+        self.assertContains(self.client.get(url), 'Test Game')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.title = 'Renamed'
+            self.game.save()
+        self.assertContains(self.client.get(url), 'Renamed')
+        with self.captureOnCommitCallbacks(execute=True):
+            GameGenre.objects.create(game=self.game, genre=Genre.objects.create(title='Fiction'))
+        self.assertContains(self.client.get(url), 'Fiction')
+        self.assertContains(self.client.get(reverse('home')), 'Rating: 0')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'description': 'Good', 'estimation': '4'})
+        self.assertContains(self.client.get(reverse('home')), 'Rating: 4')
+
+    def test_comment_rating(self):
+        """Test case for the rating of a game.
+
+        Checks that creating, updating and deleting comments keeps the rating of the game.
+        """
+        self.client.post(reverse('games_detail', args=[self.game.id]), {'description': 'Good', 'estimation': '4'})
+        Comment.objects.create(description='Bad', game=self.game, estimation=1)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rating_count, self.game.rating_avg), (1, Decimal(4)))
+        comment = Comment.objects.get(description='Good')
+        self.client.post(reverse('update_comment', args=[comment.id]), {'description': 'Fine', 'estimation': '2'})
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rating_sum, self.game.rating_avg), (Decimal(2), Decimal(2)))
+        self.client.post(reverse('comment_delete', args=[comment.id]))
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rating_count, self.game.rating_avg), (0, Decimal(0)))
+        call_command('reconcile_ratings', stdout=StringIO())
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.rating_count, self.game.rating_avg), (1, Decimal(1)))
+
+    def test_invalid_estimation(self):
+        """Test case for comments with a broken estimation.
+
+        Checks that an empty or non-numeric estimation is rejected with 400 and the rating is kept.
+        """
+        details = reverse('games_detail', args=[self.game.id])
+        for estimation in ('', 'many', '-1'):
+            response = self.client.post(details, {'description': 'Good', 'estimation': estimation})
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        comment = Comment.objects.create(description='Bad', game=self.game, estimation=1)
+        response = self.client.post(reverse('update_comment', args=[comment.id]), {'description': 'Fine', 'estimation': 'x'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Comment.objects.filter(description='Good').exists())
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.rating_count, 0)
+
+    def test_home_sorted_by_rating(self):
+        """Test case for sorting the catalog by rating.
+
+        Checks that the best rated games go first.
+        """
+        Games.objects.create(title='Best', price=FIFTY, rating_avg=5)
+        Games.objects.create(title='Good', price=FIFTY, rating_avg=4)
+        response = self.client.get(reverse('home'), {'sort': 'rating'})
+        self.assertEqual([game.title for game in response.context['page_obj']], ['Best', 'Good', 'Test Game'])
+
     def test_users_games_catalog(self):
         """Test case for viewing the games catalog.
 
@@ -112,6 +388,35 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, TWOHUNDRED)
         self.assertTemplateUsed(response, 'games.html')
 
+    def test_users_games_catalog_order(self):
+        """Test case for the order of the games catalog.
+
+        Checks that games are sorted by title and a game with several genres is listed once.
+        """
+        for title in ('Fiction', 'Horror'):
+            GameGenre.objects.create(game=self.game, genre=Genre.objects.create(title=title))
+        other = Games.objects.create(title='Another Game', price=FIFTY)
+        GameClient.objects.create(client=self.client_model, game=other)
+        response = self.client.get(reverse('games'))
+        self.assertEqual([game.title for game in response.context['games_list']], ['Another Game', 'Test Game'])
+
+    def test_browse_games(self):
+        """Test case for browsing the catalog by genres and prices.
+
+        Checks that games of a selected genre in the price range are listed and every genre is counted.
+        """
+        horror = Genre.objects.create(title='Horror')
+        card = Genre.objects.create(title='Card')
+        cheap = Games.objects.create(title='Cheap Game', price=5)
+        cheap.genres.add(horror, card)
+        self.game.genres.add(horror)
+        selection = {'genre': [str(horror.id)], 'price_from': 0, 'price_to': 0}
+        response = self.client.get(reverse('browse'), selection)
+        self.assertTemplateUsed(response, 'browse.html')
+        self.assertEqual([game.title for game in response.context['page_obj']], ['Cheap Game'])
+        counts = {genre.title: genre.games_count for genre in response.context['genres']}
+        self.assertEqual(counts, {'Card': 1, 'Horror': 1})
+
     def test_search_games(self):
         """Test case for searching games.
 
@@ -121,6 +426,38 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, TWOHUNDRED)
         self.assertTemplateUsed(response, 'home.html')
 
+    def test_search_games_results(self):
+        """Test case for the ranked search of games.
+
+        Checks that whole words and substrings of titles are found and unrelated games are not.
+        """
+        Games.objects.create(title='Space Rangers', price=FIFTY)
+        Games.objects.create(title='Dark Souls', price=FIFTY)
+        response = self.client.get(reverse('search_games'), {'query': 'space'})
+        self.assertEqual([game.title for game in response.context['games_q']], ['Space Rangers'])
+        response = self.client.get(reverse('home'), {'query': 'oul'})
+        self.assertEqual([game.title for game in response.context['games_q']], ['Dark Souls'])
+        self.assertFalse(response.context['games_q'].has_next)
+
+    def test_autocomplete(self):
+        """Test case for the title autocomplete.
+
+        Checks that the index follows created, renamed and deleted games without reloading.
+        """
+        title_index.clear()
+        response = self.client.get(reverse('autocomplete'), {'q': 'test'})
+        self.assertEqual([game['title'] for game in response.json()['results']], ['Test Game'])
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Games.objects.create(title='Testament', price=FIFTY)
+            self.game.title = 'Renamed'
+            self.game.save()
+        with self.assertNumQueries(0):
+            self.assertEqual([game['title'] for game in title_index.suggest('  TEST')], ['Testament'])
+        with self.captureOnCommitCallbacks(execute=True):
+            game.delete()
+        self.assertEqual(title_index.suggest('test'), [])
+        title_index.clear()
+
     def test_add_game(self):
         """Test case for adding a new game.
 
@@ -140,3 +477,167 @@ class ViewTests(TestCase):
         response = self.client.post(reverse('confirm_delete', args=[self.game.id]))
         self.assertEqual(response.status_code, THREEHUNDREDANDTWO)
         self.assertFalse(GameClient.objects.filter(game=self.game).exists())
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTest(SimpleTestCase):
+    """Class about routing reads to replicas."""
+
+    def setUp(self):
+        """Create the middleware around a view reporting where reads go."""
+        self.middleware = ReplicaMiddleware(self.view)
+        self.writes = False
+        self.fails = False
+
+    def view(self, request):
+        """Resolve the view like the handler does and route a read.
+
+        Args:
+            request: the HTTP request object
+
+        Raises:
+            ValueError: if the view is set to fail
+
+        Returns:
+            HttpResponse: aliases of reads of games and of sessions
+        """
+        request.resolver_match = resolve(request.path)
+        if self.writes:
+            router.db_for_write(Games)
+        if self.fails:
+            raise ValueError('The view failed.')
+        aliases = (router.db_for_read(Games), router.db_for_read(Session))
+        return HttpResponse(' '.join(aliases))
+
+    def route(self, method: str, path: str, **cookies):
+        """Send a request through the middleware.
+
+        Args:
+            method: HTTP method
+            path: requested path
+            cookies: cookies of the request
+
+        Returns:
+            HttpResponse: the response of the view
+        """
+        request = RequestFactory().generic(method, path)
+        request.COOKIES.update(cookies)
+        return self.middleware(request)
+
+    def test_safe_reads_of_marked_views(self):
+        """Test case for reads of read-only views.
+
+        Checks that GET of a marked view reads games from the replica and sessions from the primary.
+        """
+        self.assertEqual(self.route('GET', reverse('home')).content, b'replica_1 default')
+        self.assertEqual(self.route('GET', '/api/genre/').content, b'replica_1 default')
+        self.assertEqual(self.route('POST', reverse('home')).content, b'default default')
+        self.assertEqual(self.route('GET', reverse('add_to_cart', args=[uuid4()])).content, b'default default')
+        self.assertEqual(router.db_for_read(Games), 'default')
+
+    def test_write_pins_primary(self):
+        """Test case for reading own writes.
+
+        Checks that a write sets the pin cookie and pinned requests read from the primary.
+        """
+        self.writes = True
+        pin = self.route('GET', reverse('add_to_cart', args=[uuid4()])).cookies[PIN_COOKIE].value
+        self.writes = False
+        self.assertEqual(self.route('GET', reverse('home'), **{PIN_COOKIE: pin}).content, b'default default')
+        self.assertEqual(self.route('GET', reverse('home'), **{PIN_COOKIE: '0'}).content, b'replica_1 default')
+
+    def test_failed_view_resets_routing(self):
+        """Test case for a view raising an exception.
+
+        Checks that the routing of the failed request does not leak into later reads.
+        """
+        self.fails = True
+        with self.assertRaises(ValueError):
+            self.route('GET', reverse('home'))
+        self.assertEqual(router.db_for_read(Games), 'default')
+
+
+def query_count(response) -> str:
+    """
+    Take the number of queries from the Server-Timing header.
+
+    Args:
+        response: a timed response
+
+    Returns:
+        str: description of the db metric
+    """
+    return response['Server-Timing'].split('desc=')[1].split(',')[0]
+
+
+class QueryTimingTest(TestCase):
+    """Class about timing of SQL queries of requests."""
+
+    def setUp(self):
+        """Log in a user with a client."""
+        self.user = User.objects.create_user(username='timed', password='12345')
+        Client.objects.create(user=self.user, nickname='timed', money=FIFTY)
+        self.client.force_login(self.user)
+
+    @override_settings(SQL_TIMING_SAMPLE_RATE=1, SQL_SLOW_QUERY_MS=0)
+    def test_sampled_request(self):
+        """Test case for a sampled request.
+
+        Checks that the Server-Timing header counts queries and slow queries are logged with the view.
+        """
+        queries = CaptureQueriesContext(connection)
+        with self.assertLogs('myapp.slow_queries') as logs:
+            with queries:
+                response = self.client.get(reverse('home'))
+            entries = [json.loads(record.getMessage()) for record in logs.records]
+        count = len(queries.captured_queries)
+        self.assertIn('desc="{0} queries"'.format(count), response['Server-Timing'])
+        self.assertEqual(len(entries), count)
+        self.assertEqual(entries[-1]['view'], 'home')
+        self.assertEqual(len(entries[-1]['fingerprint']), SIXTEEN)
+        self.assertEqual(connection.execute_wrappers, [time_query])
+        self.assertIsNone(timing.get())
+
+    @override_settings(SQL_TIMING_SAMPLE_RATE=1, SQL_SLOW_QUERY_MS=0)
+    async def test_sampled_async_request(self):
+        """Test case for a sampled request of an async view.
+
+        Checks that queries of the ORM thread are counted.
+        """
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs('myapp.slow_queries'):
+            response = await self.async_client.get(reverse('cart'))
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    @override_settings(SQL_TIMING_SAMPLE_RATE=1)
+    async def test_overlapping_requests(self):
+        """Test case for sampled requests of async views running at once.
+
+        Checks that every request counts only its own queries and no timer is left behind.
+        """
+        await self.async_client.aforce_login(self.user)
+        url = reverse('cart')
+        await self.async_client.get(url)
+        alone = query_count(await self.async_client.get(url))
+        responses = await asyncio.gather(self.async_client.get(url), self.async_client.get(url))
+        self.assertEqual([query_count(response) for response in responses], [alone, alone])
+        self.assertIsNone(timing.get())
+
+    def test_not_sampled_request(self):
+        """Test case for a request out of the sample.
+
+        Checks that no header is set and no wrapper is installed.
+        """
+        with self.assertNoLogs('myapp.slow_queries'):
+            response = self.client.get(reverse('home'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_fingerprint(self):
+        """Test case for normalized statements.
+
+        Checks that values and lengths of lists do not change the fingerprint.
+        """
+        first = normalize("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'o''k' LIMIT 21")
+        second = normalize('SELECT *\n FROM t WHERE id IN (%s) AND name = %s LIMIT 5')
+        self.assertEqual(first, 'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?')
+        self.assertEqual(fingerprint(first), fingerprint(second))